@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# Import Time Benchmark
+# Guards the split between the rules package and the Kivy UI
+#
+# Imports modules.rules in a fresh interpreter, best of several runs, and
+# fails if that pulled in Kivy or took longer than the budget.
+#
+#   python benchmarks/import_time.py [--budget SECONDS] [--runs RUNS]
+
+# Imports
+
+import argparse
+import json
+import subprocess
+import sys
+from os.path import abspath, dirname
+
+# Variables
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+# Most time a headless import of the rules may take, in seconds
+BUDGET = 0.05
+
+# Run in the child interpreter, prints its findings as JSON
+CHILD = '''
+import json, sys, time
+start = time.time()
+import modules.rules
+elapsed = time.time() - start
+loaded = sorted(name for name in sys.modules
+    if name.split('.')[0] in ('kivy', 'numpy'))
+print(json.dumps({'seconds': elapsed, 'loaded': loaded}))
+'''
+
+# Functions
+
+def measure():
+    """Imports the rules in a new interpreter, returns its findings"""
+    output = subprocess.check_output([sys.executable, '-c', CHILD], cwd=ROOT)
+    return json.loads(output.decode('utf-8'))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Checks modules.rules imports fast and without Kivy"
+        )
+    parser.add_argument('--budget', type=float, default=BUDGET)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for i in range(args.runs)]
+    best = min(run['seconds'] for run in runs)
+    loaded = runs[0]['loaded']
+
+    print("modules.rules imported in %.1fms (budget %.1fms)"
+        % (best * 1000, args.budget * 1000))
+    if loaded:
+        print("FAIL: importing the rules loaded " + ", ".join(loaded))
+        return 1
+    if best > args.budget:
+        print("FAIL: import is over budget")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
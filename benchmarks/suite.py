@@ -0,0 +1,290 @@
+#!/usr/bin/python
+# Benchmark Suite
+# Times the roll engines, markup builders and history storage
+#
+# Every benchmark is timed with timeit, best of several repeats. Right
+# before it, a fixed pure Python reference workload is timed too, and the
+# benchmark is measured relative to that. A machine that's busy or slower
+# overall slows both, so relative times can be compared against the ones
+# saved in baseline.json. Anything slower than its baseline by more than the
+# tolerance is measured again, up to RETRIES times, and only reported as a
+# regression if it stays that slow, so a single noisy measurement passes.
+#
+#   python benchmarks/suite.py [--only NAME] [--tolerance 0.5]
+#   python benchmarks/suite.py --save
+#
+# A baseline saved by another Python version or kind of machine is shown
+# but not compared against. Re-save it with --save on the machine that runs
+# the comparisons, before making the change being measured.
+#
+# The UI methods benchmarked here (RollHistory._make_strings,
+# dice_ResultsByDice.update, force_Controls._get_total) are thin wrappers
+# around the rules package, so their rules calls are timed directly and the
+# suite never needs Kivy. Their markup builders are memoized, so they're
+# timed uncached over a cycle of varied seeded pools, and once more
+# (.cached) on a single pool to time a memo hit.
+
+# Imports
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from os.path import abspath, dirname, join
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.rules.crit import CHART_MAX, CHART_MIN, crit_chart
+from modules.rules.force import force, force_roll, force_total_markup,\
+    force_totals
+from modules.rules import markup
+from modules.rules.markup import dice_markup, pool_markup, result_markup
+from modules.rules.pool import DICE_TYPES, PoolModel
+from modules.submodules.rng import RandomService
+from modules.submodules.roll_store import RollStore
+from modules.submodules.sw_dice import add_dice
+
+# Variables
+
+BASELINE = join(dirname(abspath(__file__)), 'baseline.json')
+
+SEED = 2013 # Every benchmark rolls the same dice on every run
+
+MIN_TIME = 0.05 # Seconds a single repeat should at least run for
+
+VARIED = 512 # Different seeded pools the markup builders cycle through
+
+RETRIES = 4 # Extra measurements of a benchmark slower than its baseline
+
+# Functions
+
+def _stream(name):
+    """Returns a fresh seeded stream, so runs don't depend on each other"""
+    return RandomService(SEED).stream(name)
+
+def _add_dice(type, dice):
+    stream = _stream("dice")
+    return lambda: add_dice(dice, type, stream)
+
+def _crit_chart():
+    rolls = range(CHART_MIN - 10, CHART_MAX + 10)
+    def run():
+        for roll in rolls:
+            crit_chart(roll)
+    return run
+
+def _force():
+    return force
+
+def _get_total(players):
+    results = force_roll(players, _stream("force"))
+    return lambda: force_total_markup(*force_totals(results))
+
+def _varied_pools():
+    """Returns VARIED seeded pools of 0 to 4 dice of each color"""
+    stream = _stream("pools")
+    pools = []
+    for i in range(VARIED):
+        pool = PoolModel(stream)
+        pool.set_pool([stream.roll(5) - 1 for type in DICE_TYPES])
+        pools.append(pool)
+    return pools
+
+def _cycle(values):
+    """Returns a function giving the next of values on every call"""
+    position = [0]
+    def next_value():
+        position[0] = (position[0] + 1) % len(values)
+        return values[position[0]]
+    return next_value
+
+def _make_strings():
+    """Builds a history row's pool and result markup, never cached"""
+    rows = [
+        (tuple(pool.record.amounts()), pool.record.results())
+        for pool in _varied_pools()
+        ]
+    next_row = _cycle(rows)
+    def run():
+        amounts, results = next_row()
+        return markup._build_pool(amounts), markup._build_result(results)
+    return run
+
+def _make_strings_cached():
+    pool = PoolModel(_stream("dice"))
+    pool.set_pool([2, 1, 1, 3, 1, 1])
+    amounts = pool.record.amounts()
+    results = pool.record.results()
+    return lambda: (pool_markup(amounts), result_markup(results))
+
+def _results_by_dice():
+    """Builds the dice by dice markup of a pool, never cached"""
+    next_cells = _cycle([
+        tuple(pool.record.cells) for pool in _varied_pools()
+        ])
+    return lambda: markup._build_dice(next_cells())
+
+def _results_by_dice_cached():
+    pool = PoolModel(_stream("dice"))
+    pool.set_pool([3, 2, 2, 3, 2, 2])
+    return lambda: dice_markup(pool.all_rolls)
+
+def _history_insert(size):
+    """Appends a roll to, and reads the newest row of, a (size) roll store"""
+    store = RollStore()
+    for i in range(size):
+        store.append((2, 1, 1, 2, 0, 1), (1, -1, 0, 0), i)
+    def run():
+        store.append((2, 1, 1, 2, 0, 1), (1, -1, 0, 0))
+        return store[0]
+    return run
+
+def _reference():
+    """The workload every benchmark is measured relative to"""
+    values = list(range(200))
+    def run():
+        counts = {}
+        for value in values:
+            key = value % 7
+            counts[key] = counts.get(key, 0) + value
+        return sorted(counts.items())
+    return run
+
+def benchmarks():
+    """Returns a list of (name, setup), setup() giving the callable to time"""
+    cases = []
+    for type in DICE_TYPES:
+        for dice in (1, 10, 100):
+            cases.append((
+                "add_dice.%s.%d" % (type, dice),
+                lambda type=type, dice=dice: _add_dice(type, dice)
+                ))
+    cases.append(("crit_chart.full_range", _crit_chart))
+    cases.append(("force.force", _force))
+    for players in (1, 8):
+        cases.append((
+            "force._get_total.%d" % players,
+            lambda players=players: _get_total(players)
+            ))
+    cases.append(("history._make_strings", _make_strings))
+    cases.append(("history._make_strings.cached", _make_strings_cached))
+    cases.append(("dice_ResultsByDice.update", _results_by_dice))
+    cases.append(("dice_ResultsByDice.update.cached", _results_by_dice_cached))
+    for size in (10, 1000, 100000):
+        cases.append((
+            "history.insert.%d" % size,
+            lambda size=size: _history_insert(size)
+            ))
+    return cases
+
+def time_call(call, repeat=5):
+    """Returns the best time of a single call in seconds"""
+    timer = timeit.Timer(call)
+    number = 1
+    while timer.timeit(number) < MIN_TIME and number < 10**6:
+        number *= 10
+    return min(timer.repeat(repeat, number)) / number
+
+def measure(call, reference, repeat=5):
+    """Returns the seconds of a single call, and those relative to the
+    reference timed right before it"""
+    reference_seconds = time_call(reference, repeat)
+    seconds = time_call(call, repeat)
+    return seconds, seconds / reference_seconds
+
+def environment():
+    """Returns what a baseline has to be saved on to be compared against"""
+    return {
+        'python': "%s %d.%d" % (
+            platform.python_implementation(),
+            sys.version_info[0],
+            sys.version_info[1]
+            ),
+        'machine': platform.system() + " " + platform.machine()
+        }
+
+def load_baseline(path=BASELINE):
+    """Returns the saved baseline, empty if nothing was saved yet"""
+    try:
+        with open(path) as baseline:
+            return json.load(baseline)
+    except IOError:
+        return {}
+
+def save_baseline(seconds, relative, path=BASELINE):
+    saved = environment()
+    saved['seconds'] = seconds
+    saved['relative'] = relative
+    with open(path, 'w') as baseline:
+        json.dump(saved, baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times the dice roller against its saved baseline"
+        )
+    parser.add_argument('--only', help="only run benchmarks containing this")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+        help="slowdown allowed over the baseline, 0.5 is 50%%")
+    parser.add_argument('--save', action='store_true',
+        help="save these times as the new baseline")
+    parser.add_argument('--baseline', default=BASELINE)
+    args = parser.parse_args()
+
+    saved = load_baseline(args.baseline)
+    baseline = saved.get('relative', {})
+    compare = True
+    for key, value in environment().items():
+        if saved and saved.get(key) != value:
+            print("Baseline was saved on %s, not %s, so isn't compared"
+                % (saved.get(key), value))
+            compare = False
+
+    reference = _reference()
+    times = {}
+    relative = {}
+    regressions = 0
+    for name, setup in benchmarks():
+        if args.only and args.only not in name:
+            continue
+        call = setup()
+        seconds, relative[name] = measure(call, reference, args.repeat)
+        if compare and name in baseline:
+            for retry in range(RETRIES):
+                if relative[name] <= baseline[name] * (1 + args.tolerance):
+                    break
+                seconds, relative[name] = min(
+                    (seconds, relative[name]),
+                    measure(call, reference, args.repeat),
+                    key = lambda measured: measured[1]
+                    )
+        times[name] = seconds
+        line = "%-32s %12.2fus" % (name, seconds * 1e6)
+        if compare and name in baseline:
+            ratio = relative[name] / baseline[name]
+            line += "  %5.2fx baseline" % ratio
+            if ratio > 1 + args.tolerance:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+
+    if args.save:
+        if args.only and compare: # Keep the benchmarks that weren't run
+            for key, kept in (('seconds', times), ('relative', relative)):
+                merged = dict(saved.get(key, {}))
+                merged.update(kept)
+                kept.clear()
+                kept.update(merged)
+        save_baseline(times, relative, args.baseline)
+        print("Saved %d times to %s" % (len(times), args.baseline))
+        return 0
+    if regressions:
+        print("FAIL: %d regressions" % regressions)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
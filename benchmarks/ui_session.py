@@ -0,0 +1,287 @@
+#!/usr/bin/python
+# UI Session Benchmark
+# Scripts a GM session against the full interface, without a screen
+#
+# Builds the ATDR interface from main.py and plays a seeded session through
+# its own handlers: pools built a few dice at a time and saved, rerolls,
+# upgrades, history clicks, critical injury and force slider drags and
+# rolls. The seed picks both the events and every die rolled. Every event
+# is followed by one frame of the Kivy loop. For every kind of event this
+# reports how many widgets were created, the frame time and, where
+# tracemalloc is available, the peak memory allocated.
+#
+#   python benchmarks/ui_session.py [--rolls 200] [--seed 2013] [--json FILE]
+#
+# Kivy runs with the mock GL backend and no window, unless --window is given.
+# Tracing memory slows every event down, so only compare frame times between
+# runs on the same machine and Python.
+# Rolls are saved to a session log in a throwaway home folder, so nothing
+# is added to the real history.
+
+# Imports
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from os.path import abspath, dirname
+from time import time
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import tracemalloc
+except ImportError: # Python 2 only gets the peak of the whole process
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+# Classes
+
+class WidgetCounter(object):
+    """Counts widgets as they're created, by class name"""
+    def __init__(self):
+        self.counts = {}
+
+    def install(self):
+        """Wraps Widget.__init__, before any interface is built"""
+        from kivy.uix.widget import Widget
+        original = Widget.__init__
+        counts = self.counts
+        def counting_init(widget, **kwargs):
+            name = type(widget).__name__
+            counts[name] = counts.get(name, 0) + 1
+            original(widget, **kwargs)
+        Widget.__init__ = counting_init
+
+    def take(self):
+        """Returns the counts since the last take() and zeroes them"""
+        counts = dict(self.counts)
+        self.counts.clear()
+        return counts
+
+class EventStats(object):
+    """Totals of every event of one kind"""
+    def __init__(self):
+        self.events = 0
+        self.widgets = {} # Created, by class name
+        self.frame_times = []
+        self.peak = 0 # Most bytes allocated during a single event
+
+    def add(self, widgets, seconds, peak):
+        self.events += 1
+        for name, count in widgets.items():
+            self.widgets[name] = self.widgets.get(name, 0) + count
+        self.frame_times.append(seconds)
+        self.peak = max(self.peak, peak)
+
+    def summary(self):
+        times = sorted(self.frame_times)
+        created = sum(self.widgets.values())
+        return {
+            'events': self.events,
+            'widgets_per_event': created / float(self.events),
+            'widgets': self.widgets,
+            'mean_ms': sum(times) / len(times) * 1000,
+            'p95_ms': times[int(len(times) * .95)] * 1000,
+            'max_ms': times[-1] * 1000,
+            'peak_kb': self.peak / 1024.0
+            }
+
+# Functions
+
+def setup_environment(window=False):
+    """Sets up Kivy and the session log, before either is imported"""
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    if not window:
+        os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='atdr-bench-')
+
+def reset_peak():
+    """Starts measuring peak memory from the current allocations"""
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else: # Before Python 3.9 restarting is the only way, dropping traces
+        tracemalloc.stop()
+        tracemalloc.start()
+
+def frame():
+    """Runs one frame of the Kivy loop, clock events, layout and drawing"""
+    from kivy.base import EventLoop
+    EventLoop.idle()
+
+def drag(slider, target, step=1):
+    """Returns the values a slider passes through when dragged to target"""
+    start = int(slider.value)
+    if target < start:
+        step = -step
+    return range(start + step, target + step, step)
+
+def session(ui, rolls, rng):
+    """Yields the (kind, function, args) events of a GM session
+
+    Args:
+        ui: The ATDR interface
+
+        rolls: Dice pools built and saved
+
+        rng: random.Random choosing what the GM does
+
+    """
+    left = ui.dice.uiLeft
+    arrays = left.diceGrid.arrays
+    bottom = left.resultBottom
+    history = ui.dice.uiRight.history
+    crit = ui.crit_force.injury
+    force = ui.crit_force.force_dice.controls
+
+    for i in range(rolls):
+        # Build a pool a few dice at a time, now and then upgrading it
+        for click in range(rng.randint(1, 4)):
+            array = rng.choice(arrays)
+            yield "add_dice", array.pass_dice, (array.mainButton,)
+        if rng.random() < .2:
+            array = rng.choice([a for a in arrays if a.gradeButton])
+            yield "grade", array.pass_grade, (array.gradeButton,)
+        if rng.random() < .3:
+            yield "roll_again", bottom.roll_again, ()
+        yield "save_roll", bottom.save_roll, ()
+
+        # Every so often, reroll a pool from the history
+        if i % 10 == 9:
+            rows = [
+                row for row in history.list_view.rows_list
+                if row.pool.value is not None
+                ]
+            if rows:
+                row = rng.choice(rows)
+                yield "history_click", history.pass_dice, (row.pool,)
+
+        # Drag the critical injury sliders and roll
+        if i % 5 == 4:
+            slider = crit.controls.prevInjuriesSlider
+            for value in drag(slider, rng.randint(0, 15)):
+                yield "crit_slider", setattr, (slider, 'value', value)
+            slider = crit.controls.modSlider
+            for value in drag(slider, rng.randrange(-50, 55, 5), 5):
+                yield "crit_slider", setattr, (slider, 'value', value)
+            yield "crit_roll", crit.controls.roll, ()
+            rows = [
+                row for row in crit.historyUI.list_view.rows_list
+                if row.result.name
+                ]
+            if rows:
+                button = rng.choice(rows).result
+                yield "crit_history_click", button.pop_up_descript, ()
+
+        # Drag the force dice slider and roll
+        if i % 4 == 3:
+            slider = force.forceDiceSlider
+            for value in drag(slider, rng.randint(1, 9)):
+                yield "force_slider", setattr, (slider, 'value', value)
+            yield "force_roll", force._roll, (None,)
+
+def run(rolls, seed, window=False):
+    """Builds the interface and plays a session, returns the results"""
+    counter = WidgetCounter()
+    counter.install()
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    # Seed the dice before the interface builds its buffered streams, so
+    # the same seed rolls the same results, and makes the same widgets
+    from modules.submodules.rng import seed as seed_rolls
+    seed_rolls(seed)
+
+    start = time()
+    if window:
+        from kivy.base import EventLoop
+        EventLoop.ensure_window()
+    import main # Builds the interface of its DiceApp
+    ui = main.DiceApp.ui
+    if window:
+        EventLoop.window.add_widget(ui)
+    frame()
+    results = {
+        'startup': {
+            'seconds': time() - start,
+            'widgets': sum(counter.take().values())
+            },
+        'events': {}
+        }
+
+    stats = {}
+    for kind, function, args in session(ui, rolls, random.Random(seed)):
+        if tracemalloc is not None:
+            reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time()
+        function(*args)
+        frame()
+        seconds = time() - start
+        peak = 0
+        if tracemalloc is not None:
+            peak = tracemalloc.get_traced_memory()[1] - before
+        stats.setdefault(kind, EventStats()).add(
+            counter.take(),
+            seconds,
+            peak
+            )
+
+    for kind, kind_stats in stats.items():
+        results['events'][kind] = kind_stats.summary()
+    if resource is not None:
+        # Kilobytes on Linux, bytes on OS X
+        results['max_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return results
+
+def report(results):
+    startup = results['startup']
+    print("Startup: %.0fms, %d widgets"
+        % (startup['seconds'] * 1000, startup['widgets']))
+    print("%-20s %6s %9s %8s %8s %8s %9s" % (
+        "Event", "Count", "Widgets", "Mean ms", "p95 ms", "Max ms", "Peak KB"
+        ))
+    for kind in sorted(results['events']):
+        stats = results['events'][kind]
+        print("%-20s %6d %9.1f %8.2f %8.2f %8.2f %9.1f" % (
+            kind,
+            stats['events'],
+            stats['widgets_per_event'],
+            stats['mean_ms'],
+            stats['p95_ms'],
+            stats['max_ms'],
+            stats['peak_kb']
+            ))
+    if 'max_rss' in results:
+        print("Max RSS: %d" % results['max_rss'])
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times a scripted GM session against the interface"
+        )
+    parser.add_argument('--rolls', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=2013)
+    parser.add_argument('--window', action='store_true',
+        help="open a real window and draw every frame")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    setup_environment(args.window)
+    results = run(args.rolls, args.seed, args.window)
+    report(results)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
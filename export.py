@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# AT Dice Roller - History Export
+# Exports the saved dice, critical injury and force history
+#
+# Runs without Kivy, reading the session log without ever writing to it, so
+# it's safe to run while the app is open. Every kind of history is streamed
+# to its own file in the output folder, oldest roll first. Arrow and Parquet
+# exports need pyarrow installed.
+#
+# Usage:
+#   python export.py exports
+#   python export.py --format parquet exports
+#   python export.py --log ~/.at-diceroller --format ndjson exports
+
+# ==============================================================================
+# Imports
+# ==============================================================================
+
+import argparse
+from os.path import isdir
+from time import time
+
+from modules.submodules.history_export import WRITERS, Export,\
+    history_sources, open_log
+from modules.submodules.session_log import LOG_FOLDER
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description = "Exports the AT Dice Roller history"
+        )
+    parser.add_argument(
+        'folder',
+        help = "folder to write the exported files to"
+        )
+    parser.add_argument(
+        '--format',
+        choices = sorted(WRITERS),
+        default = "csv",
+        help = "file format (default %(default)s)"
+        )
+    parser.add_argument(
+        '--log',
+        default = LOG_FOLDER,
+        help = "session log folder (default %(default)s)"
+        )
+    args = parser.parse_args()
+
+    if not isdir(args.log):
+        parser.error("no session log in " + args.log)
+    log = open_log(args.log)
+    try:
+        export = Export(history_sources(log=log), args.folder, args.format)
+    except ValueError as error:
+        parser.error(str(error))
+
+    start = time()
+    for path in export.run():
+        print(path)
+    log.close()
+    print("%d rows in %.2fs" % (export.rows, time() - start))
+
+if __name__ == "__main__":
+    main()
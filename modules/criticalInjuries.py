@@ -4,23 +4,27 @@
 
 # Built in Modules
 
-from random import randint
-from time import strftime # For timestamping history log
+from time import localtime, strftime # For showing history log times
 
 # Kivy Modules
 
 from kivy.app import App # Base App Class
-from kivy.adapters.listadapter import ListAdapter # For History list
 from kivy.uix.gridlayout import GridLayout # Only Using Grid Layouts
 from kivy.uix.label import Label # Label Class for Returns
 from kivy.uix.button import Button # Button Class for everything else
-from kivy.uix.listview import ListItemButton, ListItemLabel, \
-        CompositeListItem, ListView # For Right Side History
 from kivy.uix.slider import Slider # For Controls
 from kivy.uix.popup import Popup # For viewing description in History
 from kivy.graphics import Canvas, Color, Rectangle # For backgrounds
 from kivy.core.image import Image # For textures
-from kivy.clock import Clock # For scheduling a deselect of the history list
+
+# Custom Modules
+
+from historyList import RecycleList # For History list
+from submodules.session_log import ArchiveList, session_log # Saved history
+from submodules.session_stats import session_stats # Luck
+from rules.crit import RESULTS, SEVERITY, crit_result # The chart
+from rules.crit_odds import crit_odds, severity_odds # Odds of each result
+from submodules.face_buffer import buffered_stream # Pre-drawn d100s
 
 # ==============================================================================
 # AT GENERIC VARIABLES
@@ -41,121 +45,16 @@ CC = "[/color]"
 HEADER_TEXT = ('Roll', 'Severity', 'Result')
 COL_SIZES = (20,20,60)
 
-# DICTs
-
-RESULTS ={
-    "Minor Nick": "The target suffers 1 strain.",
-    "Slowed Down": "The target can only act during the last allied initiative slot on his next turn.",
-    "Sudden Jolt": "The target drops whatever is in hand.",
-    "Distracted": "The target cannot perform a free maneuver during his next turn.",
-    "Off-Balance": "Add (1) Setback Die to target's next skill check.",
-    "Discouraging Wound": "Flip one light side Destiny point to the dark side (reverse if NPC).",
-    "Stunned": "The target is staggered until the end of target's next turn.",
-    "Stinger": "Increase difficulty of next check by (1).",
-    "Bowled Over": "The target is knocked prone and suffers (1) strain.",
-    "Head Ringer": "The target increases the difficulty of all Intellect and Cunning checks by (1) until the end of the encounter.",
-    "Fearsome Wound": "The target increases the difficulty of all Presence and Willpower checks by (1) until the end of the encounter.",
-    "Agonizing Wound": "The target increases the difficulty of all Brawn and Agility checks by (1) until the end of the encounter.",
-    "Slightly Dazed": "The target is disoriented until the end of the encounter.",
-    "Scattered Senses": "The target removes all Boost Die from skill checks until the end of the encounter.",
-    "Hamstrung": "The target loses their free maneuver until the end of the encounter.",
-    "Overpowered": "The target leaves himself open, and the attacker may immediately attempt another free attack against him, using the exact same pool as the original attack.",
-    "Winded": "Until the end of the encounter, the target cannot voluntarily suffer strain to activate any abilities or gain additional maneuvers.",
-    "Compromised": "Increase difficulty of all skill checks by (1) until the end of the encounter.",
-    "At the Brink": "The target suffers (1) strain each time they perform an action",
-    "Crippled": "One of the target's limbs (selected by the GM) is crippled until healed or replaced. Increase difficulty of all checks that require use of that limb by one.",
-    "Maimed": "One of the target's limbs (selected by the GM) is permanently lost. Unless the target has a cybernetic replacement, the target cannot perform actions that would require the use of that limb. All other actions gain (1) Setback Die.",
-    "Horrific Injury": "Randomly roll a 1d10 to determine one of the target's characteristics 1-3 for Brawn, 4-6 for Agility, 7 for Intellect, 8 for Cunning, 9 for Presence, 10 for Willpower. Until this Critical Injury is healed, treat that characteristic as (1) point lower.",
-    "Temporarily Lame": "Until this Critical Injury is healed, the target cannot perform more than one maneuver during their turn.",
-    "Blinded": "The target can no longer see. Upgrade the difficulty of all checks twice. Upgrade the difficulty of all Perception and Vigilance checks three times.",
-    "Knocked Senseless": "The target is staggered for the remainder of the encounter.",
-    "Gruesome Injury": "Randomly roll a 1d10 to determine one of the target's characteristics 1-3 for Brawn, 4-6 for Agility, 7 for Intellect, 8 for Cunning, 9 for Presence, 10 for Willpower. That characteristic is permanently reduced by (1), to a minimum of (1).",
-    "Bleeding Out": "Every round, the target suffers (1) wound and (1) strain at the beginning of their turn. For every five wounds they suffer beyond their wound threshold, they suffer one additional Critical Injury (cannot suffer this one again).",
-    "The End is Nigh": "The target will die after the last Initiative slot during the next round.",
-    "Dead": "Complete, obliterated death"
-    }
-
-SEVERITY = [None, 'Easy', 'Average', 'Hard', 'Daunting', '-']
+# For OddsDisplay, how many of the likeliest named results are listed
+ODDS_RESULTS = 3
+
+# The shared history popup, see crit_detail_popup()
+_DETAIL_POPUP = []
 
 # ==============================================================================
 # FUNCTIONS
 # ==============================================================================
 
-def crit_chart(roll):
-    """Takes a roll value and interprets it according to the CI_chart"""
-    
-    if roll >= 151:
-        severity = 5
-    elif roll >= 126:
-        severity = 4
-    elif roll >= 91:
-        severity = 3
-    elif roll >= 41:
-        severity = 2
-    else:
-        severity = 1
-    
-    if roll >= 151:
-        name = "Dead"
-    elif roll >= 141:
-        name = "The End is Nigh"
-    elif roll >= 131:
-        name = "Bleeding Out"
-    elif roll >= 126:
-        name = "Gruesome Injury"
-    elif roll >= 121:
-        name = "Knocked Senseless"
-    elif roll >= 116:
-        name = "Blinded"
-    elif roll >= 111:
-        name = "Temporarily Lame"
-    elif roll >= 106:
-        name = "Horrific Injury"
-    elif roll >= 101:
-        name = "Maimed"
-    elif roll >= 95:
-        name = "Crippled"
-    elif roll >= 91:
-        name = "At the Brink"
-    elif roll >= 86:
-        name = "Compromised"
-    elif roll >= 81:
-        name = "Winded"
-    elif roll >= 76:
-        name = "Overpowered"
-    elif roll >= 71:
-        name = "Hamstrung"
-    elif roll >= 66:
-        name = "Scattered Senses"
-    elif roll >= 61:
-        name = "Slightly Dazed"
-    elif roll >= 56:
-        name = "Agonizing Wound"
-    elif roll >= 51:
-        name = "Fearsome Wound"
-    elif roll >= 46:
-        name = "Head Ringer"
-    elif roll >= 41:
-        name = "Bowled Over"
-    elif roll >= 36:
-        name = "Stinger"
-    elif roll >= 31:
-        name = "Stunned"
-    elif roll >= 26:
-        name = "Discouraging Wound"
-    elif roll >= 21:
-        name = "Off-Balance"
-    elif roll >= 16:
-        name = "Distracted"
-    elif roll >= 11:
-        name = "Sudden Jolt"
-    elif roll >= 6:
-        name = "Slowed Down"
-    else:
-        name = "Minor Nick"
-    
-    return severity, name
-
 def new_pos(old_size = (1,1), new_size = (1,1), pos = (1,1), pos_mult = (0,0)):
     """Shortcut for adjusting a position based on widget size changes"""
     new_pos = (
@@ -164,6 +63,12 @@ def new_pos(old_size = (1,1), new_size = (1,1), pos = (1,1), pos_mult = (0,0)):
         )
     return new_pos
 
+def crit_detail_popup():
+    """Returns the shared crit_DetailPopup, building it on first use"""
+    if not _DETAIL_POPUP:
+        _DETAIL_POPUP.append(crit_DetailPopup())
+    return _DETAIL_POPUP[0]
+
 # ==============================================================================
 # GUI CLASSES
 # ==============================================================================
@@ -285,12 +190,10 @@ class crit_ResultDisplay(GridLayout):
 
 class crit_PopupLabel(Label):
     """This is the text display inside the results history popup"""
-    def __init__(self, severity, name, **kwargs):
+    def __init__(self, severity=0, name='', **kwargs):
         super(crit_PopupLabel, self).__init__(**kwargs)
-        self.severity = severity
-        self.name = name
-        self.text = RESULTS[self.name] + "\n\n" + SEVERITY[severity]\
-            + "  &bl;" + SWF + DC + "d"*self.severity + SWFC + CC + "&br;"
+        self.severity = None
+        self.name = None
         
         # Forces a softwrap
         self.text_size = (self.size[0]*.96, None)
@@ -301,59 +204,156 @@ class crit_PopupLabel(Label):
         self.bind(
             size = self._update_text
             )
+        
+        if name:
+            self.set_result(severity, name)
+    
+    def set_result(self, severity, name):
+        """Shows the description of a result"""
+        self.severity = severity
+        self.name = name
+        self.text = RESULTS[self.name] + "\n\n" + SEVERITY[severity]\
+            + "  &bl;" + SWF + DC + "d"*self.severity + SWFC + CC + "&br;"
     
     def _update_text(self, instance, value):
         """This updates the text wrap"""
         self.text_size = (self.size[0]*.96, None)
 
-class crit_ListItemButton(ListItemButton):
-    """The button for the HistoryUI list. Clicking this creates a popup"""
-    def __init__(self, severity, name, **kwargs):
-        super(crit_ListItemButton, self).__init__(**kwargs)
-        self.severity = severity
-        self.name = name
-        self.text = self.name
-        self.on_press = self.pop_up_descript
-        
-        self.popup_content = GridLayout(
-            rows = 2
-            )
-        
-        self.popup = Popup(
-            size_hint_x = .6,
-            size_hint_y = .4,
-            title = self.name,
-            title_size = 18,
-            content = self.popup_content,
-            )
-        
-        # Popup and Child Widgets
-        self.popup_button = Button(
+class crit_DetailPopup(Popup):
+    """The popup describing a history result, shared by every history row
+    
+    Only one is ever built, by crit_detail_popup(), the first time a row
+    is clicked. show() fills it with the clicked row's result.
+    
+    """
+    def __init__(self, **kwargs):
+        super(crit_DetailPopup, self).__init__(**kwargs)
+        self.size_hint_x = .6
+        self.size_hint_y = .4
+        self.title = ''
+        self.title_size = 18
+        
+        self.label = crit_PopupLabel()
+        self.button = Button(
             text = "Dismiss",
             size_hint_y = 20,
-            on_press = self.popup.dismiss
+            on_press = self.dismiss
             )
         
-        self.popup_content.add_widget(crit_PopupLabel(
-            severity = self.severity,
-            name = self.name
-            ))
+        self.content = GridLayout(
+            rows = 2
+            )
+        self.content.add_widget(self.label)
+        self.content.add_widget(self.button)
+    
+    def show(self, severity, name):
+        """Opens the popup on a result"""
+        self.title = name
+        self.label.set_result(severity, name)
+        self.open()
+
+class crit_ListItemButton(Button):
+    """The button for the HistoryUI list. Clicking this opens a popup"""
+    def __init__(self, severity=0, name='', **kwargs):
+        super(crit_ListItemButton, self).__init__(**kwargs)
+        self.severity = None
+        self.name = None
+        self.on_press = self.pop_up_descript
         
-        self.popup_content.add_widget(self.popup_button)
+        if name:
+            self.set_result(severity, name)
+    
+    def set_result(self, severity, name):
+        """Points the button at a (new) result"""
+        self.severity = severity
+        self.name = name
+        self.text = self.name
 
     def pop_up_descript(self):
-        self.popup.open()
+        if self.name: # Blank rows have no description
+            crit_detail_popup().show(self.severity, self.name)
+
+class crit_HistoryRow(GridLayout):
+    """A single, recycled row of the HistoryUI list"""
+    def __init__(self, historyUI, **kwargs):
+        super(crit_HistoryRow, self).__init__(**kwargs)
+        self.cols = 4
+        
+        # Row elements have the same size_hint_x as the header elements
+        self.time = Label(
+            size_hint_x = historyUI.header_time.size_hint_x
+            )
+        self.roll = Label(
+            size_hint_x = historyUI.header_roll.size_hint_x,
+            markup = True,
+            valign = 'middle'
+            )
+        self.severity = Label(
+            size_hint_x = historyUI.header_severity.size_hint_x,
+            markup = True
+            )
+        self.result = crit_ListItemButton(
+            size_hint_x = historyUI.header_results.size_hint_x,
+            background_color = [.6,.6,.6,1],
+            markup = True
+            )
+        
+        for widget in (
+            self.time,
+            self.roll,
+            self.severity,
+            self.result
+            ):
+            self.add_widget(widget)
+    
+    def set_row(self, item):
+        """Shows a history item, or hides the row if given None"""
+        if item is None:
+            self.opacity = 0
+            self.result.set_result(0, '')
+            return
+        # item = ("HH:MM", (previous, mod, roll), severity, name)
+        self.opacity = 1
+        self.time.text = item[0]
+        self.roll.text = "[size=12](" + str(item[1][0]) +  "*10"\
+            + ") + " + str(item[1][1]) + " + "\
+            + str(item[1][2]) + "[b] = [/size][size=24]"\
+            + str(sum(item[1])) + "[/b][/size]"
+        self.severity.text = "[size=12]" + SEVERITY[item[2]] + "  &bl;"\
+            + SWF + DC + "d"*item[2] + SWFC + CC + "&br;[/size]"
+        self.result.set_result(item[2], item[3])
 
 class crit_HistoryList(object):
     """History list object"""
     def __init__(self, parent):
         self.parent = parent
-        self.history = []
+        # Newest first. Rolls are saved to, and earlier sessions read from,
+        # the session log.
+        self.log = session_log()
+        if self.log is not None:
+            self.history = ArchiveList(self.log.crits, self._load, self._save)
+        else: # No writable log folder, history only lasts this session
+            self.history = ArchiveList()
     
     def update_history(self, historySet):
         """Updates the history list and forces a HistoryUI update"""
-        self.history.insert(0, historySet)
+        self.history.append(historySet)
         self.parent.update_list()
+    
+    def _load(self, record):
+        """Turns a session log record into a history item"""
+        name = record[5].rstrip(b'\0').decode('utf-8')
+        return (
+            strftime("%H:%M", localtime(record[0])),
+            (record[1], record[2], record[3]),
+            record[4],
+            name
+            )
+    
+    def _save(self, historySet):
+        """Writes a history item to the session log"""
+        previous, mod, roll = historySet[1]
+        self.log.log_crit(previous, mod, roll, historySet[2], historySet[3])
 
 # ==============================================================================
 # CRITICAL INJURY TOP LEVEL
@@ -401,74 +401,14 @@ class crit_HistoryUI(GridLayout):
         self.add_widget(self.header)
         # End Header Section
         
-        # This is an args based on the 'list_composite' kivy example
-        # I really don't understand it terribly well, but it's working correctly
-        #
-        # list = the 'data' list given to the list_adapter below
-        
-        self.args_converter = lambda row_index, list: {
-            'text': list,
-            'size_hint_y': None,
-            'height': 35, # this is the height of the rows
-            'cls_dicts': [ # Each cls entry is an item in the row
-                {'cls': ListItemLabel,
-                    'kwargs': { # the keywords used during item creation
-                        'text': list[0],
-                        'size_hint_x': self.header_time.size_hint_x
-                        }
-                    },
-                {'cls': ListItemLabel,
-                    'kwargs': {
-                        'text': "[size=12](" + str(list[1][0]) +  "*10"\
-                            + ") + " + str(list[1][1]) + " + "\
-                            + str(list[1][2]) + "[b] = [/size][size=24]"\
-                            + str(sum(list[1])) + "[/b][/size]",
-                        'size_hint_x': self.header_roll.size_hint_x,
-                        'markup': True,
-                        'valign': 'middle'
-                        }
-                    },
-                {'cls': ListItemLabel,
-                    'kwargs': {
-                        'text': "[size=12]" + SEVERITY[list[2]] + "  &bl;"\
-                            + SWF + DC + "d"*list[2] + SWFC + CC\
-                            + "&br;[/size]",
-                        'size_hint_x': self.header_severity.size_hint_x,
-                        'markup': True
-                        }
-                    },
-                {'cls': crit_ListItemButton,
-                    'kwargs': {
-                        'severity': list[2],
-                        'name': list[3],
-                        'text': '',
-                        'size_hint_x': self.header_results.size_hint_x,
-                        'deselected_color': [.6,.6,.6,1],
-                        'selected_color': [.9,.9,.9,1],
-                        # ListItemButton will always stay selected, and doesn't
-                        # provide an API for deselecting.
-                        # Therefore, we rebuild the entire list after
-                        # the user touches one button.
-                        #
-                        # Sloppy, but seems to be the only way.
-                        'on_release': self.sch_clear_selection,
-                        'markup': True
-                        }
-                    },
-            ]}
-
-        self.list_adapter = ListAdapter(
-            allow_empty_selection = True,
-            selection_mode = 'single',
-            data = self.historyList.history,
-            args_converter = self.args_converter,
-            cls=CompositeListItem
-            )
-
-        self.list_view = ListView(
-            adapter=self.list_adapter,
+        # The list only ever builds enough crit_HistoryRows to fill itself,
+        # scrolling and new rolls just hand those rows different history.
+        self.list_view = RecycleList(
+            row_factory = lambda: crit_HistoryRow(self),
+            row_height = 35, # this is the height of the rows
             size_hint_y = 85
             )
+        self.list_view.data = self.historyList.history
 
         self.add_widget(self.list_view)
         
@@ -480,26 +420,9 @@ class crit_HistoryUI(GridLayout):
                     self.pos, (.5, .87))
                 )
     
-    def sch_clear_selection(self, ignore):
-        """Schedules the list to be updated"""
-        Clock.schedule_once(self.update_list, .1)
-    
     def update_list(self, ignore=''):
-        """Causes the list to be rebuilt"""
-        # We remove and add ONLY the list_view, not touching the header.
-        self.remove_widget(self.list_view)
-        self.list_adapter = ListAdapter(
-            allow_empty_selection = True,
-            selection_mode = 'single',
-            data = self.historyList.history,
-            args_converter = self.args_converter,
-            cls=CompositeListItem
-            )
-        self.list_view = ListView(
-            adapter=self.list_adapter,
-            size_hint_y = 97
-            )
-        self.add_widget(self.list_view)
+        """Shows an item that was just added to the history"""
+        self.list_view.prepend()
     
     def _update_lines(self, instance, value):
         horz1_new_size = (instance.size[0]*.98, 1)
@@ -560,16 +483,19 @@ class crit_ResultBox(GridLayout):
         self._resultKey = ''
     
     def roll(self, ignore=''):
-        """Saves current, grabs the slider values, randint()s, _set_result()"""
+        """Saves current, grabs the slider values, rolls, _set_result()"""
         if self._roll:
             self._save_roll()
             self._clear_result()
         previous = int(self.parent.controls.prevInjuriesSlider.value)
         mod = int(self.parent.controls.modSlider.value)
-        roll = randint(1,100)
-        severity, resultKey = crit_chart(previous*10 + mod + roll)
+        roll = buffered_stream("crit").roll(100)
+        severity, resultKey = crit_result(previous*10 + mod + roll)[:2]
         
         self._set_result(previous, mod, roll, severity, resultKey)
+        # Counted as soon as it's rolled, it only reaches the history once
+        # the next crit replaces it
+        session_stats().add_crit(previous, mod, severity)
         self.update()
     
     def _save_roll(self):
@@ -768,6 +694,82 @@ class crit_Controls(GridLayout):
             markup = True
             )
         self.sliders.add_widget(self.modReadout, index = 0)
+        if self.parent is not None:
+            self.parent.odds.update()
+
+# ==============================================================================
+# ODDS DISPLAY
+# ==============================================================================
+
+class crit_OddsDisplay(GridLayout):
+    """Chance of each severity for the current slider settings, and of the
+    likeliest named results"""
+    def __init__(self, **kwargs):
+        super(crit_OddsDisplay, self).__init__(**kwargs)
+        self.rows = 2
+        
+        # One persistent label per severity, Easy to Dead
+        self.severityGrid = GridLayout(
+            cols = 5,
+            size_hint_y = 60
+            )
+        self.oddsLabels = []
+        for severity in range(1, len(SEVERITY)):
+            self.oddsLabels.append(Label(
+                markup = True,
+                halign = 'center'
+                ))
+            self.severityGrid.add_widget(self.oddsLabels[-1])
+        self.add_widget(self.severityGrid)
+        
+        # The ODDS_RESULTS likeliest results, by name
+        self.resultsLabel = Label(
+            markup = True,
+            halign = 'center',
+            size_hint_y = 40
+            )
+        self.add_widget(self.resultsLabel)
+        
+        self.bind(
+            size = self._update_bg,
+            pos = self._update_bg
+            )
+        
+        # Same BG as the controls, so the odds read as part of them
+        with self.canvas.before:
+            Color(.033, .149, .202)
+            self.bg = Rectangle(
+                size = self.size,
+                pos = self.pos
+                )
+    
+    def update(self):
+        """Looks up the precomputed odds of the sliders' values"""
+        controls = self.parent.controls
+        previous = int(controls.prevInjuriesSlider.value)
+        mod = int(controls.modSlider.value)
+        odds = severity_odds(previous, mod)
+        for severity in range(1, len(SEVERITY)):
+            if severity < 5:
+                name = SEVERITY[severity]
+            else:
+                name = "Dead"
+            self.oddsLabels[severity - 1].text = "[size=12]" + name\
+                + "[/size]\n[b]" + str(int(round(odds[severity] * 100)))\
+                + "%[/b]"
+        # Likeliest first, ties in alphabetical order
+        results = sorted(
+            crit_odds(previous, mod).items(),
+            key = lambda result: (-result[1], result[0])
+            )[:ODDS_RESULTS]
+        self.resultsLabel.text = "[size=12]Most likely: " + ",  ".join(
+            name + " [b]" + str(int(round(chance * 100))) + "%[/b]"
+            for name, chance in results
+            ) + "[/size]"
+    
+    def _update_bg(self, instance, value):
+        self.bg.size = instance.size
+        self.bg.pos = instance.pos
         
 
 # ==============================================================================
@@ -778,18 +780,21 @@ class crit_UI(GridLayout):
     """Contains both the result box and the history view"""
     def __init__(self, **kwargs):
         super(crit_UI, self).__init__(**kwargs)
-        self.rows = 3
+        self.rows = 4
         self.spacing = 10
         
         self.resultBox = crit_ResultBox(
             size_hint_y = 20
             )
         self.controls = crit_Controls(
-            size_hint_y = 40
+            size_hint_y = 33
+            )
+        self.odds = crit_OddsDisplay(
+            size_hint_y = 11
             )
         self.historyUI_Grid = GridLayout(
             cols = 3,
-            size_hint_y = 40,
+            size_hint_y = 36,
             )
         self.historyUI = crit_HistoryUI(
             size_hint_x = 96
@@ -803,8 +808,11 @@ class crit_UI(GridLayout):
             ))
         
         self.add_widget(self.controls)
+        self.add_widget(self.odds)
         self.add_widget(self.resultBox)
         self.add_widget(self.historyUI_Grid)
+        
+        self.odds.update()
 
 
 if __name__ == '__main__':
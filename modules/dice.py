@@ -7,27 +7,40 @@
 # Imports
 # ==============================================================================
 
-from time import strftime # For timestamping history log
 from sys import path # For getting textures in locally
+from os.path import join # For export folders
+from time import localtime, strftime # For showing history log times
 
 # Kivy Imports
 
 from kivy.app import App # Base App Class
-from kivy.adapters.listadapter import ListAdapter
 from kivy.uix.gridlayout import GridLayout # Only Using Grid Layouts
 from kivy.uix.label import Label # Label Class for Returns
 from kivy.uix.button import Button # Button Class for everything else
 from kivy.uix.accordion import Accordion, AccordionItem # For Right Side
-from kivy.uix.listview import ListItemButton, ListItemLabel, \
-        CompositeListItem, ListView # For Right Side History
 from kivy.graphics import Canvas, Color, Rectangle # For backgrounds
-from kivy.core.image import Image # For textures
-from kivy.clock import Clock # For scheduling a deselect of the history list
+from kivy.clock import Clock # For exporting a step per frame
 
 # Custom Modules
 
-from submodules.sw_dice import add_dice # Star Wars Dice Rolls
-from submodules.color import rgb_to_linear, rgb_to_hex, color_markup
+from historyList import RecycleList # For Right Side History
+from rules.markup import COL_ABILITY, COL_PROFICIENCY, COL_BOOST,\
+    COL_DIFFICULTY, COL_CHALLENGE, COL_SETBACK # 0-255 dice colors
+from rules.crit import SEVERITY # Crit severity names
+from rules.markup import B, BC # Markup Shortcuts
+from rules.markup import dice_markup, halfpool_markup, pool_markup,\
+    result_markup # Markup builders
+from rules.pool import DICE_TYPES, RESULT_TYPES, COMMON_POOLS, PoolModel
+from rules.pool import downgrade_pool, upgrade_pool # Grade changes
+from submodules.face_buffer import buffered_stream # Pre-drawn dice
+from submodules.history_export import EXPORT_FOLDER, Export,\
+    history_sources # History export
+from submodules.pool_stats import PoolOdds, PoolStatsCache # Pool odds
+from submodules.roll_store import RollStore # History storage
+from submodules.session_log import session_log # Saved history
+from submodules.session_stats import DICE_FIELDS, session_stats # Luck
+from submodules.color import rgb_to_linear
+from submodules.textures import get_texture, use_atlas # Shared textures
 
 
 # ==============================================================================
@@ -36,31 +49,6 @@ from submodules.color import rgb_to_linear, rgb_to_hex, color_markup
 
 # Colors
 
-# 0-255 colors from Photoshop
-COL_ABILITY = [70, 165, 52]
-COL_PROFICIENCY = [255, 250, 20]
-COL_BOOST = [169, 235, 255]
-COL_DIFFICULTY = [135, 62, 173]
-COL_CHALLENGE = [230, 56, 56]
-COL_SETBACK = [80, 80, 80]
-
-# Creates HTML ready hexes for markup
-HEX_ABILITY = rgb_to_hex(COL_ABILITY)
-HEX_PROFICIENCY = rgb_to_hex(COL_PROFICIENCY)
-HEX_BOOST = rgb_to_hex(COL_BOOST)
-HEX_DIFFICULTY = rgb_to_hex(COL_DIFFICULTY)
-HEX_CHALLENGE = rgb_to_hex(COL_CHALLENGE)
-HEX_SETBACK = rgb_to_hex(COL_SETBACK)
-
-HEX_COLORS = [
-    HEX_ABILITY,
-    HEX_PROFICIENCY,
-    HEX_BOOST,
-    HEX_DIFFICULTY,
-    HEX_CHALLENGE,
-    HEX_SETBACK
-    ]
-
 # Creates 0-1 linear colors for Kivy. Conversion seemed dark, added mult
 LIN_ABILITY = rgb_to_linear(COL_ABILITY, 2)
 LIN_PROFICIENCY = rgb_to_linear(COL_PROFICIENCY, 2.45)
@@ -78,56 +66,6 @@ LIN_COLORS = [
     LIN_SETBACK
     ]
 
-# Markup Shortcuts
-
-SWF = "[font=fonts/sw_symbols.ttf]"
-SWFC = "[/font]"
-COL = color_markup(HEX_COLORS)
-CC = "[/color]"
-B = "[b]"
-BC = "[/b]"
-
-# TYPES
-
-DICE_TYPES = [
-    "ability",
-    "proficiency",
-    "boost",
-    "difficulty",
-    "challenge",
-    "setback"
-    ]
-
-RESULT_TYPES = [
-    "success",
-    "failure",
-    "advantage",
-    "threat",
-    "triumph",
-    "despair"
-    ]
-
-# Controls the Common Pools button grid
-COMMON_POOLS = [
-    [4, 0, 0],
-    [5, 0, 0],
-    [6, 0, 0],
-    [1, 1, 0],
-    [2, 1, 0],
-    [3, 1, 0],
-    [4, 1, 0],
-    [5, 1, 0],
-    [1, 2, 0],
-    [2, 2, 0],
-    [3, 2, 0],
-    [4, 2, 0],
-    [1, 3, 0] ,
-    [2, 3, 0],
-    [0, 4, 0],
-    [1, 4, 0],
-    [0, 5, 0]
-    ]
-
 # Textures
 
 # Larger textures for result backgrounds
@@ -147,6 +85,24 @@ TEXTURE_LIST = [
     TEX_DESPAIR
     ]
 
+# Optional atlas packing every texture in TEXTURE_LIST, see textures module
+TEX_ATLAS = path[0] + "/tex/" + "results.atlas"
+use_atlas(TEX_ATLAS)
+
+# Odds
+
+# Shared cache of pool odds, prewarmed with COMMON_POOLS by dice_CommonPools
+POOL_STATS = PoolStatsCache()
+
+# Upgrade and downgrade buttons, by the dice array showing them. Each holds
+# the PoolModel method and the bad flag it's called with.
+GRADE_BUTTONS = {
+    "ability": ("upgrade", "n"),
+    "proficiency": ("downgrade", "n"),
+    "difficulty": ("upgrade", "y"),
+    "challenge": ("downgrade", "y")
+    }
+
 # ==============================================================================
 # Functions
 # ==============================================================================
@@ -171,318 +127,116 @@ class RollHistory(object):
         # Parent Object
         self.parent = parent
         
-        # Master History List
-        self.history = []
+        # Master History Store
+        # Columnar and append only, index 0 is the newest roll. Markup
+        # strings are only built by get_row() for rows being displayed.
+        # Rolls are saved to, and earlier sessions read from, the session log.
+        log = session_log()
+        if log is not None:
+            self.history = RollStore(log.dice)
+        else: # No writable log folder, history only lasts this session
+            self.history = RollStore()
+        
+        # Running totals of this session's rolls against their odds
+        self.stats = session_stats()
     
     def add_roll(self, instance):
         """Saves roll_history"""
-        current_roll = []
-        current_time = strftime("%H:%M")
-        current_roll.append(current_time)
-        
-        dice_amounts = []
-        for i in self.parent.all_rolls:
-            dice_amounts.append(i[0])
-        current_roll.append(dice_amounts)
+        record = instance.record
+        amounts = record.amounts()
+        results = record.results()
+        
+        # Append to the store, it timestamps the roll for us
+        self.history.append(amounts, results)
+        
+        # The stats only take this roll and its odds, never the history
+        odds = instance.odds
+        odds.set_pool(amounts)
+        self.stats.add_roll(
+            results,
+            odds.expected(),
+            odds.percentile(results[0])
+            )
         
-        results = []
-        results.append(instance.pool_success)
-        results.append(instance.pool_advantage)
-        results.append(instance.pool_triumph)
-        results.append(instance.pool_despair)
-        current_roll.append(results)
+        # Now we need to force the history list to update
+        self.parent.parent.parent.uiRight.history.update_list()
+    
+    def get_row(self, index):
+        """Returns a displayable history row, newest first"""
+        roll = self.history[index]
+        current_roll = []
+        current_roll.append(strftime("%H:%M", localtime(roll[0])))
+        current_roll.append(list(roll[1]))
+        current_roll.append(list(roll[2]))
         # We're left with the following:
-        # ("HH:MM", [0,0,0,0,0,0], [0,0,0,0])
+        # ["HH:MM", [0,0,0,0,0,0], [0,0,0,0]]
         #   Time     Dice Amounts   Results
         
         # Now we need to insert a string for Dice Amounts and Results
-        current_roll = self._make_strings(current_roll)
-        
-        # Now our item looks like:
-        # ("HH:MM", [0,0,0,0,0,0], "poolstring", [0,0,0,0], "resultstring")
-        
-        # Insert at top of rollHistory list.
-        self.history.insert(0, current_roll)
-        
-        # Now we need to force the history list to update
-        self.parent.parent.parent.uiRight.history.update_list()
+        # Our item then looks like:
+        # ["HH:MM", [0,0,0,0,0,0], "poolstring", [0,0,0,0], "resultstring"]
+        return self._make_strings(current_roll)
+    
+    def __len__(self):
+        return len(self.history)
+    
+    def __getitem__(self, index):
+        return self.get_row(index)
     
     def _make_strings(self, history_item):
         """Takes a single history item and adds string conversions"""
         
-        pool = history_item[1]
-        results = history_item[2]
-        
-        pool_str = ""
-        
-        # If either pool side has more than 6 dice, we count by numbers
-        if pool[0] + pool[1] + pool[2] > 6 or pool[3] + pool[4] + pool[5] > 6:
-        
-            # Good Side
-            if pool[1]: # Proficiency
-                pool_str += COL[1] + str(pool[1]) + SWF + "c" + SWFC + CC
-            if pool[0]: # Ability
-                pool_str += COL[0] + str(pool[0]) + SWF + "d" + SWFC + CC
-            if pool[2]: # Boost
-                pool_str += COL[2] + str(pool[2]) + SWF + "b" + SWFC + CC
-                
-            pool_str += " | "
-            
-            # Bad Side
-            if pool[4]: # Challenge
-                pool_str += COL[4] + str(pool[4]) + SWF + "c" + SWFC + CC
-            if pool[3]: # Difficulty
-                pool_str += COL[3] + str(pool[3]) + SWF + "c" + SWFC + CC
-            if pool[5]: # Setback
-                pool_str += COL[5] + str(pool[5]) + SWF + "b" + SWFC + CC
-        
-        # Numbers by visual:
-        else:
-            pool_str += SWF
-            pool_str += COL[1] + ("c" * pool[1]) + CC # Proficiency
-            pool_str += COL[0] + ("d" * pool[0]) + CC # Ability
-            pool_str += COL[2] + ("b" * pool[2]) + CC # Boost
-            pool_str += SWFC + " | " + SWF
-            pool_str += COL[4] + ("c" * pool[4]) + CC # Challenge
-            pool_str += COL[3] + ("d" * pool[3]) + CC # Difficulty
-            pool_str += COL[5] + ("b" * pool[5]) + CC # Setback
-            pool_str += SWFC
-
-        result_str = ""
-        result_str += B
-        
-        # Success vs Failure
-        if results[0] > 0:
-            result_str += COL[0] + str(results[0]) + SWF + "s" + CC + SWFC
-        elif results[0] < 0:
-            result_str += COL[3] + str(results[0]*-1) + SWF + "f" + CC + SWFC
-
-        # Threat vs Advantage
-        if results[1] > 0:
-            result_str += COL[2] + "  " + str(results[1])\
-                + SWF + "a" + CC + SWFC
-        elif results[1] < 0:
-            result_str += COL[5] + "  " + str(results[1]*-1)\
-                + SWF + "t" + CC + SWFC
-        
+        pool_str = pool_markup(history_item[1])
+        result_str = result_markup(history_item[2])
         
-        if results[2]: # Triumph
-            result_str += COL[1] + "  " + str(results[2])\
-                + SWF + "x" + CC + SWFC
-        
-        if results[3]: # Despair
-            result_str += COL[4] + "  " + str(results[3])\
-                + SWF + "y" + CC + SWFC
-        
-        
-        result_str += BC
-
         history_item.insert(3, result_str)
         history_item.insert(2, pool_str)
         
         return history_item
 
-class DicePool(object):
+class DicePool(PoolModel):
+    """The pool model, refreshing the dice UI and saving to its history"""
     def __init__(self, parent):
         
         # Parent Object
         self.parent = parent
         
-        # Roll Variables
-        self.ability_rolls = [0,0,0]
-        self.proficiency_rolls = [0,0,0,0]
-        self.boost_rolls = [0,0,0]
-        self.difficulty_rolls = [0,0,0]
-        self.challenge_rolls = [0,0,0,0]
-        self.setback_rolls = [0,0,0]
+        # Clicks take their dice from faces drawn in the background
+        super(DicePool, self).__init__(buffered_stream("dice"))
         
+        # Odds of the current dice amounts, moved along a die at a time
+        self.odds = PoolOdds()
         
-        # Totals
-        self.pool_success = 0
-        self.pool_advantage = 0
-        self.pool_triumph = 0
-        self.pool_despair = 0
-
         # History Object
         self.rollHistory = RollHistory(self)
-        
-    def save_roll(self):
-        """Saves current roll to roll history"""
-        
-        save = False
-        for roll in self.all_rolls: # Make sure we don't save an empty pool
-            for dice in roll:
-                if dice > 0:
-                    save = True
-        if save:
-            self.rollHistory.add_roll(self)
-            self.reset()
     
-    def reset(self):
-        
-        # Roll Variables
-        self.ability_rolls = [0,0,0]
-        self.proficiency_rolls = [0,0,0,0]
-        self.boost_rolls = [0,0,0]
-        self.difficulty_rolls = [0,0,0]
-        self.challenge_rolls = [0,0,0,0]
-        self.setback_rolls = [0,0,0]
-        
-        self._update_all_rolls()
-        
-        # Totals
-        self.pool_success = 0
-        self.pool_advantage = 0
-        self.pool_triumph = 0
-        self.pool_despair = 0
-        
+    def refresh_ui(self):
+        self.odds.set_pool(self.dice_amounts())
         self.parent.parent.update_all()
     
+    def record_roll(self):
+        self.rollHistory.add_roll(self)
+    
     def reset_one(self, instance=None):
-        """Zeroes and resets a single dice class"""
-        str_type = instance.type
-        type = DICE_TYPES.index(str_type)
-        if type == 0:
-            self.ability_rolls = [0,0,0]
-        elif type == 1:
-            self.proficiency_rolls = [0,0,0,0]
-        elif type == 2:
-            self.boost_rolls = [0,0,0]
-        elif type == 3:
-            self.difficulty_rolls = [0,0,0]
-        elif type == 4:
-            self.challenge_rolls = [0,0,0,0]
-        elif type ==5:
-            self.setback_rolls = [0,0,0]
-        self._update_all_rolls()
-        self.parent.parent.update_all()
+        """Zeroes and resets the dice class of a button"""
+        self.reset_type(instance.type)
     
     def add_dice(self, instance):
-        full_pool = [0,0,0,0,0,0]
-        type = DICE_TYPES.index(instance.type)
-        full_pool[type] = instance.value
-        self.set_pool(full_pool)
-    
-    def set_pool(self, pool=(0,0,0,0,0,0), reset="n"):
-        """Sets the dice pool to a specific amount and rolls"""
-        if reset == "y": # When getting a history pool, we want to reset
-            self.save_roll()
-        for i in range(6):
-            dice_num = pool[i]
-            dice_type = DICE_TYPES[i]
-            result_list = []
-            for result in add_dice(dice_num, dice_type):
-                result_list.append(result)
-            if len(result_list) < 5: # Most dice only return 4 results
-                result_list.append(0)
-            # The result list now reads:
-            # 0 - Type
-            # 1 - Number of those dice rolled
-            # 2 - Success or Fail
-            # 3 - Advantage or Threat
-            # 4 - Triumph or Despair
-            # Update dice results takes each dice and, by type, updates
-            # the type rolls, then calls for an update_all()
-            # This way all the pool amounts and results get updated.
-            self._update_dice_results(
-                result_list[0],
-                result_list[1],
-                result_list[2],
-                result_list[3],
-                result_list[4]
-                )
-    
-    def _update_dice_results(self, type = "", number = 0, success = 0,\
-        advantage = 0, special = 0):
-        """Updates the global variables with dice results
-    
-        Args:
-            type: One of the dice types from DICE_TYPES, used to determine
-                what roll list to affect
-        
-            number: Amount of dice that were rolled
-        
-            success: Amount of Success/Failure that was generated. Based on
-                the type, this might be subtracted from the overall number
-        
-            advantage: Amount of Advantage/Threat that was generated. Based
-                on the type, this might be subtracted from the overall number
-        
-            special: Either Triumph or Despair, based on the type given. Will
-                never be subtracted, as they do not cancel each other out.
+        self.add_type(instance.type, instance.value)
     
-        """
+    def change_grade(self, instance):
+        """Upgrades or downgrades the pool, as set by GRADE_BUTTONS"""
+        method, bad = GRADE_BUTTONS[instance.type]
+        getattr(self, method)(1, bad)
     
-        if type == "boost":
-            self.boost_rolls[0] += number
-            self.boost_rolls[1] += success
-            self.boost_rolls[2] += advantage
-        elif type == "setback":
-            self.setback_rolls[0] += number
-            self.setback_rolls[1] -= success
-            self.setback_rolls[2] -= advantage
-        elif type == "ability":
-            self.ability_rolls[0] += number
-            self.ability_rolls[1] += success
-            self.ability_rolls[2] += advantage
-        elif type == "difficulty":
-            self.difficulty_rolls[0] += number
-            self.difficulty_rolls[1] -= success
-            self.difficulty_rolls[2] -= advantage
-        elif type == "proficiency":
-            self.proficiency_rolls[0] += number
-            self.proficiency_rolls[1] += success
-            self.proficiency_rolls[2] += advantage
-            self.proficiency_rolls[3] += special
-        elif type == "challenge":
-            self.challenge_rolls[0] += number
-            self.challenge_rolls[1] -= success
-            self.challenge_rolls[2] -= advantage
-            self.challenge_rolls[3] += special
-        # The else happens if the tuple isn't being received
-        # from add_dice() correctly.
+    def grade_odds(self, type):
+        """Returns the chance to succeed after pressing a grade button"""
+        method, bad = GRADE_BUTTONS[type]
+        if method == "upgrade":
+            pool = upgrade_pool(self.dice_amounts(), 1, bad)
         else:
-            print "Type not recognized during update_dice_results()"
-        self._update_all_rolls()
-        self.parent.parent.update_all()
-    
-    def _update_all_rolls(self):
-        self.all_rolls = [
-            self.ability_rolls,
-            self.proficiency_rolls,
-            self.boost_rolls,
-            self.difficulty_rolls,
-            self.challenge_rolls,
-            self.setback_rolls
-            ]
-        self._update_pool_results()
-    
-    def _update_pool_results(self):
-        """Forces an update to the master success, advantage, special counts"""
-        success = 0
-        advantage = 0
-        triumph = 0
-        despair = 0
-        for i in self.all_rolls:
-            success += i[1]
-            advantage += i[2]
-            if i == self.all_rolls[1]:
-                triumph += i[3]
-            elif i == self.all_rolls[4]:
-                despair += i[3]
-        self.pool_success = success
-        self.pool_advantage = advantage
-        self.pool_triumph = triumph
-        self.pool_despair = despair
-    
-    def roll_again(self, instance=None):
-        """Takes the current dice amounts and rolls the exact same roll"""
-    
-        pool = []
-        for i in range(6):
-            pool.append(self.all_rolls[i][0])
-        
-        self.set_pool(pool, "y")
+            pool = downgrade_pool(self.dice_amounts(), 1, bad)
+        return self.odds.stats_for(pool)['success']
 
 
 # Interface Left - Top Half (Dice buttons)
@@ -526,9 +280,37 @@ class dice_DiceArray(GridLayout):
                 type = self.type,
                 value = i
                 ))
+        
+        # Ability, proficiency, difficulty and challenge can also be upgraded
+        # or downgraded, showing the chance to succeed once pressed
+        self.gradeButton = None
+        if self.type in GRADE_BUTTONS:
+            self.gradeButton = TypeButton(
+                text = "",
+                background_color = self.color,
+                on_press = self.pass_grade,
+                markup = True,
+                type = self.type
+                )
+            self.lowerButtons.add_widget(self.gradeButton)
     
     def pass_dice(self, instance):
         self.parent.parent.dicePool.add_dice(instance)
+    
+    def pass_grade(self, instance):
+        self.parent.parent.dicePool.change_grade(instance)
+    
+    def update(self, dicePool):
+        """Updates the odds previewed on the grade button"""
+        if self.gradeButton is None:
+            return
+        if GRADE_BUTTONS[self.type][0] == "upgrade":
+            label = "Up"
+        else:
+            label = "Down"
+        chance = dicePool.grade_odds(self.type)
+        self.gradeButton.text = B + label + BC + "  [size=12]"\
+            + str(int(round(chance * 100))) + "%[/size]"
 
 class dice_DiceGrid(GridLayout):
     """Side of the window devoted to adding dice"""
@@ -537,8 +319,16 @@ class dice_DiceGrid(GridLayout):
         self.cols = 3
         self.padding = 10
         self.spacing = 10
+        self.arrays = []
         for i in range(6):
-            self.add_widget(dice_DiceArray(DICE_TYPES[i], LIN_COLORS[i]))
+            self.arrays.append(dice_DiceArray(DICE_TYPES[i], LIN_COLORS[i]))
+            self.add_widget(self.arrays[i])
+    
+    def update(self):
+        """Updates the grade previews of every array"""
+        dicePool = self.parent.dicePool
+        for array in self.arrays:
+            array.update(dicePool)
 
 # Interface Left - Bottom Half (Results & Reset)
 
@@ -549,97 +339,112 @@ class dice_ResetArray(GridLayout):
     def __init__(self, **kwargs):
         super(dice_ResetArray, self).__init__(**kwargs)
         self.cols = 3
+        
+        # Each type has a persistent reset button and a blank label. Only
+        # one of the two is shown, and they're only swapped when a type
+        # enters or leaves the pool.
+        self.amounts = [0,0,0,0,0,0]
+        self.buttons = []
+        self.blanks = []
         for i in range(6):
-            self.add_widget(Label(
+            self.buttons.append(TypeButton(
+                text = "",
+                size_hint_x = .15,
+                markup = True,
+                background_color = LIN_COLORS[i],
+                type = DICE_TYPES[i],
+                on_press = self.reset_one
+                ))
+            self.blanks.append(Label(
                 size_hint_x = .15
                 ))
+            self.add_widget(self.blanks[i])
+    
+    def reset_one(self, instance):
+        self.parent.parent.parent.dicePool.reset_one(instance)
     
     def update(self):
-        all_rolls = self.parent.parent.parent.dicePool.all_rolls
-        self.clear_widgets()
+        """Updates amounts, swapping buttons and blanks only if needed"""
+        amounts = self.parent.parent.parent.dicePool.dice_amounts()
         for i in range(6):
-            if all_rolls[i][0] != 0:
-                self.add_widget(TypeButton(
-                    text = B + str(all_rolls[i][0]) + BC,
-                    size_hint_x = .15,
-                    # Using padding_x as a type indicator is a shitty hack
-                    # That I use because we can't resolve the type 
-                    # from the text alone.
-                    #
-                    # I know now that I should create a list of custom funcs,
-                    # One for each type, and assign that list_func[i] to
-                    # each button The custom funcs would simply pass to a
-                    # global func the type and amount.
-                    markup = True,
-                    background_color = LIN_COLORS[i],
-                    type = DICE_TYPES[i],
-                    on_press = self.parent.parent.parent.dicePool.reset_one
-                    ))
-            else:
-                self.add_widget(Label(
-                    size_hint_x = .15
-                    ))
+            amount = amounts[i]
+            if amount == self.amounts[i]:
+                continue
+            if amount:
+                self.buttons[i].text = B + str(amount) + BC
+            if bool(amount) != bool(self.amounts[i]):
+                if amount:
+                    old, new = self.blanks[i], self.buttons[i]
+                else:
+                    old, new = self.buttons[i], self.blanks[i]
+                # Children are stored last to first
+                self.remove_widget(old)
+                self.add_widget(new, index = 5 - i)
+            self.amounts[i] = amount
 
 # Result Display
 
 class dice_ResultLabel(GridLayout):
     """A single label to display a single result (success/failure, etc)"""
-    def __init__(self, label, number, **kwargs):
+    def __init__(self, label="", number="", **kwargs):
         super(dice_ResultLabel, self).__init__(**kwargs)
         self.cols = 1
-        # We need to get the type down to a string that matches the RESULT_TYPES
-        self.type = label.lower()
-        self.number = number
+        self.type = ""
+        self.number = ""
+        self.text = ""
         
-        if self.type != "":
-            self.type = RESULT_TYPES.index(self.type)
-            self.texture = Image(TEXTURE_LIST[self.type]).texture
-            if str(number) != "":
-                self.text = B + str(number) + BC
-            else:
-                self.text = ""
-        else: # I shouldn't need this. But it's here.
-            self.type = ""
+        self.resultDisplay = Label(
+            text = "",
+            size_hint_x = .5,
+            size_hint_y = .5,
+            font_size = 36,
+            markup = True
+            )
         
-        if self.type == "": # If we have no type, we're empty
-            self.resultDisplay = Label(
-                text = "",
-                size_hint_x = .5,
-                size_hint_y = .5
-                )
-        else:
-            self.resultDisplay = Label(
-                text = self.text,
-                size_hint_x = .5,
-                size_hint_y = .5,
-                font_size = 36,
-                markup = True
+        self.resultDisplay.bind(
+            size = self._update_tex,
+            pos = self._update_tex
+            )
+        with self.resultDisplay.canvas.before:
+            # Fully transparent until we have a result type
+            self.Color = Color(.75,.75,.75,0)
+            self.tex = Rectangle(
+                size = (
+                    self.resultDisplay.size[1],
+                    self.resultDisplay.size[1]
+                    ),
+                pos = self.resultDisplay.pos
                 )
         
-        if self.type in (0,2,4): # Good types
-            self.Color = (.6,.9,.7)
-        elif self.type in (1,3,5): # Bad types
-            self.Color = (.9,.6,.7)
-        else:
-            self.Color = (.75,.75,.75)
-        
-        if self.type != "": # If we're not empty, do texture binds
-            self.resultDisplay.bind(
-                size = self._update_tex,
-                pos = self._update_tex
-                )
-            with self.resultDisplay.canvas.before:
-                Color(self.Color[0],self.Color[1],self.Color[2])
-                self.tex = Rectangle(
-                    texture = self.texture,
-                    size = (
-                        self.resultDisplay.size[1],
-                        self.resultDisplay.size[1]
-                        ),
-                    pos = self.resultDisplay.pos
-                    )
-                    
         self.add_widget(self.resultDisplay)
+        self.set_result(label, number)
+    
+    def set_result(self, label, number):
+        """Shows a result, only touching what changed since the last one"""
+        # We need to get the type down to a string that matches RESULT_TYPES
+        type = label.lower()
+        if type != "":
+            type = RESULT_TYPES.index(type)
+        
+        if type != self.type:
+            if type == "": # If we have no type, we're empty
+                self.Color.rgba = (.75,.75,.75,0)
+            else:
+                self.tex.texture = get_texture(TEXTURE_LIST[type])
+                if type in (0,2,4): # Good types
+                    self.Color.rgba = (.6,.9,.7,1)
+                else: # Bad types
+                    self.Color.rgba = (.9,.6,.7,1)
+            self.type = type
+        
+        if type != "" and str(number) != "":
+            text = B + str(number) + BC
+        else:
+            text = ""
+        if text != self.text:
+            self.text = text
+            self.resultDisplay.text = text
+        self.number = number
     
     def _update_tex(self, instance, value):
         """Updates texture on resize"""
@@ -656,42 +461,29 @@ class dice_ResultGrid(GridLayout):
         self.rows = 2
         self.cols = 2
         self.spacing = 10
-        # When first created, all labels should be empty.
-        self.add_widget(Label(
-            size_hint_y = .5,
-            size_hint_x = .5
-            ))
-        self.add_widget(Label(
-            size_hint_y = .5,
-            size_hint_x = .5
-            ))
-        self.add_widget(Label(
-            size_hint_y = .5,
-            size_hint_x = .5
-            ))
-        self.add_widget(Label(
-            size_hint_y = .5,
-            size_hint_x = .5
-            ))
+        # When first created, all labels should be empty. The same four
+        # labels are kept for the life of the grid and updated in place.
+        self.resultLabels = []
+        for i in range(4):
+            self.resultLabels.append(dice_ResultLabel(
+                size_hint_y = .5,
+                size_hint_x = .5
+                ))
+            self.add_widget(self.resultLabels[i])
     
     def update(self):
         """Updates the result Labels"""
-        self.clear_widgets() # Removes ALL ResultLabel objects
         dicePool = self.parent.parent.parent.dicePool
         
+        # With no dice, every label is emptied
+        results = [("", "")] * 4
+        
         # Check if there have been any results...
-        dice = False
-        for i in dicePool.all_rolls:
-            if i[0] != 0:
-                dice = True
-        if dice:
+        if dicePool.has_dice():
             if dicePool.pool_success > 0:
                 # We don't actually display the 'Success: ' text anymore, but
                 # we still use the string itself for defining the type,
                 # if the result is good or bad, and the texture to load.
-                #
-                # We could probably remove the trailing ': ', but this is taken 
-                # care of at ResultLabel creation anyway.
                 success_label = "Success"
                 success_num = dicePool.pool_success
             elif dicePool.pool_success == 0:
@@ -722,12 +514,14 @@ class dice_ResultGrid(GridLayout):
             else:
                 despair_label = ""
                 despair_num = ""
-            self.add_widget(dice_ResultLabel(success_label, success_num))
-            self.add_widget(dice_ResultLabel(advantage_label, advantage_num))
-            self.add_widget(dice_ResultLabel(triumph_label, triumph_num))
-            self.add_widget(dice_ResultLabel(despair_label, despair_num))
-         # Just in case, we reset the var.
-        dice = False
+            results = [
+                (success_label, success_num),
+                (advantage_label, advantage_num),
+                (triumph_label, triumph_num),
+                (despair_label, despair_num)
+                ]
+        for resultLabel, result in zip(self.resultLabels, results):
+            resultLabel.set_result(result[0], result[1])
 
 class dice_ResultsByDice(Label):
     def __init__(self, **kwargs):
@@ -737,106 +531,8 @@ class dice_ResultsByDice(Label):
     
     def update(self):
         """Updates the result Labels"""
-        new_text = ''
         dicePool = self.parent.parent.parent.dicePool
-        total_results = 0
-        for i in range(3):
-            total_results += dicePool.all_rolls[i][1]
-            total_results += dicePool.all_rolls[i][2]
-        total_results += dicePool.all_rolls[1][3]
-        for i in range(3,6):
-            total_results -= dicePool.all_rolls[i][1]
-            total_results -= dicePool.all_rolls[i][2]
-        total_results += dicePool.all_rolls[4][3]
-        
-        # Check if there have been any results...
-        dice = False
-        for i in dicePool.all_rolls:
-            if i[0] != 0:
-                dice = True
-        if dice:
-            if total_results <= 20:
-                new_text += B + SWF
-                new_text += COL[1] + 'a'*dicePool.all_rolls[1][2] + CC
-                new_text += COL[0] + 'a'*dicePool.all_rolls[0][2] + CC
-                new_text += COL[2] + 'a'*dicePool.all_rolls[2][2] + CC
-                if new_text.count('a') > 0:
-                    new_text += ' '
-                    
-                new_text += COL[1] + 's'*dicePool.all_rolls[1][1] + CC
-                new_text += COL[0] + 's'*dicePool.all_rolls[0][1] + CC
-                new_text += COL[2] + 's'*dicePool.all_rolls[2][1] + CC
-                if new_text.count('s') > 0:
-                    new_text += ' '
-                    
-                new_text += COL[1] + 'x'*dicePool.all_rolls[1][3] + CC
-                
-                new_text += SWFC + '  |  ' + SWF
-                
-                new_text += COL[4] + 'y'*dicePool.all_rolls[4][3] + CC
-                if new_text.count('y') > 0:
-                    new_text += ' '
-                    
-                new_text += COL[4] + 'f'*(dicePool.all_rolls[4][1]*-1) + CC
-                new_text += COL[3] + 'f'*(dicePool.all_rolls[3][1]*-1) + CC
-                new_text += COL[5] + 'f'*(dicePool.all_rolls[5][1]*-1) + CC
-                if new_text.count('f') > 0:
-                    new_text += ' '
-                    
-                new_text += COL[4] + 't'*(dicePool.all_rolls[4][2]*-1) + CC
-                new_text += COL[3] + 't'*(dicePool.all_rolls[3][2]*-1) + CC
-                new_text += COL[5] + 't'*(dicePool.all_rolls[5][2]*-1) + CC
-                
-            else:
-                new_text += B
-                if dicePool.all_rolls[1][2]:
-                    new_text += COL[1] + str(dicePool.all_rolls[1][2])\
-                        + SWF + 'a' + SWFC + CC + ' '
-                if dicePool.all_rolls[0][2]:
-                    new_text += COL[0] + str(dicePool.all_rolls[0][2])\
-                        + SWF + 'a' + SWFC + CC + ' '
-                if dicePool.all_rolls[2][2]:
-                    new_text += COL[2] + str(dicePool.all_rolls[2][2])\
-                        + SWF + 'a' + SWFC + CC + ' '
-                if dicePool.all_rolls[1][1]:
-                    new_text += COL[1] + str(dicePool.all_rolls[1][1])\
-                        + SWF + 's' + SWFC + CC + ' '
-                if dicePool.all_rolls[0][1]:
-                    new_text += COL[0] + str(dicePool.all_rolls[0][1])\
-                        + SWF + 's' + SWFC + CC + ' '
-                if dicePool.all_rolls[2][1]:
-                    new_text += COL[2] + str(dicePool.all_rolls[2][1])\
-                        + SWF + 's' + SWFC + CC + ' '
-                if dicePool.all_rolls[1][3]:
-                    new_text += COL[1] + str(dicePool.all_rolls[1][3])\
-                        + SWF + 'x' + SWFC + CC
-                
-                new_text += ' | '
-                
-                if dicePool.all_rolls[4][3]:
-                    new_text += COL[4] + str(dicePool.all_rolls[4][3])\
-                        + SWF + 'y' + SWFC + CC + ' '
-                if dicePool.all_rolls[4][1]:
-                    new_text += COL[4] + str(dicePool.all_rolls[4][1]*-1)\
-                        + SWF + 'f' + SWFC + CC + ' '
-                if dicePool.all_rolls[3][1]:
-                    new_text += COL[3] + str(dicePool.all_rolls[3][1]*-1)\
-                        + SWF + 'f' + SWFC + CC + ' '
-                if dicePool.all_rolls[5][1]:
-                    new_text += COL[5] + str(dicePool.all_rolls[5][1]*-1)\
-                        + SWF + 'f' + SWFC + CC + ' '
-                if dicePool.all_rolls[4][2]:
-                    new_text += COL[4] + str(dicePool.all_rolls[4][2]*-1)\
-                        + SWF + 't' + SWFC + CC + ' '
-                if dicePool.all_rolls[3][2]:
-                    new_text += COL[3] + str(dicePool.all_rolls[3][2]*-1)\
-                        + SWF + 't' + SWFC + CC + ' '
-                if dicePool.all_rolls[5][2]:
-                    new_text += COL[5] + str(dicePool.all_rolls[5][2]*-1)\
-                        + SWF + 't' + SWFC + CC
-                
-        dice = False
-        self.text = new_text
+        self.text = dice_markup(dicePool.all_rolls)
 
 class dice_ResultBottom(GridLayout):
     """Bottom half of the window devoted to displaying/resetting results"""
@@ -883,6 +579,8 @@ class dice_ResultBottom(GridLayout):
             )
         self.resetGroup.add_widget(self.resetArray)
         self.resetGroup.add_widget(self.blankLabel1)
+        # Whether resetGroup currently shows the buttons, None until update()
+        self._has_dice = None
         # self.result_label_grid is where the results are displayed
         self.full_results_grid = GridLayout(
             rows = 2,
@@ -907,21 +605,20 @@ class dice_ResultBottom(GridLayout):
         
     def update(self):
         """Updates the entire result side"""
-        dice = False
         self.resetArray.update()
-        for i in self.parent.dicePool.all_rolls: # Check if any dice exist
-            if i[0] != 0:
-                dice = True
-        self.resetGroup.clear_widgets()
-        if dice: # If dice exist, built the widgets
-            self.resetGroup.add_widget(self.rollAgain)
-            self.resetGroup.add_widget(self.resetArray)
-            self.resetGroup.add_widget(self.resetAllButton)
-        else: # If no dice rolled, build blanks.
-            self.resetGroup.add_widget(self.blankLabel1)
-            self.resetGroup.add_widget(self.resetArray)
-            self.resetGroup.add_widget(self.blankLabel2)
-        dice = False # Reset dice var just in case
+        dice = self.parent.dicePool.has_dice()
+        # Only swap the buttons for blanks when the pool empties or fills
+        if dice != self._has_dice:
+            self.resetGroup.clear_widgets()
+            if dice: # If dice exist, built the widgets
+                self.resetGroup.add_widget(self.rollAgain)
+                self.resetGroup.add_widget(self.resetArray)
+                self.resetGroup.add_widget(self.resetAllButton)
+            else: # If no dice rolled, build blanks.
+                self.resetGroup.add_widget(self.blankLabel1)
+                self.resetGroup.add_widget(self.resetArray)
+                self.resetGroup.add_widget(self.blankLabel2)
+            self._has_dice = dice
         # Call a GUI update on the contained result_label_grid
         self.result_label_grid.update()
         self.results_by_dice.update()
@@ -937,19 +634,53 @@ class dice_UILeft(GridLayout):
         
         self.dicePool = DicePool(self)
         
-        self.add_widget(dice_DiceGrid(
+        self.diceGrid = dice_DiceGrid(
             size_hint_y = .5
-            ))
+            )
+        self.add_widget(self.diceGrid)
         self.resultBottom = dice_ResultBottom(
             size_hint_y = .5
             )
         self.add_widget(self.resultBottom)
+        
+        # Grade buttons show their odds before the first click
+        self.diceGrid.update()
 
-class ListItemTypeButton(ListItemButton):
-    def __init__(self, type=None, value=None, **kwargs):
-        super(ListItemTypeButton, self).__init__(**kwargs)
-        self.type = type
-        self.value = value
+class dice_HistoryRow(GridLayout):
+    """A single, recycled row of the history list"""
+    def __init__(self, pass_dice, **kwargs):
+        super(dice_HistoryRow, self).__init__(**kwargs)
+        self.cols = 3
+        # Row elements have the same size_hint_x as the header elements
+        self.time = Label(
+            size_hint_x = 12
+            )
+        self.pool = TypeButton(
+            size_hint_x = 54,
+            background_color = (.3,.3,.3,1),
+            on_press = pass_dice,
+            markup = True
+            )
+        self.results = Label(
+            size_hint_x = 34,
+            markup = True
+            )
+        self.add_widget(self.time)
+        self.add_widget(self.pool)
+        self.add_widget(self.results)
+    
+    def set_row(self, row):
+        """Shows a RollHistory row, or hides the row if given None"""
+        if row is None:
+            self.opacity = 0
+            self.pool.value = None
+            return
+        # row = ["HH:MM", [0,0,0,0,0,0], "poolstring", [0,0,0,0], "resultstring"]
+        self.opacity = 1
+        self.time.text = row[0]
+        self.pool.text = row[2]
+        self.pool.value = row[1]
+        self.results.text = row[4]
 
 class dice_HistoryListView(GridLayout):
     """The list widget for viewing of the roll history, also let's you reroll"""
@@ -980,88 +711,28 @@ class dice_HistoryListView(GridLayout):
         self.add_widget(self.header)
         # End Header Section
         
-        # This is an args based on the 'list_composite' kivy example
-        # I really don't understand it terribly well, but it's working correctly
-        #
-        # list = the 'data' list given to the list_adapter below
-        
-        self.args_converter = lambda row_index, list: {
-            'text': list,
-            'size_hint_y': None,
-            'height': 25, # this is the height of the rows
-            'cls_dicts': [ # Each cls entry is an item in the row
-                {'cls': ListItemLabel,
-                    'kwargs': { # the keywords used during item creation
-                        'text': list[0],
-                        'size_hint_x': 12
-                        }
-                    },
-                {'cls': ListItemTypeButton,
-                    'kwargs': {
-                        'text': list[2],
-                        'value': list[1],
-                        'size_hint_x': 54,
-                        'deselected_color': [.3,.3,.3,1],
-                        'selected_color': [.6,.6,.6,1],
-                        'on_press': self.pass_dice,
-                        # ListItemButton will always stay selected, and doesn't
-                        # provide an API for deselecting.
-                        # Therefore, we rebuild the entire list after
-                        # the user touches one button.
-                        #
-                        # Sloppy, but seems to be the only way.
-                        'on_release': self.sch_clear_selection,
-                        'markup': True
-                        }
-                    },
-                {'cls': ListItemLabel,
-                    'kwargs': {
-                        'text': list[4],
-                        'markup': True,
-                        'size_hint_x': 34
-                        }
-                    }
-            ]}
-
-        self.list_adapter = ListAdapter(
-            allow_empty_selection = True,
-            selection_mode = 'single',
-            data = [],
-            args_converter = self.args_converter,
-            cls=CompositeListItem
-            )
-
-        self.list_view = ListView(
-            adapter=self.list_adapter,
+        # The list only ever builds enough dice_HistoryRows to fill itself,
+        # scrolling and new rolls just hand those rows different history.
+        # Pool buttons don't stay selected, so nothing needs rebuilding
+        # after a click.
+        self.list_view = RecycleList(
+            row_factory = lambda: dice_HistoryRow(self.pass_dice),
+            row_height = 25, # this is the height of the rows
             size_hint_y = 97
             )
-
+        
         self.add_widget(self.list_view)
     
-    def sch_clear_selection(self, ignore=''):
-        """Schedules a rebuild of the list to clear selection."""
-        Clock.schedule_once(self.update_list, .1)
-    
     def update_list(self, ignore=''):
-        """Totally rebuilds the entire list_view GUI"""
-        # We remove and add ONLY the list_view, not touching the header.
+        """Shows a roll that was just added to the history"""
         top = self.parent.parent.parent.parent.parent.parent.uiLeft.dicePool
-        self.remove_widget(self.list_view)
-        self.list_adapter = ListAdapter(
-            allow_empty_selection = True,
-            selection_mode = 'single',
-            data = top.rollHistory.history,
-            args_converter = self.args_converter,
-            cls=CompositeListItem
-            )
-        self.list_view = ListView(
-            adapter=self.list_adapter,
-            size_hint_y = 97
-            )
-        self.add_widget(self.list_view)
+        self.list_view.data = top.rollHistory
+        self.list_view.prepend()
     
     def pass_dice(self, instance):
         """Sets the pool with a save and reset"""
+        if instance.value is None: # Hidden row
+            return
         top = self.parent.parent.parent.parent.parent.parent.uiLeft.dicePool
         new_pool = instance.value
         top.set_pool(new_pool, reset="y")
@@ -1073,13 +744,22 @@ class dice_CommonPools(GridLayout):
         super(dice_CommonPools, self).__init__(**kwargs)
         self.cols = 2
         
+        # Prewarm the odds of every good and bad half-pool
+        POOL_STATS.prewarm(
+            [list(pool[:3]) + [0, 0, 0] for pool in COMMON_POOLS] +\
+            [[0, 0, 0] + list(pool[:3]) for pool in COMMON_POOLS]
+            )
+        
         # Create the good and bad pools
+        # Each pool also shows its chance to succeed (or fail, for bad pools)
         self.good_pools = [] 
         for i in range(len(COMMON_POOLS)):
-            self.good_pools.append(self.halfpool_markup(COMMON_POOLS[i]))
+            self.good_pools.append(self.halfpool_markup(COMMON_POOLS[i])\
+                + self.halfpool_odds(COMMON_POOLS[i]))
         self.bad_pools = []
         for i in range(len(COMMON_POOLS)):
-            self.bad_pools.append(self.halfpool_markup(COMMON_POOLS[i],"y"))
+            self.bad_pools.append(self.halfpool_markup(COMMON_POOLS[i],"y")\
+                + self.halfpool_odds(COMMON_POOLS[i],"y"))
             
         
         self.rightCol = GridLayout(
@@ -1133,20 +813,98 @@ class dice_CommonPools(GridLayout):
 
     def halfpool_markup(self, pool = (1, 1, 0), bad = "n"):
         """Takes a single tuple and returns a string"""
-    
-        pool_str = ''
-        # c = proficiency/challenge
-        # b = boost/setback
-        # d = ability/difficulty
+        return halfpool_markup(pool, bad)
+
+    def halfpool_odds(self, pool = (1, 1, 0), bad = "n"):
+        """Takes a single tuple and returns the chance to succeed as a string.
+        Bad pools give their chance to cause at least one failure instead."""
+        
         if bad == "n":
-            pool_str += COL[1] + SWF + "c"*pool[1] + SWFC + CC
-            pool_str += COL[0] + SWF + "d"*pool[0] + SWFC + CC
-            pool_str += COL[2] + SWF + "b"*pool[2] + SWFC + CC
+            chance = POOL_STATS.get(list(pool[:3]) + [0, 0, 0])['success']
         else:
-            pool_str += COL[4] + SWF + "c"*pool[1] + SWFC + CC
-            pool_str += COL[3] + SWF + "d"*pool[0] + SWFC + CC
-            pool_str += COL[5] + SWF + "b"*pool[2] + SWFC + CC
-        return pool_str
+            chance = POOL_STATS.get([0, 0, 0] + list(pool[:3]))['failure']
+        return "  [size=12]" + str(int(round(chance * 100))) + "%[/size]"
+
+class dice_StatsView(Label):
+    """This session's dice and crits, against what their odds expected"""
+    def __init__(self, **kwargs):
+        super(dice_StatsView, self).__init__(**kwargs)
+        self.markup = True
+        self.halign = 'center'
+        self.valign = 'middle'
+        
+        # Redrawn whenever a dice pool or crit is saved
+        self.stats = session_stats()
+        self.stats.watchers.append(self.update)
+        self.update()
+    
+    def update(self):
+        """Shows the running totals, which never look at the history"""
+        stats = self.stats
+        lines = ["[b]Dice Pools[/b]  " + str(stats.rolls) + " rolled", ""]
+        for i in range(4):
+            lines.append(DICE_FIELDS[i].capitalize() + "  [b]"\
+                + str(stats.observed[i]) + "[/b]  [size=12]expected "\
+                + "%.1f" % stats.expected[i] + "[/size]")
+        lines.append(self._luck_line(stats.rolls, stats.luck()))
+        
+        lines.extend(["", "[b]Critical Injuries[/b]  " + str(stats.crits)\
+            + " rolled", ""])
+        for severity in range(1, len(SEVERITY)):
+            if severity < 5:
+                name = SEVERITY[severity]
+            else:
+                name = "Dead"
+            lines.append(name + "  [b]" + str(stats.severities[severity])\
+                + "[/b]  [size=12]expected " + "%.1f"\
+                % stats.expected_severities[severity] + "[/size]")
+        lines.append(self._luck_line(stats.crits, stats.crit_luck()))
+        self.text = "\n".join(lines)
+    
+    def _luck_line(self, rolls, luck):
+        """Places the average roll within its odds, 50 being as expected"""
+        if not rolls:
+            return "Percentile  [b]-[/b]"
+        return "Percentile  [b]" + str(int(round(luck * 100))) + "[/b]"
+
+class dice_ExportButton(Button):
+    """Exports the whole history to CSV, a step per frame"""
+    def __init__(self, **kwargs):
+        super(dice_ExportButton, self).__init__(**kwargs)
+        self.text = "Export History"
+        self.markup = True
+        self.halign = 'center'
+        self.store = None # The dice RollStore, set by dice_UI
+        self.export = None # The export being written
+        self.bind(on_press = self.start)
+    
+    def start(self, instance=None):
+        """Starts exporting to a new folder in EXPORT_FOLDER"""
+        if self.export is not None: # Already exporting
+            return
+        folder = join(EXPORT_FOLDER, strftime("%Y%m%d-%H%M%S"))
+        sources = history_sources(self.store, session_log())
+        self.export = Export(sources, folder)
+        # Big histories take many frames, but every frame stays short
+        Clock.schedule_interval(self._step, 0)
+    
+    def _step(self, dt):
+        """Writes the next rows, returns False to unschedule once done"""
+        export = self.export
+        try:
+            more = export.step()
+        except (IOError, OSError):
+            export.cancel()
+            self.export = None
+            self.text = "Export failed"
+            return False
+        if more:
+            self.text = "Exporting... " + str(export.rows) + " rows"
+            return True
+        self.export = None
+        self.text = "Exported " + str(export.rows) + " rows to\n[size=10]"\
+            + export.folder + "[/size]"
+        return False
 
 class dice_UIRight(Accordion):
     """The right side of the interface, an accordion group"""
@@ -1162,18 +920,34 @@ class dice_UIRight(Accordion):
         self.commonPoolsAcc = AccordionItem(
             title = "Common Dice Pools"
             )
+        self.statsAcc = AccordionItem(
+            title = "Session Stats"
+            )
         
         # Things inside of the Accordion Items
         self.commonPools = dice_CommonPools()
         self.history = dice_HistoryListView()
+        self.stats = dice_StatsView(
+            size_hint_y = 85
+            )
+        self.exportButton = dice_ExportButton(
+            size_hint_y = 15
+            )
+        self.statsGrid = GridLayout(
+            cols = 1
+            )
+        self.statsGrid.add_widget(self.stats)
+        self.statsGrid.add_widget(self.exportButton)
         
         # Add interior items to Accordion Items
         self.commonPoolsAcc.add_widget(self.commonPools)
         self.historyAcc.add_widget(self.history)
+        self.statsAcc.add_widget(self.statsGrid)
         
         # Add Accordion Items
         self.add_widget(self.historyAcc)
         self.add_widget(self.commonPoolsAcc)
+        self.add_widget(self.statsAcc)
 
 class dice_UI(GridLayout):
     """Main interface, additive dice to the left and results to the right"""
@@ -1184,10 +958,16 @@ class dice_UI(GridLayout):
         self.uiLeft = dice_UILeft()
         self.uiRight = dice_UIRight()
         
+        # Show any history saved by earlier sessions straight away
+        self.uiRight.history.list_view.data = self.uiLeft.dicePool.rollHistory
+        self.uiRight.exportButton.store =\
+            self.uiLeft.dicePool.rollHistory.history
+        
         self.add_widget(self.uiLeft)
         self.add_widget(self.uiRight)
     
     def update_all(self):
+        self.uiLeft.diceGrid.update()
         self.uiLeft.resultBottom.update()
 
 if __name__ == "__main__":
@@ -2,10 +2,6 @@
 # Force Dice App Module
 # By Sean Wallitsch, 2013/08/24
 
-# Modules
-
-from random import randrange
-
 # Kivy Modules
 
 from kivy.app import App # Base App Class
@@ -16,6 +12,13 @@ from kivy.uix.button import Button
 from kivy.graphics import Canvas, Color, Rectangle # For backgrounds
 from kivy.lang import Builder
 
+# Custom Modules
+
+from rules.force import force_markup, force_roll, force_total_markup,\
+    force_totals # Force dice rules
+from submodules.face_buffer import buffered_stream # Pre-drawn force dice
+from submodules.session_log import session_log # Saved force rolls
+
 #KV Style Section
 Builder.load_string(
 '''
@@ -36,34 +39,6 @@ Builder.load_string(
 
 ''')
 
-# ==============================================================================
-# AT GENERIC VARIABLES
-# ==============================================================================
-
-# Markup Shortcuts
-
-SWF = "[font=fonts/sw_symbols.ttf]"
-SWFC = "[/font]"
-
-
-# ==============================================================================
-# FUNCTIONS
-# ==============================================================================
-
-def force():
-    """Rolls & interprets a d12 dice according to Force die"""
-    roll = randrange(1,12)
-    if roll in (1, 2, 3, 4, 5, 6):
-        result = 'z'
-    elif roll == 7:
-        result = 'zz'
-    elif roll in (8, 9):
-        result = 'Z'
-    elif roll in (10, 11, 12):
-        result = 'ZZ'
-    markup_result = '[b][size=32]' + SWF + result + SWFC + '[/size][/b]'
-    return markup_result
-
 # ==============================================================================
 # GUI CLASSES
 # ==============================================================================
@@ -87,7 +62,7 @@ class force_Results(GridLayout):
         self.clear_widgets()
         for result in self.parent.controls.results:
             self.add_widget(Label(
-                text = result,
+                text = force_markup(result[0], result[1]),
                 color = (0,0,0,1),
                 markup = True,
                 size_hint_x = 33,
@@ -217,11 +192,19 @@ class force_Controls(GridLayout):
         self.parent.results.update()
     
     def _roll(self, instance):
-        self.results = []
-        for dice in range(int(self.forceDiceSlider.value)):
-            self.results.append(force())
+        # (light, dark) of every die, markup is only built for display
+        self.results = force_roll(
+            int(self.forceDiceSlider.value),
+            buffered_stream("force")
+            )
         self.parent.results.update()
         self._update_total()
+        
+        # Save the roll to the session log
+        log = session_log()
+        if log is not None:
+            light, dark = self._count_results()
+            log.log_force(len(self.results), light, dark)
     
     def _update_total(self):
         self.remove_widget(self.resultTotal)
@@ -238,29 +221,13 @@ class force_Controls(GridLayout):
                 )
         self.add_widget(self.resultTotal)
     
+    def _count_results(self):
+        """Returns the light and dark totals of the current results"""
+        return force_totals(self.results)
+    
     def _get_total(self):
-        result_count = ''
-        for result in self.results:
-            result_count += result
-        result_count = result_count.replace('[b][size=32]' + SWF, '')
-        result_count = result_count.replace(SWFC + '[/size][/b]', '')
-        light = result_count.count('Z')
-        dark = result_count.count('z')
-        if light > 0:
-            lightstring = str(light) + SWF + 'Z' + SWFC
-        else:
-            lightstring = ''
-        if dark > 0:
-            darkstring = str(dark) + SWF + 'z' + SWFC
-        else:
-            darkstring = ''
-        if dark > 0 and light > 0:
-            connector = '     '
-        else:
-            connector = ''
-        final_string = "[b][size=28]" + lightstring + connector\
-            + darkstring + "[/size][/b]"
-        return final_string
+        light, dark = self._count_results()
+        return force_total_markup(light, dark)
 
 # ==============================================================================
 # Force GUI
@@ -0,0 +1,185 @@
+#!/usr/bin/kivy
+# History List Module
+# A recycled list widget for long, newest first histories
+#
+# Only enough row widgets to fill the visible area are ever created. Scrolling
+# or adding history just hands different data to the same rows.
+#
+# Like a ScrollView, a touch isn't handed to the rows straight away. It only
+# presses a row once it's lifted or held for SCROLL_TIMEOUT without moving
+# SCROLL_DISTANCE, otherwise it scrolls the list and never presses anything.
+
+# ==============================================================================
+# Imports
+# ==============================================================================
+
+from functools import partial
+
+# Kivy Imports
+
+from kivy.clock import Clock # For holding touches before pressing rows
+from kivy.uix.gridlayout import GridLayout # Rows are stacked in a single column
+
+# ==============================================================================
+# Variables
+# ==============================================================================
+
+SCROLL_DISTANCE = 20 # Pixels a touch moves before it scrolls instead
+SCROLL_TIMEOUT = .2 # Seconds a still touch is held before it presses a row
+
+# ==============================================================================
+# Classes
+# ==============================================================================
+
+class RecycleList(GridLayout):
+    """Displays a window of rows from a newest first data source
+
+    Args:
+        row_factory: Called with no arguments to build a row widget. Rows
+            must provide set_row(item), which is given an item from data,
+            or None when the row has nothing to show.
+
+        row_height: Fixed height of every row
+
+    data can be anything with len() and newest first indexing.
+
+    """
+    def __init__(self, row_factory, row_height=25, **kwargs):
+        super(RecycleList, self).__init__(**kwargs)
+        self.cols = 1
+
+        self.row_factory = row_factory
+        self.row_height = row_height
+        self.data = []
+
+        self.rows_list = [] # The recycled row widgets, top to bottom
+        self.offset = 0 # Data index shown in the top row
+
+        self.bind(
+            size = self._update_rows
+            )
+
+    def _update_rows(self, instance='', value=''):
+        """Creates or removes row widgets to fill the current height"""
+        needed = max(int(self.height // self.row_height), 1)
+        while len(self.rows_list) < needed:
+            row = self.row_factory()
+            row.size_hint_y = None
+            row.height = self.row_height
+            self.rows_list.append(row)
+            self.add_widget(row)
+        while len(self.rows_list) > needed:
+            self.remove_widget(self.rows_list.pop())
+        self.scroll(0)
+
+    def refresh(self):
+        """Hands the rows their current data items"""
+        for i in range(len(self.rows_list)):
+            index = self.offset + i
+            if index < len(self.data):
+                self.rows_list[i].set_row(self.data[index])
+            else:
+                self.rows_list[i].set_row(None)
+
+    def prepend(self, count=1):
+        """Call after (count) items were added to the front of data
+
+        When scrolled to the top the new items come into view, otherwise
+        the rows being looked at stay put.
+
+        """
+        if self.offset:
+            self.offset += count
+        self.refresh()
+
+    def scroll(self, rows):
+        """Moves the view (rows) towards older items, negative is newer"""
+        last = max(len(self.data) - len(self.rows_list), 0)
+        self.offset = min(max(self.offset + rows, 0), last)
+        self.refresh()
+
+    def _touch_key(self):
+        """Key of this list's state in the ud of the touches it holds"""
+        return 'recycle_list.' + str(self.uid)
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super(RecycleList, self).on_touch_down(touch)
+        if 'button' in touch.profile\
+            and touch.button in ('scrollup', 'scrolldown'):
+            if touch.button == 'scrollup':
+                self.scroll(1)
+            else:
+                self.scroll(-1)
+            return True
+        # Hold the touch until we know if it's a press or a scroll
+        touch.grab(self)
+        touch.ud[self._touch_key()] = {
+            'mode': 'unknown',
+            'drag': 0 # Movement not yet turned into a scroll
+            }
+        Clock.schedule_once(partial(self._press_held, touch), SCROLL_TIMEOUT)
+        return True
+
+    def _press_held(self, touch, dt):
+        """Presses the rows with a touch held still for SCROLL_TIMEOUT"""
+        state = touch.ud.get(self._touch_key())
+        if state is not None and state['mode'] == 'unknown':
+            state['mode'] = 'press'
+            self._hand_down(touch)
+
+    def _hand_down(self, touch):
+        """Hands a held touch to the rows, as if it had only just come down"""
+        super(RecycleList, self).on_touch_down(touch)
+
+    def _hand_up(self, touch):
+        """Ends a touch for the rows that took it in _hand_down()
+
+        They only grabbed it while it was being lifted, after the window
+        picked who gets the grabbed touch up, so it's dispatched here.
+
+        """
+        for grabbed in touch.grab_list[:]:
+            widget = grabbed()
+            if widget is None or widget is self:
+                continue
+            touch.ungrab(widget)
+            touch.grab_current = widget
+            widget.dispatch('on_touch_up', touch)
+        touch.grab_current = self
+
+    def on_touch_move(self, touch):
+        state = touch.ud.get(self._touch_key())
+        if state is None:
+            return super(RecycleList, self).on_touch_move(touch)
+        if touch.grab_current is not self: # Handled when grabbed
+            return True
+        if state['mode'] == 'unknown'\
+            and max(abs(touch.x - touch.ox), abs(touch.y - touch.oy))\
+            > SCROLL_DISTANCE:
+            state['mode'] = 'scroll'
+            state['drag'] = touch.y - touch.oy
+        elif state['mode'] == 'scroll':
+            state['drag'] += touch.dy
+        if state['mode'] == 'scroll':
+            # Dragging up pulls older rows into view
+            rows = int(state['drag'] / self.row_height)
+            if rows:
+                state['drag'] -= rows * self.row_height
+                self.scroll(rows)
+        return True
+
+    def on_touch_up(self, touch):
+        state = touch.ud.get(self._touch_key())
+        if state is None:
+            return super(RecycleList, self).on_touch_up(touch)
+        if touch.grab_current is not self: # Handled when grabbed
+            return True
+        touch.ungrab(self)
+        mode = state['mode']
+        state['mode'] = 'done' # Too late for a held press
+        if mode == 'unknown': # A tap, press and release the row
+            self._hand_down(touch)
+            self._hand_up(touch)
+        # Rows pressed by a held touch grabbed it themselves and get the up
+        return True
@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# Rules Package
+# The game rules behind the dice roller, without any Kivy
+#
+# Everything a script, bot or server needs to roll and describe dice pools,
+# critical injuries and force dice. The Kivy UI modules build on top of these,
+# but nothing in here ever imports Kivy.
+
+from .crit import CHART, RESULTS, SEVERITY, crit_chart, crit_result
+from .crit_odds import crit_counts, crit_odds, severity_odds
+from .force import (
+    force,
+    force_batch,
+    force_markup,
+    force_roll,
+    force_total_markup,
+    force_totals
+    )
+from .markup import (
+    dice_markup,
+    halfpool_markup,
+    pool_markup,
+    result_markup
+    )
+from .pool import (
+    COMMON_POOLS,
+    DICE_TYPES,
+    RESULT_TYPES,
+    PoolModel,
+    PoolRecord,
+    downgrade_pool,
+    upgrade_pool
+    )
@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# Critical Injury Rules Module
+# The critical injury chart
+
+# ==============================================================================
+# IMPORTS
+# ==============================================================================
+
+from bisect import bisect_right
+
+# ==============================================================================
+# VARIABLES
+# ==============================================================================
+
+# DICTs
+
+RESULTS ={
+    "Minor Nick": "The target suffers 1 strain.",
+    "Slowed Down": "The target can only act during the last allied initiative slot on his next turn.",
+    "Sudden Jolt": "The target drops whatever is in hand.",
+    "Distracted": "The target cannot perform a free maneuver during his next turn.",
+    "Off-Balance": "Add (1) Setback Die to target's next skill check.",
+    "Discouraging Wound": "Flip one light side Destiny point to the dark side (reverse if NPC).",
+    "Stunned": "The target is staggered until the end of target's next turn.",
+    "Stinger": "Increase difficulty of next check by (1).",
+    "Bowled Over": "The target is knocked prone and suffers (1) strain.",
+    "Head Ringer": "The target increases the difficulty of all Intellect and Cunning checks by (1) until the end of the encounter.",
+    "Fearsome Wound": "The target increases the difficulty of all Presence and Willpower checks by (1) until the end of the encounter.",
+    "Agonizing Wound": "The target increases the difficulty of all Brawn and Agility checks by (1) until the end of the encounter.",
+    "Slightly Dazed": "The target is disoriented until the end of the encounter.",
+    "Scattered Senses": "The target removes all Boost Die from skill checks until the end of the encounter.",
+    "Hamstrung": "The target loses their free maneuver until the end of the encounter.",
+    "Overpowered": "The target leaves himself open, and the attacker may immediately attempt another free attack against him, using the exact same pool as the original attack.",
+    "Winded": "Until the end of the encounter, the target cannot voluntarily suffer strain to activate any abilities or gain additional maneuvers.",
+    "Compromised": "Increase difficulty of all skill checks by (1) until the end of the encounter.",
+    "At the Brink": "The target suffers (1) strain each time they perform an action",
+    "Crippled": "One of the target's limbs (selected by the GM) is crippled until healed or replaced. Increase difficulty of all checks that require use of that limb by one.",
+    "Maimed": "One of the target's limbs (selected by the GM) is permanently lost. Unless the target has a cybernetic replacement, the target cannot perform actions that would require the use of that limb. All other actions gain (1) Setback Die.",
+    "Horrific Injury": "Randomly roll a 1d10 to determine one of the target's characteristics 1-3 for Brawn, 4-6 for Agility, 7 for Intellect, 8 for Cunning, 9 for Presence, 10 for Willpower. Until this Critical Injury is healed, treat that characteristic as (1) point lower.",
+    "Temporarily Lame": "Until this Critical Injury is healed, the target cannot perform more than one maneuver during their turn.",
+    "Blinded": "The target can no longer see. Upgrade the difficulty of all checks twice. Upgrade the difficulty of all Perception and Vigilance checks three times.",
+    "Knocked Senseless": "The target is staggered for the remainder of the encounter.",
+    "Gruesome Injury": "Randomly roll a 1d10 to determine one of the target's characteristics 1-3 for Brawn, 4-6 for Agility, 7 for Intellect, 8 for Cunning, 9 for Presence, 10 for Willpower. That characteristic is permanently reduced by (1), to a minimum of (1).",
+    "Bleeding Out": "Every round, the target suffers (1) wound and (1) strain at the beginning of their turn. For every five wounds they suffer beyond their wound threshold, they suffer one additional Critical Injury (cannot suffer this one again).",
+    "The End is Nigh": "The target will die after the last Initiative slot during the next round.",
+    "Dead": "Complete, obliterated death"
+    }
+
+SEVERITY = [None, 'Easy', 'Average', 'Hard', 'Daunting', '-']
+
+# The Chart
+
+# Every result as (lowest roll, severity, name), sorted by roll. A result
+# covers every roll up to the next one's lowest roll, rolls below the first
+# count as the first and rolls past the last as the last.
+CHART = (
+    (1, 1, "Minor Nick"),
+    (6, 1, "Slowed Down"),
+    (11, 1, "Sudden Jolt"),
+    (16, 1, "Distracted"),
+    (21, 1, "Off-Balance"),
+    (26, 1, "Discouraging Wound"),
+    (31, 1, "Stunned"),
+    (36, 1, "Stinger"),
+    (41, 2, "Bowled Over"),
+    (46, 2, "Head Ringer"),
+    (51, 2, "Fearsome Wound"),
+    (56, 2, "Agonizing Wound"),
+    (61, 2, "Slightly Dazed"),
+    (66, 2, "Scattered Senses"),
+    (71, 2, "Hamstrung"),
+    (76, 2, "Overpowered"),
+    (81, 2, "Winded"),
+    (86, 2, "Compromised"),
+    (91, 3, "At the Brink"),
+    (95, 3, "Crippled"),
+    (101, 3, "Maimed"),
+    (106, 3, "Horrific Injury"),
+    (111, 3, "Temporarily Lame"),
+    (116, 3, "Blinded"),
+    (121, 3, "Knocked Senseless"),
+    (126, 4, "Gruesome Injury"),
+    (131, 4, "Bleeding Out"),
+    (141, 4, "The End is Nigh"),
+    (151, 5, "Dead")
+    )
+
+# Lowest roll of every CHART entry, for bisecting
+CHART_THRESHOLDS = [entry[0] for entry in CHART]
+
+# The lowest and highest rolls that aren't clamped
+CHART_MIN = CHART_THRESHOLDS[0]
+CHART_MAX = CHART_THRESHOLDS[-1]
+
+# (severity, name, description) of every CHART entry
+CHART_RESULTS = tuple(
+    (entry[1], entry[2], RESULTS[entry[2]]) for entry in CHART
+    )
+
+# CHART index of every roll from CHART_MIN to CHART_MAX, see chart_index()
+_DENSE = [
+    bisect_right(CHART_THRESHOLDS, roll) - 1
+    for roll in range(CHART_MIN, CHART_MAX + 1)
+    ]
+
+# ==============================================================================
+# FUNCTIONS
+# ==============================================================================
+
+def chart_index(roll):
+    """Returns the position in CHART of the result for a roll total"""
+    if roll <= CHART_MIN:
+        return 0
+    if roll >= CHART_MAX:
+        return len(CHART) - 1
+    return _DENSE[roll - CHART_MIN]
+
+def crit_result(roll):
+    """Takes a roll total and returns (severity, name, description)"""
+    return CHART_RESULTS[chart_index(roll)]
+
+def crit_chart(roll):
+    """Takes a roll value and interprets it according to the CI_chart"""
+    return CHART_RESULTS[chart_index(roll)][:2]
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# Critical Injury Odds Module
+# Exact odds of every critical injury result over the crit sliders
+#
+# A crit roll totals previous*10 + mod + 1d100, so every slider setting with
+# the same previous*10 + mod (the base) has the same odds. The chances of
+# every CHART result are precomputed for each base the sliders can reach, as
+# rolls out of 100, in a single flat byte array.
+
+# Imports
+
+from array import array
+
+from .crit import CHART, CHART_THRESHOLDS, SEVERITY
+
+# Variables
+
+# The crit slider space, see criticalInjuries.crit_Controls
+PREVIOUS_MIN = 0
+PREVIOUS_MAX = 15
+MOD_MIN = -150
+MOD_MAX = 150
+MOD_STEP = 5
+
+ROLL_SIDES = 100 # Crits are rolled on a d100
+
+# Every base the sliders can make, from lowest to highest
+BASE_MIN = PREVIOUS_MIN*10 + MOD_MIN
+BASE_MAX = PREVIOUS_MAX*10 + MOD_MAX
+BASE_STEP = MOD_STEP # previous*10 is always a multiple of the mod step
+
+# Functions
+
+def _rolls_at_most(base, total):
+    """Returns how many d100 rolls give a total of (total) or less"""
+    return min(max(total - base, 0), ROLL_SIDES)
+
+def _chart_counts(base):
+    """Returns how many d100 rolls land on every CHART result
+
+    Each result's count is the difference of two prefix sums, the rolls
+    totalling under its lowest roll and those totalling under the next
+    result's. The first and last results take every total below and above.
+
+    """
+    counts = []
+    below = 0
+    for i in range(1, len(CHART)):
+        at_most = _rolls_at_most(base, CHART_THRESHOLDS[i] - 1)
+        counts.append(at_most - below)
+        below = at_most
+    counts.append(ROLL_SIDES - below)
+    return counts
+
+def _build_table():
+    """Returns the counts of every base in the slider space, back to back"""
+    table = array('B')
+    for base in range(BASE_MIN, BASE_MAX + 1, BASE_STEP):
+        table.extend(_chart_counts(base))
+    return table
+
+# Chance, out of ROLL_SIDES, of every CHART result for every slider base.
+# Row (base - BASE_MIN) // BASE_STEP starts at that row times len(CHART).
+CRIT_ODDS = _build_table()
+
+def crit_counts(previous=0, mod=0):
+    """Returns how many of the 100 rolls land on every CHART result"""
+    base = previous*10 + mod
+    if BASE_MIN <= base <= BASE_MAX and not (base - BASE_MIN) % BASE_STEP:
+        start = (base - BASE_MIN) // BASE_STEP * len(CHART)
+        return CRIT_ODDS[start:start + len(CHART)].tolist()
+    # Off the sliders, the server can ask for anything
+    return _chart_counts(base)
+
+def crit_odds(previous=0, mod=0):
+    """Returns {name: chance} for every result that can be rolled"""
+    odds = {}
+    for entry, count in zip(CHART, crit_counts(previous, mod)):
+        if count:
+            odds[entry[2]] = float(count) / ROLL_SIDES
+    return odds
+
+def severity_odds(previous=0, mod=0):
+    """Returns the chance of every severity, indexed like SEVERITY"""
+    odds = [0.0] * len(SEVERITY)
+    for entry, count in zip(CHART, crit_counts(previous, mod)):
+        odds[entry[1]] += float(count) / ROLL_SIDES
+    return odds
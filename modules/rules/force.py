@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# Force Rules Module
+# Rolls force dice and builds their markup
+#
+# Rolls are kept as numbers, (light, dark) per die, and only turned into
+# markup when they're displayed.
+
+# Imports
+
+from .markup import SWF, SWFC
+from ..submodules.rng import get_stream
+from ..submodules.sw_dice import dice_batch
+
+# Variables
+
+# Wraps a single die's symbols
+FORCE_OPEN = '[b][size=32]' + SWF
+FORCE_CLOSE = SWFC + '[/size][/b]'
+
+# Functions
+
+def force_batch(dice=1, rolls=1, stream=None):
+    """Rolls (rolls) sets of (dice) force dice in a single draw
+
+    Returns the light and dark totals of every set as two sequences, NumPy
+    arrays when NumPy is available, otherwise lists. Dice come from the
+    shared "force" stream unless another rng stream is given.
+
+    """
+    if stream is None:
+        stream = get_stream("force")
+    results = dice_batch("force", dice, rolls, stream)
+    if isinstance(results, list):
+        return [row[4] for row in results], [row[5] for row in results]
+    return results[:, 4], results[:, 5]
+
+def force_roll(dice=1, stream=None):
+    """Rolls (dice) force dice and returns (light, dark) for every die"""
+    light, dark = force_batch(1, dice, stream)
+    return [(int(i), int(j)) for i, j in zip(light, dark)]
+
+def force_totals(rolls):
+    """Takes a force_roll() and returns the light and dark totals"""
+    light = 0
+    dark = 0
+    for roll in rolls:
+        light += roll[0]
+        dark += roll[1]
+    return light, dark
+
+def force_markup(light=0, dark=0):
+    """Returns a single force die's result as symbols"""
+    return FORCE_OPEN + 'Z'*light + 'z'*dark + FORCE_CLOSE
+
+def force():
+    """Rolls & interprets a d12 dice according to Force die"""
+    return force_markup(*force_roll(1)[0])
+
+def force_total_markup(light=0, dark=0):
+    """Returns the light and dark totals of a roll as symbols"""
+    if light > 0:
+        lightstring = str(light) + SWF + 'Z' + SWFC
+    else:
+        lightstring = ''
+    if dark > 0:
+        darkstring = str(dark) + SWF + 'z' + SWFC
+    else:
+        darkstring = ''
+    if dark > 0 and light > 0:
+        connector = '     '
+    else:
+        connector = ''
+    final_string = "[b][size=28]" + lightstring + connector\
+        + darkstring + "[/size][/b]"
+    return final_string
@@ -0,0 +1,268 @@
+#!/usr/bin/python
+# Markup Rules Module
+# Builds the Kivy markup strings for pools and results
+#
+# These are plain strings, so building them needs nothing from Kivy.
+
+# Imports
+
+from collections import OrderedDict
+
+from ..submodules.color import rgb_to_hex, color_markup
+
+# Variables
+
+# Colors
+
+# 0-255 colors from Photoshop
+COL_ABILITY = [70, 165, 52]
+COL_PROFICIENCY = [255, 250, 20]
+COL_BOOST = [169, 235, 255]
+COL_DIFFICULTY = [135, 62, 173]
+COL_CHALLENGE = [230, 56, 56]
+COL_SETBACK = [80, 80, 80]
+
+# Creates HTML ready hexes for markup
+HEX_ABILITY = rgb_to_hex(COL_ABILITY)
+HEX_PROFICIENCY = rgb_to_hex(COL_PROFICIENCY)
+HEX_BOOST = rgb_to_hex(COL_BOOST)
+HEX_DIFFICULTY = rgb_to_hex(COL_DIFFICULTY)
+HEX_CHALLENGE = rgb_to_hex(COL_CHALLENGE)
+HEX_SETBACK = rgb_to_hex(COL_SETBACK)
+
+HEX_COLORS = [
+    HEX_ABILITY,
+    HEX_PROFICIENCY,
+    HEX_BOOST,
+    HEX_DIFFICULTY,
+    HEX_CHALLENGE,
+    HEX_SETBACK
+    ]
+
+# Markup Shortcuts
+
+SWF = "[font=fonts/sw_symbols.ttf]"
+SWFC = "[/font]"
+COL = color_markup(HEX_COLORS)
+CC = "[/color]"
+B = "[b]"
+BC = "[/b]"
+
+# Fragments
+
+# Closing pieces of a result shown by count, e.g. COL[0] + "3" + close
+_COUNT_CLOSE = dict((glyph, SWF + glyph + SWFC + CC) for glyph in "abcdfstxy")
+_RESULT_CLOSE = dict((glyph, SWF + glyph + CC + SWFC) for glyph in "afstxy")
+
+# Pool sides as (dice amount index, glyph shown by count, glyph shown by
+# symbol), in the order they're shown
+_GOOD_POOL = ((1, "c", "c"), (0, "d", "d"), (2, "b", "b"))
+_BAD_POOL = ((4, "c", "c"), (3, "c", "d"), (5, "b", "b"))
+
+# Fields of an all_rolls row, see PoolRecord
+ROLL_WIDTH = 4
+
+# dice_markup() sides as groups of (all_rolls row, field, glyph), in the
+# order they're shown. Bad side failure and threat are stored negative.
+_GOOD_DICE = (
+    ((1, 2, "a"), (0, 2, "a"), (2, 2, "a")),
+    ((1, 1, "s"), (0, 1, "s"), (2, 1, "s")),
+    ((1, 3, "x"),)
+    )
+_BAD_DICE = (
+    ((4, 3, "y"),),
+    ((4, 1, "f"), (3, 1, "f"), (5, 1, "f")),
+    ((4, 2, "t"), (3, 2, "t"), (5, 2, "t"))
+    )
+
+# The same sides with each result's place in the flat cells of all_rolls
+# and the sign that turns it into an amount of symbols, as (row, cell,
+# sign, glyph)
+_GOOD_CELLS, _BAD_CELLS = [
+    tuple(
+        tuple(
+            (row, row*ROLL_WIDTH + field, -1 if row > 2 and field < 3 else 1,
+                glyph)
+            for row, field, glyph in group
+            )
+        for group in side
+        )
+    for side in (_GOOD_DICE, _BAD_DICE)
+    ]
+
+# Memos
+
+# Markup already built, keyed on the tuple it was built from. The history
+# and the live panel share them, so a pool or result is only built once.
+# Oldest first, the least recently used entry is dropped once one is full.
+MEMO_SIZE = 4096 # Entries kept by each memo
+_POOL_MEMO = OrderedDict()
+_RESULT_MEMO = OrderedDict()
+_DICE_MEMO = OrderedDict()
+_HALFPOOL_MEMO = OrderedDict()
+
+# Functions
+
+def _recall(memo, key):
+    """Returns markup stored in a memo, marked most recently used, or None"""
+    text = memo.pop(key, None)
+    if text is not None:
+        memo[key] = text
+    return text
+
+def _remember(memo, key, text):
+    """Stores built markup in a memo, dropping the least recently used
+    entry if it's full, and returns it"""
+    memo[key] = text
+    if len(memo) > MEMO_SIZE:
+        memo.popitem(last=False)
+    return text
+
+def pool_markup(pool=(0, 0, 0, 0, 0, 0)):
+    """Takes 6 dice amounts and returns the pool as dice symbols"""
+    key = tuple(pool[:6])
+    text = _recall(_POOL_MEMO, key)
+    if text is None:
+        text = _remember(_POOL_MEMO, key, _build_pool(key))
+    return text
+
+def _build_pool(pool):
+    # If either pool side has more than 6 dice, we count by numbers
+    if pool[0] + pool[1] + pool[2] > 6 or pool[3] + pool[4] + pool[5] > 6:
+        parts = []
+        for side in (_GOOD_POOL, _BAD_POOL):
+            if side is _BAD_POOL:
+                parts.append(" | ")
+            for i, glyph, symbol in side:
+                if pool[i]:
+                    parts.append(COL[i] + str(pool[i]) + _COUNT_CLOSE[glyph])
+        return "".join(parts)
+
+    # Numbers by visual:
+    parts = [SWF]
+    for side in (_GOOD_POOL, _BAD_POOL):
+        if side is _BAD_POOL:
+            parts.append(SWFC + " | " + SWF)
+        for i, glyph, symbol in side:
+            parts.append(COL[i] + symbol*pool[i] + CC)
+    parts.append(SWFC)
+    return "".join(parts)
+
+def result_markup(results=(0, 0, 0, 0)):
+    """Takes net success, advantage, triumph and despair, returns symbols"""
+    key = tuple(results[:4])
+    text = _recall(_RESULT_MEMO, key)
+    if text is None:
+        text = _remember(_RESULT_MEMO, key, _build_result(key))
+    return text
+
+def _build_result(results):
+    parts = [B]
+
+    # Success vs Failure
+    if results[0] > 0:
+        parts.append(COL[0] + str(results[0]) + _RESULT_CLOSE["s"])
+    elif results[0] < 0:
+        parts.append(COL[3] + str(-results[0]) + _RESULT_CLOSE["f"])
+
+    # Threat vs Advantage
+    if results[1] > 0:
+        parts.append(COL[2] + "  " + str(results[1]) + _RESULT_CLOSE["a"])
+    elif results[1] < 0:
+        parts.append(COL[5] + "  " + str(-results[1]) + _RESULT_CLOSE["t"])
+
+    if results[2]: # Triumph
+        parts.append(COL[1] + "  " + str(results[2]) + _RESULT_CLOSE["x"])
+
+    if results[3]: # Despair
+        parts.append(COL[4] + "  " + str(results[3]) + _RESULT_CLOSE["y"])
+
+    parts.append(BC)
+    return "".join(parts)
+
+def dice_markup(all_rolls):
+    """Takes PoolModel.all_rolls and returns every color's results
+
+    Small results are shown symbol by symbol, large ones by count. An empty
+    pool gives an empty string.
+
+    """
+    cells = getattr(all_rolls, 'cells', None)
+    if cells is not None: # A PoolRecord, already flat
+        key = tuple(cells)
+    else:
+        key = _flatten(all_rolls)
+    text = _recall(_DICE_MEMO, key)
+    if text is None:
+        text = _remember(_DICE_MEMO, key, _build_dice(key))
+    return text
+
+def _flatten(all_rolls):
+    """Turns rows of all_rolls into one flat tuple, ROLL_WIDTH per row"""
+    cells = []
+    for roll in all_rolls:
+        row = list(roll[:ROLL_WIDTH])
+        cells.extend(row + [0] * (ROLL_WIDTH - len(row)))
+    return tuple(cells)
+
+def _build_dice(cells):
+    """Builds dice_markup() from the flat cells of all_rolls"""
+    # Check if there have been any results...
+    if not any(cells[::ROLL_WIDTH]):
+        return ''
+
+    # Every symbol that would be shown
+    total_results = 0
+    for side in (_GOOD_CELLS, _BAD_CELLS):
+        for group in side:
+            for row, cell, sign, glyph in group:
+                total_results += sign * cells[cell]
+
+    if total_results <= 20:
+        # Symbol by symbol, the groups of each side split by a space
+        parts = [B + SWF]
+        for side in (_GOOD_CELLS, _BAD_CELLS):
+            if side is _BAD_CELLS:
+                parts.append(SWFC + '  |  ' + SWF)
+            for n, group in enumerate(side):
+                if n:
+                    parts.append(' ')
+                for row, cell, sign, glyph in group:
+                    parts.append(COL[row] + glyph*(sign*cells[cell]) + CC)
+        return "".join(parts)
+
+    # By count, every result but the last of each side followed by a space
+    parts = [B]
+    for side in (_GOOD_CELLS, _BAD_CELLS):
+        if side is _BAD_CELLS:
+            parts.append(' | ')
+        last = side[-1][-1]
+        for group in side:
+            for row, cell, sign, glyph in group:
+                amount = sign * cells[cell]
+                if amount:
+                    parts.append(COL[row] + str(amount) + _COUNT_CLOSE[glyph])
+                    if (row, cell, sign, glyph) != last:
+                        parts.append(' ')
+    return "".join(parts)
+
+def halfpool_markup(pool=(1, 1, 0), bad="n"):
+    """Takes a single tuple and returns a string"""
+    key = (tuple(pool[:3]), bad)
+    text = _recall(_HALFPOOL_MEMO, key)
+    if text is None:
+        text = _remember(_HALFPOOL_MEMO, key, _build_halfpool(*key))
+    return text
+
+def _build_halfpool(pool, bad):
+    # c = proficiency/challenge
+    # b = boost/setback
+    # d = ability/difficulty
+    if bad == "n":
+        side = _GOOD_POOL
+    else:
+        side = _BAD_POOL
+    parts = []
+    for i, glyph, symbol in side:
+        parts.append(COL[i] + SWF + symbol*pool[i % 3] + SWFC + CC)
+    return "".join(parts)
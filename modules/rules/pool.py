@@ -0,0 +1,377 @@
+#!/usr/bin/python
+# Pool Rules Module
+# The dice pool model behind the dice UI
+#
+# PoolModel holds the dice and results of the current pool in a PoolRecord.
+# It knows nothing about widgets, a UI subclasses it and overrides
+# refresh_ui() and record_roll() to follow along.
+
+# Imports
+
+from array import array
+
+from ..submodules.sw_dice import add_dice
+
+# Variables
+
+# TYPES
+
+DICE_TYPES = [
+    "ability",
+    "proficiency",
+    "boost",
+    "difficulty",
+    "challenge",
+    "setback"
+    ]
+
+RESULT_TYPES = [
+    "success",
+    "failure",
+    "advantage",
+    "threat",
+    "triumph",
+    "despair"
+    ]
+
+# Controls the Common Pools button grid
+COMMON_POOLS = [
+    [4, 0, 0],
+    [5, 0, 0],
+    [6, 0, 0],
+    [1, 1, 0],
+    [2, 1, 0],
+    [3, 1, 0],
+    [4, 1, 0],
+    [5, 1, 0],
+    [1, 2, 0],
+    [2, 2, 0],
+    [3, 2, 0],
+    [4, 2, 0],
+    [1, 3, 0] ,
+    [2, 3, 0],
+    [0, 4, 0],
+    [1, 4, 0],
+    [0, 5, 0]
+    ]
+
+# Every color of a PoolRecord is a row of these fields
+RECORD_FIELDS = ("dice", "success", "advantage", "special")
+
+# Functions
+
+def upgrade_pool(pool, times=1, bad="n"):
+    """Returns the dice amounts of a pool after upgrading it (times) times
+
+    Each upgrade turns an ability die into a proficiency die, or a
+    difficulty die into a challenge die with bad set to "y". With none
+    left to turn, an ability (or difficulty) die is added instead.
+
+    """
+    pool = list(pool[:6])
+    low = 3 if bad == "y" else 0
+    for i in range(times):
+        if pool[low]:
+            pool[low] -= 1
+            pool[low + 1] += 1
+        else:
+            pool[low] += 1
+    return pool
+
+def downgrade_pool(pool, times=1, bad="n"):
+    """Returns the dice amounts of a pool after downgrading it (times) times
+
+    Each downgrade turns a proficiency die into an ability die, or a
+    challenge die into a difficulty die with bad set to "y". Downgrades
+    with nothing left to turn have no effect.
+
+    """
+    pool = list(pool[:6])
+    low = 3 if bad == "y" else 0
+    for i in range(times):
+        if pool[low + 1]:
+            pool[low + 1] -= 1
+            pool[low] += 1
+    return pool
+
+# Classes
+
+class PoolRecord(object):
+    """A pool's dice and results in a single fixed 6 x 4 layout
+
+    Row i holds the RECORD_FIELDS of DICE_TYPES[i], special being triumph
+    for proficiency and despair for challenge, and 0 for the other colors.
+    Bad colors hold negative success and advantage. All 24 cells live in
+    one array of shorts, and the net results are kept up to date as dice
+    are added or cleared, so reading them never scans the rows.
+
+    """
+    __slots__ = ('cells', 'success', 'advantage', 'triumph', 'despair')
+
+    WIDTH = len(RECORD_FIELDS)
+
+    def __init__(self):
+        self.cells = array('h', [0] * (6 * self.WIDTH))
+        self.success = 0
+        self.advantage = 0
+        self.triumph = 0
+        self.despair = 0
+
+    def __len__(self):
+        return 6
+
+    def __getitem__(self, type):
+        """Returns a copy of the row of a DICE_TYPES index"""
+        if not 0 <= type < 6:
+            raise IndexError("pool record type out of range")
+        return self.cells[type*self.WIDTH:(type + 1)*self.WIDTH]
+
+    def __iter__(self):
+        for type in range(6):
+            yield self[type]
+
+    def add(self, type, number=0, success=0, advantage=0, special=0):
+        """Adds the dice and net results of a roll to a DICE_TYPES index"""
+        row = type * self.WIDTH
+        cells = self.cells
+        cells[row] += number
+        cells[row + 1] += success
+        cells[row + 2] += advantage
+        cells[row + 3] += special
+        self.success += success
+        self.advantage += advantage
+        if type == 1:
+            self.triumph += special
+        elif type == 4:
+            self.despair += special
+
+    def clear_type(self, type):
+        """Takes a single color out of the pool"""
+        row = type * self.WIDTH
+        cells = self.cells
+        self.add(type, -cells[row], -cells[row + 1], -cells[row + 2],\
+            -cells[row + 3])
+
+    def clear(self):
+        for i in range(len(self.cells)):
+            self.cells[i] = 0
+        self.success = 0
+        self.advantage = 0
+        self.triumph = 0
+        self.despair = 0
+
+    def amounts(self):
+        """Returns the amount of dice of each type"""
+        return self.cells[::self.WIDTH].tolist()
+
+    def results(self):
+        """Returns the net (success, advantage, triumph, despair)"""
+        return self.success, self.advantage, self.triumph, self.despair
+
+class PoolModel(object):
+    """A dice pool and its results
+
+    The dice and results of every color are kept in a PoolRecord, which
+    all_rolls reads as rows of [dice, success, advantage, special] in
+    DICE_TYPES order. Bad colors hold negative success and advantage.
+
+    Dice are rolled from stream, the shared rng "dice" stream while None.
+
+    """
+    def __init__(self, stream=None):
+
+        self.stream = stream # Rng stream to roll from, see add_dice()
+
+        self.record = PoolRecord() # Dice and results of every color
+
+        # Batched Updates
+        # While _batch_depth is above zero, refreshes are held back and
+        # fired once when the outermost batch ends.
+        self._batch_depth = 0
+        self._refresh_pending = False
+        self.refresh_count = 0 # How many times the UI has been refreshed
+
+    @property
+    def all_rolls(self):
+        """The record, read as a row per color in DICE_TYPES order"""
+        return self.record
+
+    # Totals
+
+    @property
+    def pool_success(self):
+        return self.record.success
+
+    @property
+    def pool_advantage(self):
+        return self.record.advantage
+
+    @property
+    def pool_triumph(self):
+        return self.record.triumph
+
+    @property
+    def pool_despair(self):
+        return self.record.despair
+
+    def refresh_ui(self):
+        """Called after every (batched) change, override to redraw a UI"""
+        pass
+
+    def record_roll(self):
+        """Called with a pool that's about to be reset, override to save it"""
+        pass
+
+    def has_dice(self):
+        """Returns True if any dice are in the pool"""
+        for amount in self.record.amounts():
+            if amount > 0:
+                return True
+        return False
+
+    def save_roll(self):
+        """Saves current roll to roll history"""
+        if self.has_dice(): # Make sure we don't save an empty pool
+            self.record_roll()
+            self.reset()
+
+    def reset(self):
+        self.record.clear()
+        self._refresh()
+
+    def reset_type(self, str_type):
+        """Zeroes and resets a single dice class"""
+        self.record.clear_type(DICE_TYPES.index(str_type))
+        self._refresh()
+
+    def add_type(self, str_type, value=1):
+        """Rolls (value) more dice of a single type into the pool"""
+        full_pool = [0,0,0,0,0,0]
+        type = DICE_TYPES.index(str_type)
+        full_pool[type] = value
+        self.set_pool(full_pool)
+
+    def set_pool(self, pool=(0,0,0,0,0,0), reset="n"):
+        """Sets the dice pool to a specific amount and rolls"""
+        # All six colors are applied in one batch so the UI refreshes once
+        self.begin_update()
+        try:
+            self._set_pool(pool, reset)
+        finally:
+            self.end_update()
+
+    def _set_pool(self, pool=(0,0,0,0,0,0), reset="n"):
+        """Applies the results of a roll for each color, see set_pool()"""
+        if reset == "y": # When getting a history pool, we want to reset
+            self.save_roll()
+        for i in range(6):
+            dice_num = pool[i]
+            dice_type = DICE_TYPES[i]
+            result_list = []
+            for result in add_dice(dice_num, dice_type, self.stream):
+                result_list.append(result)
+            if len(result_list) < 5: # Most dice only return 4 results
+                result_list.append(0)
+            # The result list now reads:
+            # 0 - Type
+            # 1 - Number of those dice rolled
+            # 2 - Success or Fail
+            # 3 - Advantage or Threat
+            # 4 - Triumph or Despair
+            # Update dice results takes each dice and, by type, adds it
+            # to the record, then calls for a refresh. Since we're inside
+            # a batch, the UI only gets updated once, after the last type.
+            self._update_dice_results(
+                result_list[0],
+                result_list[1],
+                result_list[2],
+                result_list[3],
+                result_list[4]
+                )
+
+    def _update_dice_results(self, type = "", number = 0, success = 0,\
+        advantage = 0, special = 0):
+        """Adds dice results to the record
+
+        Args:
+            type: One of the dice types from DICE_TYPES, used to determine
+                what record row to affect
+
+            number: Amount of dice that were rolled
+
+            success: Amount of Success/Failure that was generated. Based on
+                the type, this might be subtracted from the overall number
+
+            advantage: Amount of Advantage/Threat that was generated. Based
+                on the type, this might be subtracted from the overall number
+
+            special: Either Triumph or Despair, based on the type given. Will
+                never be subtracted, as they do not cancel each other out.
+
+        """
+        # The else happens if the tuple isn't being received
+        # from add_dice() correctly.
+        if type not in DICE_TYPES:
+            print("Type not recognized during update_dice_results()")
+        else:
+            i = DICE_TYPES.index(type)
+            if i > 2: # Bad colors
+                success = -success
+                advantage = -advantage
+            self.record.add(i, number, success, advantage, special)
+        self._refresh()
+
+    def begin_update(self):
+        """Holds back refreshes until the matching end_update()"""
+        self._batch_depth += 1
+
+    def end_update(self):
+        """Ends a batch, firing a single refresh if one was held back"""
+        self._batch_depth -= 1
+        if self._batch_depth == 0 and self._refresh_pending:
+            self._refresh()
+
+    def _refresh(self):
+        """Updates the UI, unless we're in a batch"""
+        if self._batch_depth:
+            self._refresh_pending = True
+            return
+        self._refresh_pending = False
+        self.refresh_count += 1
+        self.refresh_ui()
+
+    def dice_amounts(self):
+        """Returns the amount of dice of each type in the pool"""
+        return self.record.amounts()
+
+    def upgrade(self, times=1, bad="n"):
+        """Upgrades the good (or bad) dice of the pool, see upgrade_pool()"""
+        self._change_amounts(upgrade_pool(self.dice_amounts(), times, bad))
+
+    def downgrade(self, times=1, bad="n"):
+        """Downgrades the good (or bad) dice, see downgrade_pool()"""
+        self._change_amounts(downgrade_pool(self.dice_amounts(), times, bad))
+
+    def _change_amounts(self, pool):
+        """Rerolls every type whose amount differs from pool
+
+        Results are only kept per type, so a type that loses a die can't
+        take back just that die's faces. Changed types are rolled again at
+        their new amounts, the rest of the pool keeps its results.
+
+        """
+        current = self.dice_amounts()
+        added = [0,0,0,0,0,0]
+        self.begin_update()
+        try:
+            for i in range(6):
+                if pool[i] != current[i]:
+                    self.reset_type(DICE_TYPES[i])
+                    added[i] = pool[i]
+            self._set_pool(added)
+        finally:
+            self.end_update()
+
+    def roll_again(self, instance=None):
+        """Takes the current dice amounts and rolls the exact same roll"""
+        self.set_pool(self.dice_amounts(), "y")
@@ -0,0 +1,230 @@
+#!/usr/bin/python
+# Face Buffer Module
+# Pre-drawn dice faces for interactive rolls
+#
+# A BufferedStream keeps a ring of ready faces for each common die (d6, d8,
+# d12 and d100), topped up by a background thread whenever a ring drops
+# below its watermark. A click then only copies faces out of a ring instead
+# of running the generator on the UI thread. If a ring ever runs dry, faces
+# are drawn directly, so a roll never waits on the thread.
+#
+# Every buffer draws from its own child of the rng service, with a stream
+# per die size, never from the streams get_stream() hands everyone else.
+# Rings are filled as soon as they're made, always in blocks of the same
+# size, and emptied and filled again whenever rng.seed() reseeds the service.
+# So a seeded buffer repeats its faces as long as no ring runs dry, however
+# the worker thread happens to be scheduled.
+
+# Imports
+
+import threading
+from array import array
+
+from .rng import rng_service, watch_seed
+
+# Variables
+
+# Die sizes kept ready: boost/setback, ability/difficulty,
+# proficiency/challenge/force and crits
+BUFFERED_SIDES = (6, 8, 12, 100)
+
+RING_SIZE = 8192 # Faces held per die size
+WATERMARK = 2048 # Refill once fewer faces than this are left
+
+# Shared buffered streams by name, see buffered_stream()
+_BUFFERED = {}
+_BUFFERED_LOCK = threading.Lock()
+
+# Functions
+
+def _buffer_service(service, name):
+    """Returns the child service a shared buffer of a name draws from"""
+    return service.child("buffered." + name)
+
+def buffered_stream(name):
+    """Returns the shared BufferedStream of a name"""
+    with _BUFFERED_LOCK:
+        stream = _BUFFERED.get(name)
+        if stream is None:
+            stream = BufferedStream(_buffer_service(rng_service(), name))
+            _BUFFERED[name] = stream
+        return stream
+
+def _reseed(service):
+    """Moves every shared buffer onto a newly seeded service"""
+    with _BUFFERED_LOCK:
+        for name, stream in _BUFFERED.items():
+            stream.reset(_buffer_service(service, name))
+
+watch_seed(_reseed)
+
+# Classes
+
+class FaceRing(object):
+    """A fixed size ring buffer of faces of a single die size
+
+    Faces are kept in a byte array. take() and put() copy whole slices, and
+    are safe to call from different threads.
+
+    """
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.faces = array('B', bytearray(size))
+        self.start = 0 # Position of the oldest face
+        self.count = 0 # Faces ready to be taken
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def take(self, amount):
+        """Removes and returns (amount) faces, None if there aren't enough"""
+        with self.lock:
+            if amount > self.count:
+                return None
+            end = self.start + amount
+            if end <= self.size:
+                faces = self.faces[self.start:end]
+            else: # Wraps around the end of the ring
+                faces = self.faces[self.start:] + self.faces[:end - self.size]
+            self.start = end % self.size
+            self.count -= amount
+            return faces
+
+    def clear(self):
+        """Throws away every face in the ring"""
+        with self.lock:
+            self.start = 0
+            self.count = 0
+
+    def put(self, faces):
+        """Adds as many of a byte array of faces as fit, returns how many"""
+        with self.lock:
+            faces = faces[:self.size - self.count]
+            end = (self.start + self.count) % self.size
+            first = min(len(faces), self.size - end)
+            self.faces[end:end + first] = faces[:first]
+            self.faces[:len(faces) - first] = faces[first:]
+            self.count += len(faces)
+            return len(faces)
+
+class BufferedStream(object):
+    """Pre-drawn dice from a RandomService of their own
+
+    Can be used anywhere a RandomStream is, integers() and roll() take
+    faces from the rings of BUFFERED_SIDES and pass anything else straight
+    to the service's "other" stream. Each ring is refilled from its own
+    stream, (size - watermark) faces at a time, and every ring is filled
+    before this returns.
+
+    """
+    def __init__(self, service, sides=BUFFERED_SIDES, size=RING_SIZE,
+        watermark=WATERMARK):
+        self.watermark = watermark
+        self.block = max(size - watermark, 1) # Faces drawn by a refill
+        self.rings = dict((side, FaceRing(size)) for side in sides)
+        self.refills = 0 # Blocks drawn into the rings
+        self.misses = 0 # Draws that found a ring empty
+
+        # The streams are only ever used by one thread at a time, and faces
+        # are put in the rings in the order they were drawn
+        self._draw_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        with self._draw_lock:
+            self._use(service)
+        self._worker = threading.Thread(target=self._run)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def _use(self, service):
+        """Draws from a service's streams, holding the draw lock"""
+        self.stream = service.stream("other")
+        self.numpy = self.stream.numpy
+        self.streams = dict(
+            (side, service.stream("d%d" % side)) for side in self.rings
+            )
+        self._fill()
+
+    def _draw(self, sides, size):
+        with self._draw_lock:
+            return self.streams.get(sides, self.stream).integers(sides, size)
+
+    def _fill(self):
+        """Tops up any ring under the watermark, holding the draw lock"""
+        for sides, ring in self.rings.items():
+            while len(ring) < self.watermark:
+                faces = self.streams[sides].integers(sides, self.block)
+                ring.put(self._to_bytes(faces))
+                self.refills += 1
+
+    def _to_bytes(self, faces):
+        """Turns a flat draw of faces into a byte array"""
+        if self.numpy is not None:
+            return array('B', faces.astype(self.numpy.uint8).tobytes())
+        return array('B', faces)
+
+    def _run(self):
+        """Worker thread, tops up any ring under the watermark when woken"""
+        while not self._stopped:
+            self._wake.wait()
+            self._wake.clear()
+            with self._draw_lock:
+                self._fill()
+
+    def _take(self, sides, amount):
+        """Takes faces from a ring, waking the worker if it's running low"""
+        ring = self.rings[sides]
+        faces = ring.take(amount)
+        if len(ring) < self.watermark:
+            self._wake.set()
+        return faces
+
+    def integers(self, sides, size):
+        """Draws faces from 0 to (sides - 1), see RandomStream.integers()"""
+        if sides not in self.rings:
+            return self._draw(sides, size)
+        if isinstance(size, tuple):
+            amount = size[0] * size[1]
+        else:
+            amount = size
+        faces = self._take(sides, amount)
+        if faces is None: # Ran dry, don't wait for the worker
+            self.misses += 1
+            return self._draw(sides, size)
+        if self.numpy is not None:
+            faces = self.numpy.frombuffer(faces, dtype=self.numpy.uint8)
+            if isinstance(size, tuple):
+                faces = faces.reshape(size)
+            return faces
+        faces = faces.tolist()
+        if isinstance(size, tuple):
+            rows, columns = size
+            return [
+                faces[row*columns:(row + 1)*columns] for row in range(rows)
+                ]
+        return faces
+
+    def roll(self, sides):
+        """Rolls a single (sides) sided die, from 1 to (sides)"""
+        if sides not in self.rings:
+            with self._draw_lock:
+                return self.stream.roll(sides)
+        faces = self._take(sides, 1)
+        if faces is None:
+            self.misses += 1
+            with self._draw_lock:
+                return self.streams[sides].roll(sides)
+        return faces[0] + 1
+
+    def reset(self, service):
+        """Throws away every pre-drawn face and refills from a new service"""
+        with self._draw_lock:
+            for ring in self.rings.values():
+                ring.clear()
+            self._use(service)
+
+    def close(self):
+        """Stops the worker thread"""
+        self._stopped = True
+        self._wake.set()
@@ -0,0 +1,286 @@
+#!/usr/bin/python
+# History Export Module
+# Streams the dice, critical injury and force history out to files
+#
+# Rows are read one at a time, oldest first, from the dice RollStore and the
+# session log, and written as soon as they're read. However long the history
+# is, an export never holds more than one Arrow batch of rows in memory. An
+# Export works through its rows a step at a time. The UI runs one step per
+# frame so it never stalls, and scripts can call run() to do them all.
+#
+# CSV and NDJSON need nothing extra. Arrow IPC files and Parquet need
+# pyarrow, which is only imported the first time it's asked for. Scripts
+# open the session log with open_log(), which never writes to it.
+
+# Imports
+
+import csv
+import json
+import sys
+from collections import OrderedDict
+from itertools import islice
+from os import makedirs
+from os.path import isdir, join
+
+from .session_log import LOG_FOLDER, SessionLog
+from .sw_dice import POOL_TYPES, RESULT_FIELDS
+
+# Variables
+
+# Where the UI puts its exports, a folder per export
+EXPORT_FOLDER = join(LOG_FOLDER, "exports")
+
+# Columns of every kind of history, matching the session log records
+DICE_COLUMNS = ("time",) + POOL_TYPES + RESULT_FIELDS[:4]
+CRIT_COLUMNS = ("time", "previous", "mod", "roll", "severity", "name")
+FORCE_COLUMNS = ("time", "dice", "light", "dark")
+
+# Arrow types of the columns, every other column is an int16
+COLUMN_TYPES = {
+    "time": "float64", # Seconds since the epoch
+    "name": "string"
+    }
+
+STEP_ROWS = 500 # Rows written by a single Export.step()
+BATCH_ROWS = 8192 # Rows held before they're written as one Arrow batch
+
+# pyarrow once it's been imported, see load_pyarrow()
+_PYARROW = []
+
+# Functions
+
+def load_pyarrow():
+    """Returns pyarrow, importing it on first use, or None if it's missing"""
+    if not _PYARROW:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            pyarrow = None
+        _PYARROW.append(pyarrow)
+    return _PYARROW[0]
+
+def export_formats():
+    """Returns the formats that can be exported to with what's installed"""
+    formats = ["csv", "ndjson"]
+    if load_pyarrow() is not None:
+        formats.extend(["arrow", "parquet"])
+    return formats
+
+def store_rows(store):
+    """Yields the rolls of a RollStore as flat rows, oldest first
+
+    Rolls are found by their age, not the newest first index, so a roll
+    saved while this is being read doesn't shift the rows. Only the rolls
+    stored when reading starts are given.
+
+    """
+    count = len(store)
+    for age in range(count):
+        time, dice, results = store[len(store) - 1 - age]
+        yield (time,) + tuple(dice) + tuple(results)
+
+def record_rows(records):
+    """Yields the records of a session log RecordFile, oldest first, with
+    any text fields decoded"""
+    for index in range(len(records)):
+        row = []
+        for field in records[index]:
+            if isinstance(field, bytes):
+                field = field.rstrip(b'\0').decode('utf-8')
+            row.append(field)
+        yield tuple(row)
+
+def open_log(folder=LOG_FOLDER):
+    """Opens the session log in a folder read only, so it can be exported
+    while the app is still adding rolls to it"""
+    return SessionLog(folder, read_only=True)
+
+def history_sources(store=None, log=None):
+    """Returns the (name, columns, rows) of every history there is
+
+    Args:
+        store: The dice RollStore, read from the session log if None
+
+        log: The SessionLog holding the critical injury and force history.
+            Without a log, only the dice in the store are exported.
+
+    """
+    sources = []
+    if store is not None:
+        sources.append(("dice", DICE_COLUMNS, store_rows(store)))
+    elif log is not None:
+        sources.append(("dice", DICE_COLUMNS, record_rows(log.dice)))
+    if log is not None:
+        sources.append(("crits", CRIT_COLUMNS, record_rows(log.crits)))
+        sources.append(("force", FORCE_COLUMNS, record_rows(log.force)))
+    return sources
+
+def _text_file(path):
+    """Opens a text file for writing that the csv module is happy with"""
+    if sys.version_info[0] < 3:
+        return open(path, 'wb')
+    return open(path, 'w', newline='')
+
+# Classes
+
+class CsvWriter(object):
+    """Writes rows to a CSV file, with a header of the column names"""
+    extension = ".csv"
+
+    def __init__(self, path, columns):
+        self._file = _text_file(path)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+class NdjsonWriter(object):
+    """Writes rows as JSON objects, one per line"""
+    extension = ".ndjson"
+
+    def __init__(self, path, columns):
+        self.columns = columns
+        self._file = open(path, 'w')
+
+    def write(self, row):
+        self._file.write(json.dumps(OrderedDict(zip(self.columns, row))))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+class ArrowWriter(object):
+    """Writes rows to an Arrow IPC file, BATCH_ROWS to a record batch"""
+    extension = ".arrow"
+
+    def __init__(self, path, columns):
+        self.pyarrow = load_pyarrow()
+        fields = []
+        for column in columns:
+            type = getattr(self.pyarrow, COLUMN_TYPES.get(column, "int16"))
+            fields.append((column, type()))
+        self.schema = self.pyarrow.schema(fields)
+        self._rows = []
+        self._writer = self._open(path)
+
+    def _open(self, path):
+        return self.pyarrow.ipc.new_file(path, self.schema)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        """Writes the rows held so far as one record batch"""
+        if not self._rows:
+            return
+        arrays = []
+        for i, field in enumerate(self.schema):
+            arrays.append(self.pyarrow.array(
+                [row[i] for row in self._rows],
+                type = field.type
+                ))
+        self._write_batch(self.pyarrow.RecordBatch.from_arrays(
+            arrays,
+            schema = self.schema
+            ))
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+class ParquetWriter(ArrowWriter):
+    """Writes rows to a Parquet file, BATCH_ROWS to a row group"""
+    extension = ".parquet"
+
+    def _open(self, path):
+        return self.pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def _write_batch(self, batch):
+        self._writer.write_table(self.pyarrow.Table.from_batches([batch]))
+
+# Writer of every format, see export_formats()
+WRITERS = {
+    "csv": CsvWriter,
+    "ndjson": NdjsonWriter,
+    "arrow": ArrowWriter,
+    "parquet": ParquetWriter
+    }
+
+class Export(object):
+    """Writes every history source to its own file in a folder
+
+    Nothing is written until step() or run() is called. Each step writes
+    at most STEP_ROWS rows, moving on to the next source's file when one
+    runs out.
+
+    """
+    def __init__(self, sources, folder, format="csv"):
+        if format not in WRITERS:
+            raise ValueError("unknown export format: " + repr(format))
+        if format in ("arrow", "parquet") and load_pyarrow() is None:
+            raise ValueError("exporting to " + format + " needs pyarrow")
+        self.folder = folder
+        self.format = format
+        self.paths = [] # Files written (or being written) so far
+        self.rows = 0 # Rows written so far, of every source
+        self.done = False
+
+        self._sources = list(sources)
+        self._rows = None # Rows of the source being written
+        self._writer = None
+
+    def step(self, rows=STEP_ROWS):
+        """Writes up to (rows) rows, returns False once everything is done"""
+        while rows > 0 and not self.done:
+            if self._writer is None:
+                self._next_source()
+                continue
+            written = 0
+            for row in islice(self._rows, rows):
+                self._writer.write(row)
+                written += 1
+            self.rows += written
+            rows -= written
+            if rows > 0: # The source ran out
+                self._writer.close()
+                self._writer = None
+        return not self.done
+
+    def run(self):
+        """Writes everything, returns the paths of the files written"""
+        while self.step():
+            pass
+        return self.paths
+
+    def _next_source(self):
+        """Opens the file of the next source, or finishes"""
+        if not self._sources:
+            self.done = True
+            return
+        if not isdir(self.folder):
+            makedirs(self.folder)
+        name, columns, rows = self._sources.pop(0)
+        writer = WRITERS[self.format]
+        path = join(self.folder, name + writer.extension)
+        self._writer = writer(path, columns)
+        self._rows = rows
+        self.paths.append(path)
+
+    def cancel(self):
+        """Stops exporting, closing the file being written"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._sources = []
+        self.done = True
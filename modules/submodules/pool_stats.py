@@ -0,0 +1,271 @@
+#!/usr/bin/python
+# Pool Statistics Module
+# Cached odds for dice pools, so repeated pools are only computed once
+#
+# PoolOdds keeps the exact distribution of a single pool that changes a die
+# at a time. Adding, removing, upgrading or downgrading a die only convolves
+# or deconvolves that die, instead of recomputing the whole pool.
+
+# Imports
+
+from collections import OrderedDict
+
+from .sw_dice import DICE_FACES, POOL_TYPES, pool_distribution
+
+# Variables
+
+# PoolOdds packs every net (success, advantage) result into a single int,
+# success * PACK_RADIX + advantage. Adding two packed results adds both
+# parts, and packed results sort the same as their tuples, as long as
+# advantage stays within half of PACK_RADIX either side of zero.
+PACK_RADIX = 1 << 12
+_PACK_HALF = PACK_RADIX // 2
+
+# Functions
+
+def pool_key(pool):
+    """Normalizes any 6 color pool list or tuple into a hashable 6-tuple"""
+    key = [int(i) for i in pool[:6]]
+    key.extend([0] * (6 - len(key)))
+    return tuple(key)
+
+def pool_stats(pool=(0, 0, 0, 0, 0, 0)):
+    """Summarizes the exact distribution of a pool
+
+    Returns a dict with:
+        success: Chance of at least one net success
+        failure: Chance of at least one net failure
+        advantage: Expected net advantage (negative for threat)
+        triumph: Chance of at least one triumph
+        despair: Chance of at least one despair
+
+    """
+    stats = {
+        'success': 0.0,
+        'failure': 0.0,
+        'advantage': 0.0,
+        'triumph': 0.0,
+        'despair': 0.0
+        }
+    for key, chance in pool_distribution(pool).items():
+        if key[0] > 0:
+            stats['success'] += chance
+        elif key[0] < 0:
+            stats['failure'] += chance
+        stats['advantage'] += key[1] * chance
+        if key[2]:
+            stats['triumph'] += chance
+        if key[3]:
+            stats['despair'] += chance
+    return stats
+
+def _die_counts(type):
+    """Returns {packed (success, advantage): faces} of a single die"""
+    counts = {}
+    for face in DICE_FACES[type]:
+        key = face[0]*PACK_RADIX + face[1]
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def _any_chance(type, field, dice):
+    """Returns the chance that (dice) dice of a type roll at least one of a
+    result, field being its place in a face (2 for triumph, 3 for despair)"""
+    faces = DICE_FACES[type]
+    without = len([face for face in faces if not face[field]])
+    return 1 - (float(without) / len(faces)) ** dice
+
+def _add_die(counts, die):
+    """Returns the face counts of a pool with one more die added"""
+    result = {}
+    for shift, faces in die.items():
+        for key, count in counts.items():
+            key += shift
+            result[key] = result.get(key, 0) + count * faces
+    return result
+
+def _remove_die(counts, die):
+    """Returns the face counts of a pool with one of its dice taken out
+
+    Undoes _add_die(). Results are solved in ascending order, starting
+    from the lowest result of the die, so every other result of the die
+    only ever refers back to ones already solved. With whole face counts
+    the division is always exact.
+
+    """
+    low = min(die)
+    low_faces = die[low]
+    others = [(shift - low, faces) for shift, faces in die.items()\
+        if shift != low]
+    result = {}
+    for key in sorted(counts):
+        base = key - low
+        count = counts[key]
+        for shift, faces in others:
+            count -= faces * result.get(base - shift, 0)
+        if count:
+            result[base] = count // low_faces
+    return result
+
+# Classes
+
+class PoolOdds(object):
+    """The exact odds of one pool, updated a die at a time
+
+    The distribution is kept in whole face counts out of total, so dice
+    can be taken back out exactly. set_pool() and stats_for() only add or
+    take out the dice that differ from the current pool, which for the
+    usual single die change or upgrade costs a couple of passes over the
+    distribution instead of a rebuild.
+
+    Triumph and despair never cancel anything and only depend on the
+    amount of proficiency and challenge dice, so only net success and
+    advantage are kept in the distribution.
+
+    """
+    def __init__(self, pool=(0, 0, 0, 0, 0, 0)):
+        self.pool = (0, 0, 0, 0, 0, 0)
+        # Face counts keyed by packed (success, advantage), see PACK_RADIX
+        self.distribution = {0: 1}
+        self.total = 1 # Face combinations counted, the product of all sides
+        self.set_pool(pool)
+
+    def _changed(self, pool):
+        """Returns (distribution, total) of the current pool changed into
+        pool, without touching the current pool"""
+        pool = pool_key(pool)
+        distribution = self.distribution
+        total = self.total
+        for i in range(6):
+            change = pool[i] - self.pool[i]
+            if not change:
+                continue
+            die = _die_counts(POOL_TYPES[i])
+            sides = sum(die.values())
+            if change > 0:
+                for n in range(change):
+                    distribution = _add_die(distribution, die)
+                total *= sides ** change
+            else:
+                for n in range(-change):
+                    distribution = _remove_die(distribution, die)
+                total //= sides ** -change
+        return distribution, total
+
+    def set_pool(self, pool):
+        """Moves the odds to a new pool, adding and removing only the dice
+        that changed"""
+        self.distribution, self.total = self._changed(pool)
+        self.pool = pool_key(pool)
+
+    def stats(self):
+        """Returns pool_stats() of the current pool"""
+        return self._summarize(self.distribution, self.total, self.pool)
+
+    def stats_for(self, pool):
+        """Returns pool_stats() of another pool, worked out from the
+        current one, e.g. to preview an upgrade"""
+        distribution, total = self._changed(pool)
+        return self._summarize(distribution, total, pool_key(pool))
+
+    def expected(self):
+        """Returns the average net (success, advantage, triumph, despair)
+        of the current pool"""
+        total = float(self.total)
+        success = 0
+        advantage = 0
+        for key, count in self.distribution.items():
+            net = (key + _PACK_HALF) // PACK_RADIX
+            success += net * count
+            advantage += (key - net*PACK_RADIX) * count
+        return (
+            success / total,
+            advantage / total,
+            self.pool[1] * _any_chance("proficiency", 2, 1),
+            self.pool[4] * _any_chance("challenge", 3, 1)
+            )
+
+    def percentile(self, success):
+        """Returns the chance of the current pool rolling less net success
+        than (success), plus half the chance of rolling exactly as much"""
+        below = 0
+        tied = 0
+        for key, count in self.distribution.items():
+            net = (key + _PACK_HALF) // PACK_RADIX
+            if net < success:
+                below += count
+            elif net == success:
+                tied += count
+        return (below + tied / 2.0) / self.total
+
+    def _summarize(self, distribution, total, pool):
+        """Builds pool_stats() from face counts of (success, advantage)"""
+        total = float(total)
+        success = 0
+        failure = 0
+        advantage = 0
+        for key, count in distribution.items():
+            # Bias advantage to find the success part of a packed result
+            net = (key + _PACK_HALF) // PACK_RADIX
+            if net > 0:
+                success += count
+            elif net < 0:
+                failure += count
+            advantage += (key - net*PACK_RADIX) * count
+        return {
+            'success': success / total,
+            'failure': failure / total,
+            'advantage': advantage / total,
+            'triumph': _any_chance("proficiency", 2, pool[1]),
+            'despair': _any_chance("challenge", 3, pool[4])
+            }
+
+class PoolStatsCache(object):
+    """LRU bounded cache of pool_stats() results keyed by pool_key()"""
+    def __init__(self, size=256):
+
+        # Most entries we keep before evicting the least recently used
+        self.size = size
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+        # Oldest entries first
+        self._stats = OrderedDict()
+
+    def __len__(self):
+        return len(self._stats)
+
+    def __contains__(self, pool):
+        return pool_key(pool) in self._stats
+
+    def get(self, pool):
+        """Returns the stats for a pool, computing them on a miss"""
+        key = pool_key(pool)
+        if key in self._stats:
+            self.hits += 1
+            # Re-insert to mark as most recently used
+            stats = self._stats.pop(key)
+            self._stats[key] = stats
+            return stats
+        self.misses += 1
+        stats = pool_stats(key)
+        self._stats[key] = stats
+        if len(self._stats) > self.size:
+            self._stats.popitem(last=False)
+        return stats
+
+    def prewarm(self, pools):
+        """Computes and stores stats for each pool without counting them"""
+        for pool in pools:
+            key = pool_key(pool)
+            if key not in self._stats:
+                self._stats[key] = pool_stats(key)
+                if len(self._stats) > self.size:
+                    self._stats.popitem(last=False)
+
+    def clear(self):
+        """Empties the cache and zeroes the counters"""
+        self._stats.clear()
+        self.hits = 0
+        self.misses = 0
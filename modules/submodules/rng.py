@@ -0,0 +1,215 @@
+#!/usr/bin/python
+# RNG Module
+# Seedable, independent random number streams for every kind of roll
+#
+# Instead of sharing the global random module, every consumer draws from its
+# own named stream ("dice", "force", "crit"...) of a RandomService. Streams
+# are derived from the service's seed and their name, so the same seed
+# always replays the same rolls, whatever order the streams are used in.
+#
+# With NumPy 1.17+ each stream is a PCG64 generator built from a
+# SeedSequence, stream names and spawned children each getting their own
+# spawn key, the same way SeedSequence.spawn() keeps children independent.
+# Services can also be watched for being reseeded, see watch_seed().
+# Without it, streams fall back to random.Random (or an older NumPy's
+# RandomState) seeded from a hash of the seed, name and spawn path.
+
+# Imports
+
+import random
+from hashlib import sha256
+
+# Variables
+
+# Faces drawn in one go whenever a stream's block of single rolls runs out
+BLOCK_SIZE = 4096
+
+# NumPy is only imported by load_numpy(), on the first roll that can use it
+_NUMPY = []
+
+# The shared service, see rng_service()
+_RNG_SERVICE = []
+
+# Called with the new service whenever seed() replaces the shared one
+_SEED_WATCHERS = []
+
+# Functions
+
+def load_numpy():
+    """Returns NumPy, importing it on first use, or None if it's missing"""
+    if not _NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY.append(numpy)
+    return _NUMPY[0]
+
+def _has_seed_sequence(numpy):
+    return numpy is not None and hasattr(numpy.random, 'SeedSequence')
+
+def _name_key(name):
+    """Turns a stream name into a stable 32 bit spawn key"""
+    return int(sha256(name.encode('utf-8')).hexdigest()[:8], 16)
+
+def rng_service():
+    """Returns the shared RandomService, unseeded unless seed() was called"""
+    if not _RNG_SERVICE:
+        _RNG_SERVICE.append(RandomService())
+    return _RNG_SERVICE[0]
+
+def seed(value=None):
+    """Replaces the shared RandomService with one seeded with (value)"""
+    del _RNG_SERVICE[:]
+    _RNG_SERVICE.append(RandomService(value))
+    for watcher in _SEED_WATCHERS:
+        watcher(_RNG_SERVICE[0])
+    return _RNG_SERVICE[0]
+
+def watch_seed(watcher):
+    """Calls watcher(service) every time seed() replaces the shared service,
+    for anything holding on to draws from the old one"""
+    _SEED_WATCHERS.append(watcher)
+
+def get_stream(name):
+    """Returns a named stream of the shared RandomService"""
+    return rng_service().stream(name)
+
+# Classes
+
+class RandomStream(object):
+    """A single, independent stream of random dice faces
+
+    Faces are numbered from 0. integers() draws any number of them in one go,
+    roll() hands out single 1 based rolls from a pre-drawn block per die
+    size, so interactive rolls don't pay for a draw each.
+
+    """
+    def __init__(self, generator, numpy=None):
+        self.generator = generator
+        self.numpy = numpy # None for random.Random streams
+        self._blocks = {} # Unused faces for roll(), by sides
+
+    def integers(self, sides, size):
+        """Draws faces from 0 to (sides - 1)
+
+        Args:
+            sides: Faces on the die
+
+            size: An amount of faces, or (rows, columns) for a table
+
+        Returns a NumPy array for NumPy streams, otherwise a list (of lists).
+
+        """
+        if self.numpy is not None:
+            if hasattr(self.generator, 'integers'):
+                return self.generator.integers(0, sides, size=size)
+            return self.generator.randint(0, sides, size=size) # RandomState
+        randrange = self.generator.randrange
+        if isinstance(size, tuple):
+            rows, columns = size
+            return [
+                [randrange(sides) for i in range(columns)]
+                for row in range(rows)
+                ]
+        return [randrange(sides) for i in range(size)]
+
+    def roll(self, sides):
+        """Rolls a single (sides) sided die, from 1 to (sides)"""
+        block = self._blocks.get(sides)
+        if not block:
+            block = self._refill(sides)
+        return block.pop() + 1
+
+    def _refill(self, sides):
+        """Draws a new block of BLOCK_SIZE faces for roll()"""
+        block = self.integers(sides, BLOCK_SIZE)
+        if self.numpy is not None:
+            block = block.tolist()
+        self._blocks[sides] = block
+        return block
+
+class RandomService(object):
+    """A session's worth of named, independent random streams
+
+    Args:
+        seed: Any integer to replay the same rolls, None for fresh entropy
+
+        spawn_key: Position below the seed, only given to rebuild a spawned
+            child elsewhere (e.g. in another process) from its seed and
+            spawn_key
+
+        use_numpy: False to use the random.Random fallback even with NumPy
+            installed, and for every child too
+
+    """
+    def __init__(self, seed=None, spawn_key=(), use_numpy=True):
+        self.seed = seed
+        self.spawn_key = spawn_key
+        self._streams = {}
+        self._spawned = 0 # Children handed out by spawn()
+
+        numpy = load_numpy() if use_numpy else None
+        self._numpy = numpy
+        if _has_seed_sequence(numpy):
+            self._sequence = numpy.random.SeedSequence(
+                seed,
+                spawn_key = spawn_key
+                )
+            # Unseeded children need their parent's entropy to stay unique
+            self.seed = self._sequence.entropy
+        else:
+            self._sequence = None
+            if seed is None:
+                self.seed = random.SystemRandom().getrandbits(128)
+
+    def stream(self, name):
+        """Returns the stream of a name, creating it on first use"""
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._new_stream(self.spawn_key + (_name_key(name),))
+            self._streams[name] = stream
+        return stream
+
+    def _new_stream(self, key):
+        """Builds the stream with a spawn key below this service's seed"""
+        numpy = self._numpy
+        if self._sequence is not None:
+            sequence = numpy.random.SeedSequence(
+                self._sequence.entropy,
+                spawn_key = key
+                )
+            generator = numpy.random.Generator(numpy.random.PCG64(sequence))
+            return RandomStream(generator, numpy)
+        digest = sha256(repr((self.seed, key)).encode('utf-8')).hexdigest()
+        if numpy is not None: # NumPy before SeedSequence
+            generator = numpy.random.RandomState(int(digest[:8], 16))
+            return RandomStream(generator, numpy)
+        return RandomStream(random.Random(int(digest, 16)))
+
+    def spawn(self, count=1):
+        """Returns (count) new child services, independent of this one
+
+        Children are numbered in the order they're spawned, so a seeded
+        service always spawns the same children.
+
+        """
+        children = []
+        for i in range(count):
+            # Spawn keys are kept apart from stream names' keys by length
+            key = self.spawn_key + (0, self._spawned)
+            children.append(
+                RandomService(self.seed, key, self._numpy is not None)
+                )
+            self._spawned += 1
+        return children
+
+    def child(self, name):
+        """Returns the child service of a name, independent of this one
+
+        Unlike spawn(), the same name always gives the same child, however
+        many children were spawned before it.
+
+        """
+        key = self.spawn_key + (1, _name_key(name))
+        return RandomService(self.seed, key, self._numpy is not None)
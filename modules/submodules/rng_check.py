@@ -0,0 +1,145 @@
+#!/usr/bin/python
+# RNG Check Module
+# Statistical checks of the rng streams against every die's face table
+#
+# Run with:
+#   python -m modules.submodules.rng_check [--rolls N] [--seed S] [--budget T]
+#
+# For every die in DICE_FACES, a chi-square test checks that each of its
+# faces comes up equally often. Faces are counted by their index, not their
+# results, so a bias between two faces with the same symbols is caught too.
+# The d100 crit roll is checked the same way. Every kind of stream is
+# checked: NumPy's, the random.Random fallback RandomService uses without
+# NumPy, and the BufferedStream interactive rolls are drawn from. Seeded
+# services are checked to replay, and named streams to differ. Exits
+# nonzero if anything fails or the whole run goes over its time budget.
+
+# Imports
+
+import argparse
+import sys
+from math import sqrt
+from time import time
+
+from .face_buffer import BufferedStream
+from .rng import RandomService, load_numpy
+from .sw_dice import DICE_FACES
+
+# Variables
+
+# Upper tail z score for the chi-square significance level of 0.001
+Z_CRITICAL = 3.0902
+
+# Faces drawn at a time, small enough for buffered streams to use their rings
+CHUNK = 1000
+
+# Functions
+
+def chi_square_limit(df):
+    """Returns the 0.001 critical chi-square value (Wilson-Hilferty)"""
+    k = 2.0 / (9 * df)
+    return df * (1 - k + Z_CRITICAL * sqrt(k)) ** 3
+
+def chi_square(observed, expected):
+    """Returns the chi-square statistic of matching count lists"""
+    total = 0.0
+    for seen, wanted in zip(observed, expected):
+        total += (seen - wanted) ** 2 / float(wanted)
+    return total
+
+def check_die(type, stream, rolls):
+    """Chi-squares (rolls) single dice of a type, returns (stat, limit)
+
+    Every face of the die is its own category, expected equally often.
+
+    """
+    sides = len(DICE_FACES[type])
+    observed = [0] * sides
+    for start in range(0, rolls, CHUNK):
+        for face in stream.integers(sides, min(CHUNK, rolls - start)):
+            observed[int(face)] += 1
+    stat = chi_square(observed, [rolls / float(sides)] * sides)
+    return stat, chi_square_limit(sides - 1)
+
+def check_d100(stream, rolls):
+    """Chi-squares (rolls) single d100 rolls, returns (stat, limit)"""
+    observed = [0] * 100
+    for i in range(rolls):
+        observed[stream.roll(100) - 1] += 1
+    stat = chi_square(observed, [rolls / 100.0] * 100)
+    return stat, chi_square_limit(99)
+
+def _draw(stream, sides=1000, count=16):
+    """Returns (count) faces of a stream as a plain list"""
+    return [int(i) for i in stream.integers(sides, count)]
+
+def check_replay(seed):
+    """Returns a list of problems with seeding and stream independence"""
+    problems = []
+    first = RandomService(seed)
+    second = RandomService(seed)
+    if _draw(first.stream("dice")) != _draw(second.stream("dice")):
+        problems.append("same seed gave different rolls")
+    service = RandomService(seed)
+    child = service.spawn()[0]
+    dice = _draw(service.stream("dice"))
+    if dice == _draw(service.stream("force"))\
+        or dice == _draw(child.stream("dice")):
+        problems.append("independent streams gave the same rolls")
+    return problems
+
+def _streams(seed):
+    """Returns the (name, stream) pairs to check"""
+    streams = []
+    if load_numpy() is not None:
+        streams.append(("numpy", RandomService(seed).stream("check")))
+    streams.append((
+        "python",
+        RandomService(seed, use_numpy=False).stream("check")
+        ))
+    streams.append((
+        "buffer",
+        BufferedStream(RandomService(seed).child("check"))
+        ))
+    return streams
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Chi-square checks of the rng streams"
+        )
+    parser.add_argument('--rolls', type=int, default=60000)
+    parser.add_argument('--seed', type=int, default=2013)
+    parser.add_argument('--budget', type=float, default=30.0)
+    args = parser.parse_args()
+
+    start = time()
+    failures = 0
+    for name, stream in _streams(args.seed):
+        checks = [
+            (type, check_die(type, stream, args.rolls))
+            for type in sorted(DICE_FACES)
+            ]
+        checks.append(("d100", check_d100(stream, args.rolls)))
+        for type, result in checks:
+            stat, limit = result
+            if stat > limit:
+                failures += 1
+                status = "FAIL"
+            else:
+                status = "ok"
+            print("%-6s %-12s chi2 %8.2f  limit %8.2f  %s"
+                % (name, type, stat, limit, status))
+    for problem in check_replay(args.seed):
+        failures += 1
+        print("FAIL: " + problem)
+
+    elapsed = time() - start
+    print("%d failures in %.2fs (budget %.2fs)"
+        % (failures, elapsed, args.budget))
+    if elapsed > args.budget:
+        print("FAIL: over the time budget")
+        failures += 1
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/python
+# Roll Server Module
+# Serves pool, critical injury and force rolls over a local socket
+#
+# Nothing here touches Kivy, so bots and VTT bridges can roll without the GUI.
+#
+# Requests and responses are JSON objects, one per line. Any number of
+# requests can be sent without waiting, responses come back in the same
+# order. If a request has an "id", its response carries the same "id".
+#
+#   {"type": "pool", "pool": [ability, proficiency, boost,
+#                             difficulty, challenge, setback]}
+#       -> {"success": 1, "advantage": -2, "triumph": 0, "despair": 0}
+#   {"type": "crit", "previous": 0, "mod": 0}
+#       -> {"roll": 57, "total": 57, "severity": 2, "difficulty": "Average",
+#           "name": "Agonizing Wound", "description": "..."}
+#   {"type": "force", "dice": 2}
+#       -> {"light": 1, "dark": 2}
+#   {"type": "batch", "requests": [{...}, {...}]}
+#       -> {"results": [{...}, {...}]}
+#
+# Pool and force requests also take a "count" to roll the same dice many times
+# in one go, returning {"results": [[success, advantage, triumph, despair],
+# ...]} or {"results": [[light, dark], ...]}.
+#
+# Every connection rolls from its own random streams. Any request, batches
+# included, can carry an integer "seed" to get the exact same rolls every
+# time it's sent.
+#
+# Pools can have at most MAX_DICE dice of each color, and a single request,
+# batches included, can roll at most MAX_ROLLED dice in total (dice times
+# count) and return at most MAX_ROWS results. Every roll counts as at least
+# one die, even of an empty pool. Failed requests get {"error": "message"}.
+
+# Imports
+
+import json
+
+try:
+    import asyncio
+except ImportError: # Python 2 needs the trollius backport
+    import trollius as asyncio
+
+from .rng import RandomService, rng_service
+from .sw_dice import pool_batch
+from ..rules.crit import SEVERITY, crit_result
+from ..rules.force import force_batch
+
+# Variables
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7277
+
+MAX_COUNT = 100000 # Most rolls a single request may ask for
+MAX_DICE = 100 # Most dice of a single color in a pool
+MAX_ROLLED = 1000000 # Most dice a request (or whole batch) may roll
+MAX_ROWS = 100000 # Most results a request (or whole batch) may return
+MAX_LINE = 1048576 # Longest request line accepted, in bytes
+
+# Functions
+
+def _get_int(request, key, default=None, minimum=None, maximum=None):
+    """Reads an integer field from a request, raising ValueError if bad"""
+    value = request.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError('"' + key + '" must be an integer')
+    if minimum is not None and value < minimum:
+        raise ValueError('"' + key + '" must be at least ' + str(minimum))
+    if maximum is not None and value > maximum:
+        raise ValueError('"' + key + '" must be at most ' + str(maximum))
+    return value
+
+def _get_pool(request):
+    """Reads and checks the 6 color pool of a request"""
+    pool = request.get('pool')
+    if not isinstance(pool, list) or len(pool) != 6:
+        raise ValueError('"pool" must be a list of 6 dice amounts')
+    for amount in pool:
+        if isinstance(amount, bool) or not isinstance(amount, int)\
+            or amount < 0:
+            raise ValueError('"pool" amounts must be positive integers')
+        if amount > MAX_DICE:
+            raise ValueError('"pool" amounts must be at most '\
+                + str(MAX_DICE))
+    return pool
+
+def _spend(budget, dice, rows):
+    """Takes (dice) and (rows) results off a request's budget, see
+    MAX_ROLLED and MAX_ROWS"""
+    budget[0] -= dice
+    budget[1] -= rows
+    if budget[0] < 0:
+        raise ValueError("requests can roll at most " + str(MAX_ROLLED)\
+            + " dice")
+    if budget[1] < 0:
+        raise ValueError("requests can return at most " + str(MAX_ROWS)\
+            + " results")
+
+def roll_pool(pool=(0, 0, 0, 0, 0, 0), service=None):
+    """Rolls a 6 color pool once and returns the net results"""
+    if service is None:
+        service = rng_service()
+    result = pool_batch(pool, 1, service.stream("dice"))[0]
+    return {
+        'success': int(result[0]),
+        'advantage': int(result[1]),
+        'triumph': int(result[2]),
+        'despair': int(result[3])
+        }
+
+def roll_crit(previous=0, mod=0, service=None):
+    """Rolls a critical injury the same way the GUI does"""
+    if service is None:
+        service = rng_service()
+    roll = service.stream("crit").roll(100)
+    total = previous*10 + mod + roll
+    severity, name, description = crit_result(total)
+    return {
+        'roll': roll,
+        'total': total,
+        'severity': severity,
+        'difficulty': SEVERITY[severity],
+        'name': name,
+        'description': description
+        }
+
+def handle_request(request, in_batch=False, service=None, budget=None):
+    """Answers a single decoded request, raising ValueError if it's bad
+
+    Rolls come from the given rng RandomService, or the shared one, unless
+    the request brings its own seed. budget is a list of the dice the
+    request may still roll and the results it may still return, shared by
+    every request of a batch.
+
+    """
+    if budget is None:
+        budget = [MAX_ROLLED, MAX_ROWS]
+    if not isinstance(request, dict):
+        raise ValueError("requests must be JSON objects")
+    if 'seed' in request:
+        service = RandomService(_get_int(request, 'seed', minimum=0))
+    elif service is None:
+        service = rng_service()
+    type = request.get('type')
+    if type == 'pool':
+        pool = _get_pool(request)
+        count = _get_int(request, 'count', 1, 1, MAX_COUNT)
+        _spend(budget, max(sum(pool), 1) * count, count)
+        if 'count' not in request:
+            return roll_pool(pool, service)
+        results = []
+        for row in pool_batch(pool, count, service.stream("dice")):
+            results.append([int(i) for i in row[:4]])
+        return {'results': results}
+    elif type == 'crit':
+        previous = _get_int(request, 'previous', 0, 0)
+        mod = _get_int(request, 'mod', 0)
+        _spend(budget, 1, 1)
+        return roll_crit(previous, mod, service)
+    elif type == 'force':
+        dice = _get_int(request, 'dice', 1, 0, MAX_COUNT)
+        count = _get_int(request, 'count', 1, 1, MAX_COUNT)
+        _spend(budget, max(dice, 1) * count, count)
+        light, dark = force_batch(dice, count, service.stream("force"))
+        results = [[int(i), int(j)] for i, j in zip(light, dark)]
+        if 'count' not in request:
+            return {'light': results[0][0], 'dark': results[0][1]}
+        return {'results': results}
+    elif type == 'batch':
+        if in_batch:
+            raise ValueError("batches can't be nested")
+        requests = request.get('requests')
+        if not isinstance(requests, list) or len(requests) > MAX_COUNT:
+            raise ValueError('"requests" must be a list of requests')
+        return {'results': [
+            respond(i, True, service, budget) for i in requests
+            ]}
+    raise ValueError("unknown request type: " + repr(type))
+
+def respond(request, in_batch=False, service=None, budget=None):
+    """Answers a decoded request, turning any problem into an error reply"""
+    try:
+        response = handle_request(request, in_batch, service, budget)
+    except ValueError as error:
+        response = {'error': str(error)}
+    except Exception: # Never let one request close the whole connection
+        response = {'error': "request failed"}
+    if isinstance(request, dict) and 'id' in request:
+        response['id'] = request['id']
+    return response
+
+def respond_line(line, service=None):
+    """Answers a single raw request line with a raw response line"""
+    try:
+        request = json.loads(line.decode('utf-8'))
+    except ValueError:
+        response = {'error': "requests must be valid JSON"}
+    else:
+        response = respond(request, service=service)
+    return json.dumps(response).encode('utf-8') + b'\n'
+
+# Classes
+
+class RollProtocol(asyncio.Protocol):
+    """A single client connection, answering request lines as they arrive"""
+    def connection_made(self, transport):
+        self.transport = transport
+        self.buffer = b''
+        # Each client rolls from its own streams
+        self.service = rng_service().spawn()[0]
+
+    def data_received(self, data):
+        self.buffer += data
+        lines = self.buffer.split(b'\n')
+        # The last piece is an unfinished line, kept until the rest arrives
+        self.buffer = lines.pop()
+        responses = []
+        for line in lines:
+            if line.strip():
+                responses.append(respond_line(line, self.service))
+        if len(self.buffer) > MAX_LINE:
+            responses.append(b'{"error": "request line too long"}\n')
+        if responses:
+            self.transport.write(b''.join(responses))
+        if len(self.buffer) > MAX_LINE:
+            self.transport.close()
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+    """Runs the roll server until interrupted
+
+    Args:
+        host, port: TCP address to listen on
+
+        unix: Path of a Unix socket to listen on instead of TCP
+
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    if unix:
+        server = loop.run_until_complete(
+            loop.create_unix_server(RollProtocol, unix)
+            )
+    else:
+        server = loop.run_until_complete(
+            loop.create_server(RollProtocol, host, port)
+            )
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
@@ -0,0 +1,78 @@
+#!/usr/bin/python
+# Roll Store Module
+# Append only, columnar storage for the dice roll history
+
+# Imports
+
+from array import array
+from time import time
+
+# Classes
+
+class RollStore(object):
+    """Dice roll history kept as flat typed columns
+
+    Every roll appends one timestamp, 6 dice amounts (in the same order as
+    DicePool.all_rolls) and 4 results (success, advantage, triumph, despair).
+    Nothing is ever inserted or removed, so adding a roll is O(1).
+
+    Rolls are read back newest first: index 0 is always the latest roll.
+
+    If given an archive (a session_log RecordFile of DICE_RECORDs), rolls
+    from earlier sessions are read from it after this session's rolls, and
+    every new roll is also written to it.
+
+    """
+    def __init__(self, archive=None):
+        self.times = array('d') # Seconds since the epoch
+        self.dice = array('h') # 6 per roll
+        self.results = array('h') # 4 per roll
+
+        self.archive = archive
+        if archive is not None:
+            self._archived = len(archive)
+        else:
+            self._archived = 0
+
+    def __len__(self):
+        return len(self.times) + self._archived
+
+    def __getitem__(self, index):
+        """Returns (time, dice amounts, results) for a newest first index"""
+        row = self._row(index)
+        if row < 0: # Archived roll
+            record = self.archive[self._archived + row]
+            return record[0], tuple(record[1:7]), tuple(record[7:11])
+        return (
+            self.times[row],
+            tuple(self.dice[row*6:row*6 + 6]),
+            tuple(self.results[row*4:row*4 + 4])
+            )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _row(self, index):
+        """Converts a newest first index into a storage row
+
+        Rows of this session count up from 0, archived rows are negative.
+
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("roll index out of range")
+        return len(self.times) - 1 - index
+
+    def append(self, dice, results, timestamp=None):
+        """Stores a roll, timestamped now unless a timestamp is given"""
+        if timestamp is None:
+            timestamp = time()
+        self.times.append(timestamp)
+        self.dice.extend(dice[:6])
+        self.results.extend(results[:4])
+        if self.archive is not None:
+            self.archive.append(
+                [timestamp] + list(dice[:6]) + list(results[:4])
+                )
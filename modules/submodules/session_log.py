@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# Session Log Module
+# Saves dice, critical injury and force rolls to disk between sessions
+#
+# Every kind of roll has its own file of fixed width binary records. New rolls
+# are appended, and a reopened file is memory mapped, so a long campaign's
+# history is available immediately without reading or parsing it up front.
+#
+# Logs can also be opened read only, to read them while the app is still
+# writing to them. Nothing is ever written or truncated then, and a record
+# only partly written when the file was opened is left out.
+
+# Imports
+
+import mmap
+import struct
+from os import makedirs
+from os.path import exists, expanduser, isdir, join
+from time import time
+
+# Variables
+
+# Where the logs are kept unless told otherwise
+LOG_FOLDER = join(expanduser("~"), ".at-diceroller")
+
+# Record Layouts, all little endian
+# Dice: timestamp, 6 dice amounts, success, advantage, triumph, despair
+DICE_RECORD = struct.Struct('<d6h4h')
+# Critical Injuries: timestamp, previous, mod, roll, severity, name
+CRIT_RECORD = struct.Struct('<d4h24s')
+# Force: timestamp, dice, light, dark
+FORCE_RECORD = struct.Struct('<d3h')
+
+# The shared log, see session_log()
+_SESSION_LOG = []
+
+# Functions
+
+def session_log(folder=LOG_FOLDER):
+    """Returns the shared SessionLog, or None if it can't be opened"""
+    if not _SESSION_LOG:
+        try:
+            _SESSION_LOG.append(SessionLog(folder))
+        except (IOError, OSError):
+            _SESSION_LOG.append(None)
+    return _SESSION_LOG[0]
+
+# Classes
+
+class RecordFile(object):
+    """A file of fixed width records, oldest first
+
+    Records are appended with a single write each. Reads unpack straight out
+    of a read only memory map of the file, which is only (re)created when a
+    record past the end of the current map is asked for.
+
+    With read_only set the file is never written to. Only the whole records
+    in it when it's opened can be read, and a missing file has none.
+
+    """
+    def __init__(self, filename, record, read_only=False):
+        self.filename = filename
+        self.record = record
+        self.read_only = read_only
+        if read_only and not exists(filename):
+            self._file = None
+            size = 0
+        else:
+            self._file = open(filename, 'rb' if read_only else 'ab+')
+            self._file.seek(0, 2)
+            size = self._file.tell()
+        self._count = size // record.size
+        # Drop a partial record left behind by a crash
+        if size % record.size and not read_only:
+            self._file.truncate(self._count * record.size)
+        self._map = None
+        self._mapped = 0 # Records covered by the current map
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Returns the unpacked record at a position, oldest first"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        if index >= self._mapped:
+            self._remap()
+        return self.record.unpack_from(self._map, index * self.record.size)
+
+    def _remap(self):
+        """Maps the whole file as it currently stands"""
+        self._file.flush()
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(
+            self._file.fileno(),
+            self._count * self.record.size,
+            access = mmap.ACCESS_READ
+            )
+        self._mapped = self._count
+
+    def append(self, values):
+        """Writes a record to the end of the file"""
+        if self.read_only:
+            raise IOError("can't append to a read only record file")
+        self._file.write(self.record.pack(*values))
+        self._file.flush()
+        self._count += 1
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._mapped = 0
+        if self._file is not None:
+            self._file.close()
+
+class SessionLog(object):
+    """The dice, critical injury and force logs kept in a folder
+
+    With read_only set, the folder and its logs are never created or
+    written to, see RecordFile.
+
+    """
+    def __init__(self, folder=LOG_FOLDER, read_only=False):
+        if not read_only and not isdir(folder):
+            makedirs(folder)
+        self.folder = folder
+        self.dice = RecordFile(
+            join(folder, "dice.log"),
+            DICE_RECORD,
+            read_only
+            )
+        self.crits = RecordFile(
+            join(folder, "crits.log"),
+            CRIT_RECORD,
+            read_only
+            )
+        self.force = RecordFile(
+            join(folder, "force.log"),
+            FORCE_RECORD,
+            read_only
+            )
+
+    def log_crit(self, previous, mod, roll, severity, name, timestamp=None):
+        """Saves a critical injury roll"""
+        if timestamp is None:
+            timestamp = time()
+        self.crits.append((
+            timestamp,
+            previous,
+            mod,
+            roll,
+            severity,
+            name.encode('utf-8')
+            ))
+
+    def log_force(self, dice, light, dark, timestamp=None):
+        """Saves a force roll of (dice) dice"""
+        if timestamp is None:
+            timestamp = time()
+        self.force.append((timestamp, dice, light, dark))
+
+    def close(self):
+        for records in (self.dice, self.crits, self.force):
+            records.close()
+
+class ArchiveList(object):
+    """Newest first list of this session's items, then archived ones
+
+    Items added this session are kept as is. Older items are read on demand
+    from an archive RecordFile, loaded through load(record). New items are
+    also passed to save(item), which writes them to the archive.
+
+    """
+    def __init__(self, archive=None, load=None, save=None):
+        self.items = [] # This session, oldest first
+        self.archive = archive
+        self.load = load
+        self.save = save
+        if archive is not None:
+            self._archived = len(archive)
+        else:
+            self._archived = 0
+
+    def __len__(self):
+        return len(self.items) + self._archived
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        if index < len(self.items):
+            return self.items[-1 - index]
+        row = self._archived - 1 - (index - len(self.items))
+        return self.load(self.archive[row])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, item):
+        """Adds a new, newest item"""
+        self.items.append(item)
+        if self.save is not None:
+            self.save(item)
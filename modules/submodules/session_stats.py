@@ -0,0 +1,125 @@
+#!/usr/bin/python
+# Session Stats Module
+# Running totals of how lucky the table has been this session
+#
+# Every saved dice pool and rolled critical injury is added to the totals
+# once, as it's saved or rolled, together with its odds. Nothing here ever reads the history,
+# so keeping the stats costs the same on the first roll and the thousandth.
+# Only rolls made since the app started are counted, earlier sessions
+# loaded from the session log are not.
+
+# Imports
+
+from ..rules.crit import SEVERITY
+from ..rules.crit_odds import severity_odds
+
+# Variables
+
+# Results of a dice roll, in the order add_roll() takes them
+DICE_FIELDS = ("success", "advantage", "triumph", "despair")
+
+# The shared stats, see session_stats()
+_SESSION_STATS = []
+
+# Functions
+
+def session_stats():
+    """Returns the SessionStats shared by every part of the UI"""
+    if not _SESSION_STATS:
+        _SESSION_STATS.append(SessionStats())
+    return _SESSION_STATS[0]
+
+def _mean(total, count):
+    if not count:
+        return 0.0
+    return float(total) / count
+
+# Classes
+
+class SessionStats(object):
+    """Observed and expected totals of the dice and crits of a session
+
+    Percentiles place every roll within its own odds, counting rolls that
+    tie it as half. An average percentile of 0.5 is a table rolling
+    exactly as the odds say. Higher dice percentiles are more success than
+    expected, higher crit percentiles are worse injuries than expected.
+
+    """
+    def __init__(self):
+
+        # Dice
+        self.rolls = 0
+        self.observed = [0, 0, 0, 0] # Net results, in DICE_FIELDS order
+        self.expected = [0.0, 0.0, 0.0, 0.0]
+        self.percentiles = 0.0 # Sum of every roll's success percentile
+
+        # Critical Injuries, indexed like SEVERITY
+        self.crits = 0
+        self.severities = [0] * len(SEVERITY)
+        self.expected_severities = [0.0] * len(SEVERITY)
+        self.crit_percentiles = 0.0
+
+        # Called with no arguments after every roll is added
+        self.watchers = []
+
+    def add_roll(self, results, expected, percentile):
+        """Adds a saved dice pool
+
+        Args:
+            results: The net (success, advantage, triumph, despair) rolled
+
+            expected: The pool's expected (success, advantage, triumph,
+                despair), see PoolOdds.expected()
+
+            percentile: Where the rolled success falls in the pool's odds,
+                see PoolOdds.percentile()
+
+        """
+        self.rolls += 1
+        for i in range(4):
+            self.observed[i] += results[i]
+            self.expected[i] += expected[i]
+        self.percentiles += percentile
+        self._changed()
+
+    def add_crit(self, previous, mod, severity):
+        """Adds a critical injury, rolled with the sliders at previous and
+        mod, its odds being looked up from the precomputed table"""
+        odds = severity_odds(previous, mod)
+        self.crits += 1
+        self.severities[severity] += 1
+        for i, chance in enumerate(odds):
+            self.expected_severities[i] += chance
+        # Less severe than this one, plus half the chance of tying it
+        self.crit_percentiles += sum(odds[:severity]) + odds[severity] / 2
+        self._changed()
+
+    def _changed(self):
+        for watcher in self.watchers:
+            watcher()
+
+    def luck(self):
+        """Returns the average success percentile of the dice rolled"""
+        return _mean(self.percentiles, self.rolls)
+
+    def crit_luck(self):
+        """Returns the average severity percentile of the crits rolled"""
+        return _mean(self.crit_percentiles, self.crits)
+
+    def summary(self):
+        """Returns the session's totals as a dict"""
+        dice = {'rolls': self.rolls, 'luck': self.luck()}
+        for i, field in enumerate(DICE_FIELDS):
+            dice[field] = (self.observed[i], self.expected[i])
+        return {
+            'dice': dice,
+            'crits': {
+                'rolls': self.crits,
+                'luck': self.crit_luck(),
+                'severities': list(zip(
+                    self.severities,
+                    self.expected_severities
+                    ))
+                }
+            }
+
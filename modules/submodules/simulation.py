@@ -0,0 +1,156 @@
+#!/usr/bin/python
+# Simulation Module
+# Monte Carlo sweeps comparing many dice pools across processes
+#
+# Every pool's trials are cut into shards and spread over a process pool.
+# Each shard rolls from its own child of a single RandomService, rebuilt in
+# the worker from its seed and spawn key, so shards are independent of each
+# other and a seeded sweep gives the same histograms however many workers
+# ran it. Shard histograms of net (success, advantage, triumph, despair)
+# are merged back per pool.
+
+# Imports
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError: # Python 2 without the futures backport runs serially
+    ProcessPoolExecutor = None
+
+from .rng import RandomService, load_numpy
+from .sw_dice import RESULT_FIELDS, pool_batch
+
+# Variables
+
+SHARD_SIZE = 50000 # Most trials rolled by a single task
+
+# Functions
+
+def _simulate_shard(task):
+    """Rolls one shard in a worker, returns (pool index, Histogram)
+
+    Args:
+        task: (pool index, pool, trials, seed, spawn_key), the last two
+            rebuilding the shard's RandomService
+
+    """
+    index, pool, trials, seed, spawn_key = task
+    stream = RandomService(seed, spawn_key).stream("simulation")
+    histogram = Histogram()
+    histogram.add_rolls(pool_batch(pool, trials, stream))
+    return index, histogram
+
+def _shards(pools, trials, service, shard_size):
+    """Cuts every pool's trials into shard tasks"""
+    tasks = []
+    for index, pool in enumerate(pools):
+        remaining = trials
+        while remaining > 0:
+            size = min(shard_size, remaining)
+            child = service.spawn()[0]
+            tasks.append(
+                (index, tuple(pool), size, child.seed, child.spawn_key)
+                )
+            remaining -= size
+    return tasks
+
+def simulate(pools, trials=100000, workers=None, seed=None,
+    shard_size=SHARD_SIZE):
+    """Rolls every pool (trials) times, spread over worker processes
+
+    Args:
+        pools: A list of pools, each 6 dice amounts in POOL_TYPES order
+
+        trials: Rolls of every pool
+
+        workers: Worker processes, as many as there are cores if None. 1
+            (or no concurrent.futures) rolls everything in this process.
+
+        seed: Seeds the whole sweep, None for fresh entropy
+
+        shard_size: Most trials a single task rolls
+
+    Returns a Histogram per pool, in the same order as pools.
+
+    """
+    service = RandomService(seed)
+    tasks = _shards(pools, trials, service, shard_size)
+    histograms = [Histogram() for pool in pools]
+    if workers == 1 or ProcessPoolExecutor is None or len(tasks) < 2:
+        results = map(_simulate_shard, tasks)
+        for index, histogram in results:
+            histograms[index].merge(histogram)
+        return histograms
+    executor = ProcessPoolExecutor(workers)
+    try:
+        for index, histogram in executor.map(_simulate_shard, tasks):
+            histograms[index].merge(histogram)
+    finally:
+        executor.shutdown()
+    return histograms
+
+# Classes
+
+class Histogram(object):
+    """How often every net (success, advantage, triumph, despair) came up"""
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+
+    def __len__(self):
+        """Returns the number of trials counted"""
+        return sum(self.counts.values())
+
+    def add_rolls(self, rolls):
+        """Counts a (trials x 6) pool_batch() table"""
+        numpy = load_numpy()
+        if numpy is not None and hasattr(rolls, 'shape'):
+            keys, counts = numpy.unique(
+                rolls[:, :4],
+                axis = 0,
+                return_counts = True
+                )
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                key = tuple(key)
+                self.counts[key] = self.counts.get(key, 0) + count
+            return
+        for row in rolls:
+            key = tuple(row[:4])
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def merge(self, other):
+        """Adds the counts of another histogram to this one"""
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    def chance(self, test):
+        """Returns the fraction of trials whose result passes test(key)"""
+        trials = len(self)
+        if not trials:
+            return 0.0
+        passed = 0
+        for key, count in self.counts.items():
+            if test(key):
+                passed += count
+        return float(passed) / trials
+
+    def mean(self, field):
+        """Returns the average of a result, named as in RESULT_FIELDS"""
+        trials = len(self)
+        if not trials:
+            return 0.0
+        i = RESULT_FIELDS.index(field)
+        total = 0
+        for key, count in self.counts.items():
+            total += key[i] * count
+        return float(total) / trials
+
+    def summary(self):
+        """Returns the headline numbers of the histogram as a dict"""
+        return {
+            'trials': len(self),
+            'success': self.chance(lambda key: key[0] > 0),
+            'advantage': self.chance(lambda key: key[1] > 0),
+            'triumph': self.chance(lambda key: key[2] > 0),
+            'despair': self.chance(lambda key: key[3] > 0),
+            'mean_success': self.mean('success'),
+            'mean_advantage': self.mean('advantage')
+            }
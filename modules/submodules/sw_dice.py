@@ -5,171 +5,315 @@
 
 # Imports
 
-import random
+from .rng import get_stream, load_numpy # Random streams and optional NumPy
+
+# Face Tables
+
+# Every die is described by its faces, face n-1 holding the result of rolling
+# an n. Each face reads:
+#   (success, advantage, triumph, despair, light, dark)
+# Failure and threat are stored as negative success and advantage, so the
+# results of any pool can simply be summed.
+
+RESULT_FIELDS = ('success', 'advantage', 'triumph', 'despair', 'light', 'dark')
+
+_BLANK = (0, 0, 0, 0, 0, 0)
+
+DICE_FACES = {
+    "boost": (
+        _BLANK,
+        _BLANK,
+        (1, 0, 0, 0, 0, 0),
+        (1, 1, 0, 0, 0, 0),
+        (0, 2, 0, 0, 0, 0),
+        (0, 1, 0, 0, 0, 0)
+        ),
+    "setback": (
+        _BLANK,
+        _BLANK,
+        (-1, 0, 0, 0, 0, 0),
+        (-1, 0, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0)
+        ),
+    "ability": (
+        _BLANK,
+        (1, 0, 0, 0, 0, 0),
+        (1, 0, 0, 0, 0, 0),
+        (2, 0, 0, 0, 0, 0),
+        (0, 1, 0, 0, 0, 0),
+        (0, 1, 0, 0, 0, 0),
+        (1, 1, 0, 0, 0, 0),
+        (0, 2, 0, 0, 0, 0)
+        ),
+    "difficulty": (
+        _BLANK,
+        (-1, 0, 0, 0, 0, 0),
+        (-2, 0, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0),
+        (0, -2, 0, 0, 0, 0),
+        (-1, -1, 0, 0, 0, 0)
+        ),
+    "proficiency": (
+        _BLANK,
+        (1, 0, 0, 0, 0, 0),
+        (1, 0, 0, 0, 0, 0),
+        (2, 0, 0, 0, 0, 0),
+        (2, 0, 0, 0, 0, 0),
+        (0, 1, 0, 0, 0, 0),
+        (1, 1, 0, 0, 0, 0),
+        (1, 1, 0, 0, 0, 0),
+        (1, 1, 0, 0, 0, 0),
+        (0, 2, 0, 0, 0, 0),
+        (0, 2, 0, 0, 0, 0),
+        (1, 0, 1, 0, 0, 0)
+        ),
+    "challenge": (
+        _BLANK,
+        (-1, 0, 0, 0, 0, 0),
+        (-1, 0, 0, 0, 0, 0),
+        (-2, 0, 0, 0, 0, 0),
+        (-2, 0, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0),
+        (0, -1, 0, 0, 0, 0),
+        (-1, -1, 0, 0, 0, 0),
+        (-1, -1, 0, 0, 0, 0),
+        (0, -2, 0, 0, 0, 0),
+        (0, -2, 0, 0, 0, 0),
+        (-1, 0, 0, 1, 0, 0)
+        ),
+    "force": (
+        (0, 0, 0, 0, 0, 1),
+        (0, 0, 0, 0, 0, 1),
+        (0, 0, 0, 0, 0, 1),
+        (0, 0, 0, 0, 0, 1),
+        (0, 0, 0, 0, 0, 1),
+        (0, 0, 0, 0, 0, 1),
+        (0, 0, 0, 0, 0, 2),
+        (0, 0, 0, 0, 1, 0),
+        (0, 0, 0, 0, 1, 0),
+        (0, 0, 0, 0, 2, 0),
+        (0, 0, 0, 0, 2, 0),
+        (0, 0, 0, 0, 2, 0)
+        )
+    }
+
+# Same order as the pool lists used throughout the app
+POOL_TYPES = (
+    "ability",
+    "proficiency",
+    "boost",
+    "difficulty",
+    "challenge",
+    "setback"
+    )
+
+# NumPy copies of the face tables, built on first batch roll
+_FACE_ARRAYS = {}
 
 # Functions
 
-def dice_roll(sides=6, dice=1):
+def dice_roll(sides=6, dice=1, stream=None):
     """Rolls a (sides) die (dice) times and returns a list"""
-    rolls = []
-    for i in range(dice):
-        rolls.append(random.randrange(sides) + 1)
-    return rolls
+    if stream is None:
+        stream = get_stream("dice")
+    return [stream.roll(sides) for i in range(dice)]
+
+def _face_array(type):
+    """Returns the face table of a die type as a NumPy array"""
+    if type not in _FACE_ARRAYS:
+        numpy = load_numpy()
+        _FACE_ARRAYS[type] = numpy.array(DICE_FACES[type], dtype=numpy.int32)
+    return _FACE_ARRAYS[type]
+
+def dice_batch(type, dice=1, pools=1, stream=None):
+    """Rolls (pools) sets of (dice) dice of a type in one go
+
+    Args:
+        type: One of the keys of DICE_FACES
+
+        dice: Amount of dice in every set
+
+        pools: Amount of sets to roll
+
+        stream: The rng RandomStream to draw from, the shared "dice" stream
+            unless given
+
+    Returns a (pools x 6) table of summed face results, one row per set laid
+    out as RESULT_FIELDS. With NumPy this is an array built from a single
+    draw and table gather, otherwise a list of lists.
+
+    """
+    if stream is None:
+        stream = get_stream("dice")
+    faces = DICE_FACES[type]
+    rolls = stream.integers(len(faces), (pools, dice))
+    if stream.numpy is not None:
+        return _face_array(type)[rolls].sum(axis=1)
+    results = []
+    for pool in rolls:
+        total = [0, 0, 0, 0, 0, 0]
+        for roll in pool:
+            face = faces[roll]
+            for i in range(6):
+                total[i] += face[i]
+        results.append(total)
+    return results
+
+def pool_batch(pool=(0, 0, 0, 0, 0, 0), pools=1, stream=None):
+    """Rolls a full 6 color pool (pools) times
+
+    The pool is given in POOL_TYPES order, the same as DicePool.set_pool().
+    Returns a (pools x 6) table of net results laid out as RESULT_FIELDS.
+
+    """
+    if stream is None:
+        stream = get_stream("dice")
+    numpy = stream.numpy
+    if numpy is not None:
+        totals = numpy.zeros((pools, 6), dtype=numpy.int32)
+    else:
+        totals = [[0, 0, 0, 0, 0, 0] for i in range(pools)]
+    for i in range(6):
+        if not pool[i]:
+            continue
+        results = dice_batch(POOL_TYPES[i], pool[i], pools, stream)
+        if numpy is not None:
+            totals += results
+        else:
+            for total, result in zip(totals, results):
+                for j in range(6):
+                    total[j] += result[j]
+    return totals
 
-def dice_boost(dice):
+def _roll_totals(type, dice, stream=None):
+    """Rolls (dice) dice of a type once and returns the summed face as ints"""
+    return [int(i) for i in dice_batch(type, dice, 1, stream)[0]]
+
+def dice_boost(dice, stream=None):
     """Rolls & interprets d6 dice according to Boost die"""
-    rolls = dice_roll(6, dice)
-    success = 0
-    advantage = 0
-    for i in rolls:
-        if i == 3:
-            success += 1
-        elif i == 4:
-            success += 1
-            advantage += 1
-        elif i == 5:
-            advantage += 2
-        elif i == 6:
-            advantage += 1
-    return success, advantage
+    totals = _roll_totals("boost", dice, stream)
+    return totals[0], totals[1]
     
-def dice_setback(dice):
+def dice_setback(dice, stream=None):
     """Rolls & interprets d6 dice according to Setback die"""
-    rolls = dice_roll(6, dice)
-    failure = 0
-    threat = 0
-    for i in rolls:
-        if i in (3, 4):
-            failure += 1
-        elif i in (5, 6):
-            threat += 1
-    return failure, threat
-
-def dice_ability(dice):
+    totals = _roll_totals("setback", dice, stream)
+    return -totals[0], -totals[1]
+
+def dice_ability(dice, stream=None):
     """Rolls & interprets d8 dice according to Ability die"""
-    rolls = dice_roll(8, dice)
-    success = 0
-    advantage = 0
-    for i in rolls:
-        if i in (2, 3):
-            success += 1
-        elif i == 4:
-            success += 2
-        elif i in (5, 6):
-            advantage += 1
-        elif i == 7:
-            success += 1
-            advantage += 1
-        elif i == 8:
-            advantage += 2
-    return success, advantage
-
-def dice_difficulty(dice):
+    totals = _roll_totals("ability", dice, stream)
+    return totals[0], totals[1]
+
+def dice_difficulty(dice, stream=None):
     """Rolls & interprets d8 dice according to Difficulty die"""
-    rolls = dice_roll(8, dice)
-    failure = 0
-    threat = 0
-    for i in rolls:
-        if i == 2:
-            failure += 1
-        elif i == 3:
-            failure += 2
-        elif i in (4, 5, 6):
-            threat += 1
-        elif i == 7:
-            threat += 2
-        elif i == 8:
-            failure += 1
-            threat += 1
-    return failure, threat
-
-def dice_proficiency(dice):
+    totals = _roll_totals("difficulty", dice, stream)
+    return -totals[0], -totals[1]
+
+def dice_proficiency(dice, stream=None):
     """Rolls & interprets d12 dice according to Proficiency die"""
-    rolls = dice_roll(12, dice)
-    success = 0
-    advantage = 0
-    triumph = 0
-    for i in rolls:
-        if i in (2, 3):
-            success += 1
-        elif i in (4, 5):
-            success += 2
-        elif i == 6:
-            advantage += 1
-        elif i in (7, 8, 9):
-            success += 1
-            advantage += 1
-        elif i in (10, 11):
-            advantage += 2
-        elif i == 12:
-            success += 1
-            triumph += 1
-    return success, advantage, triumph
-
-def dice_challenge(dice):
+    totals = _roll_totals("proficiency", dice, stream)
+    return totals[0], totals[1], totals[2]
+
+def dice_challenge(dice, stream=None):
     """Rolls & interprets d12 dice according to Challenge die"""
-    rolls = dice_roll(12, dice)
-    failure = 0
-    threat = 0
-    despair = 0
-    for i in rolls:
-        if i in (2, 3):
-            failure += 1
-        elif i in (4, 5):
-            failure += 2
-        elif i in (6, 7):
-            threat += 1
-        elif i in (8, 9):
-            failure += 1
-            threat += 1
-        elif i in (10, 11):
-            threat += 2
-        elif i == 12:
-            failure += 1
-            despair += 1
-    return failure, threat, despair
+    totals = _roll_totals("challenge", dice, stream)
+    return -totals[0], -totals[1], totals[3]
     
-def dice_force(dice):
+def dice_force(dice, stream=None):
     """Rolls & interprets d12 dice according to Force die"""
-    rolls = dice_roll(12, dice)
-    light = 0
-    dark = 0
-    for i in rolls:
-        if i in (1, 2, 3, 4, 5, 6):
-            dark += 1
-        elif i == 7:
-            dark += 2
-        elif i in (8, 9):
-            light += 1
-        elif i in (10, 11, 12):
-            light += 2
-    return light, dark
-
-def add_dice(number, type):
-    """Sends roll commands and updates results"""
-    success = 0
-    advantage = 0
-    failure = 0
-    threat = 0
-    triumph = 0
-    despair = 0
+    totals = _roll_totals("force", dice, stream)
+    return totals[4], totals[5]
+
+def add_dice(number, type, stream=None):
+    """Sends roll commands and updates results
+
+    Dice come from the given rng stream, the shared "dice" stream if None.
+
+    """
     if type == "ability":
-        success, advantage = dice_ability(number)
+        success, advantage = dice_ability(number, stream)
         return type, number, success, advantage
     elif type == "proficiency":
-        success, advantage, triumph = dice_proficiency(number)
+        success, advantage, triumph = dice_proficiency(number, stream)
         return type, number, success, advantage, triumph
     elif type == "boost":
-        success, advantage = dice_boost(number)
+        success, advantage = dice_boost(number, stream)
         return type, number, success, advantage
     elif type == "difficulty":
-        failure, threat = dice_difficulty(number)
+        failure, threat = dice_difficulty(number, stream)
         return type, number, failure, threat
     elif type == "challenge":
-        failure, threat, despair = dice_challenge(number)
+        failure, threat, despair = dice_challenge(number, stream)
         return type, number, failure, threat, despair
     elif type == "setback":
-        failure, threat = dice_setback(number)
+        failure, threat = dice_setback(number, stream)
         return type, number, failure, threat
     else:
-        print "Error, unknown dice type"
\ No newline at end of file
+        print("Error, unknown dice type")
+
+# Probabilities
+
+def _die_distribution(type):
+    """Returns the result distribution of a single die of a type
+
+    The distribution is a dict of {(success, advantage, triumph, despair):
+    probability}, built by collapsing identical faces of the face table.
+
+    """
+    faces = DICE_FACES[type]
+    chance = 1.0 / len(faces)
+    distribution = {}
+    for face in faces:
+        key = face[:4]
+        distribution[key] = distribution.get(key, 0.0) + chance
+    return distribution
+
+def _convolve(first, second):
+    """Combines two independent distributions into the distribution of
+    their summed results"""
+    result = {}
+    for key1, chance1 in first.items():
+        for key2, chance2 in second.items():
+            key = (
+                key1[0] + key2[0],
+                key1[1] + key2[1],
+                key1[2] + key2[2],
+                key1[3] + key2[3]
+                )
+            result[key] = result.get(key, 0.0) + chance1 * chance2
+    return result
+
+def _repeat(distribution, count):
+    """Convolves a distribution with itself (count) times by squaring"""
+    result = {(0, 0, 0, 0): 1.0}
+    while count:
+        if count & 1:
+            result = _convolve(result, distribution)
+        count >>= 1
+        if count:
+            distribution = _convolve(distribution, distribution)
+    return result
+
+def pool_distribution(pool=(0, 0, 0, 0, 0, 0)):
+    """Returns the exact result distribution of a full 6 color pool
+
+    Args:
+        pool: Amount of each dice type in POOL_TYPES order, the same as
+            DicePool.set_pool()
+
+    Returns a dict of {(success, advantage, triumph, despair): probability}
+    where success and advantage are net values (negative for failure and
+    threat).
+
+    """
+    result = {(0, 0, 0, 0): 1.0}
+    for i in range(6):
+        if pool[i]:
+            result = _convolve(
+                result,
+                _repeat(_die_distribution(POOL_TYPES[i]), pool[i])
+                )
+    return result
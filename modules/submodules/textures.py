@@ -0,0 +1,47 @@
+#!/usr/bin/kivy
+# Texture Module
+# Process wide registry for the textures in tex/
+#
+# Textures are loaded on first use and then shared by every consumer, so an
+# image is only read from disk and uploaded once per run. Kivy itself is only
+# imported once a texture is actually needed.
+#
+# The result icons can optionally be packed into a single atlas with:
+#   python -m kivy.atlas tex/results 256x256 tex/success.png tex/failure.png \
+#       tex/advantage.png tex/threat.png tex/triumph.png tex/despair.png
+# If use_atlas() is given that atlas, regions are handed out from it instead.
+
+# Imports
+
+from os.path import basename, exists, splitext
+
+# Variables
+
+# Loaded textures by filename
+_TEXTURES = {}
+
+# Atlas regions by image name (filename without folder or extension)
+_REGIONS = {}
+
+# Functions
+
+def use_atlas(filename):
+    """Registers the regions of a Kivy atlas, returns False if it's missing"""
+    if not exists(filename):
+        return False
+    from kivy.atlas import Atlas # Deferred so Kivy loads on first use
+    _REGIONS.update(Atlas(filename).textures)
+    return True
+
+def get_texture(filename):
+    """Returns the shared texture for an image, loading it on first use"""
+    texture = _TEXTURES.get(filename)
+    if texture is None:
+        name = splitext(basename(filename))[0]
+        if name in _REGIONS:
+            texture = _REGIONS[name]
+        else:
+            from kivy.core.image import Image # Deferred, see above
+            texture = Image(filename).texture
+        _TEXTURES[filename] = texture
+    return texture
@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# AT Dice Roller - Roll Server
+# Serves dice pool, critical injury and force rolls over a local socket
+#
+# Runs without Kivy, for bots and VTT bridges. See
+# modules/submodules/roll_server.py for the request format.
+#
+# Usage:
+#   python server.py [--host 127.0.0.1] [--port 7277]
+#   python server.py --unix /tmp/atdr.sock
+#   python server.py --seed 1234
+
+# ==============================================================================
+# Imports
+# ==============================================================================
+
+import argparse
+
+from modules.submodules.rng import seed
+from modules.submodules.roll_server import DEFAULT_HOST, DEFAULT_PORT, serve
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description = "Serves AT Dice Roller rolls as JSON lines"
+        )
+    parser.add_argument(
+        '--host',
+        default = DEFAULT_HOST,
+        help = "address to listen on (default %(default)s)"
+        )
+    parser.add_argument(
+        '--port',
+        type = int,
+        default = DEFAULT_PORT,
+        help = "TCP port to listen on (default %(default)s)"
+        )
+    parser.add_argument(
+        '--unix',
+        help = "listen on this Unix socket path instead of TCP"
+        )
+    parser.add_argument(
+        '--seed',
+        type = int,
+        help = "seed every connection's rolls, to replay a whole session"
+        )
+    args = parser.parse_args()
+    if args.seed is not None:
+        seed(args.seed)
+    serve(args.host, args.port, args.unix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# AT Dice Roller - Pool Simulator
+# Compares dice pools by rolling each of them many times
+#
+# Runs without Kivy, spreading the rolls over every core. Pools are given as
+# 6 comma separated dice amounts, in the order ability, proficiency, boost,
+# difficulty, challenge, setback.
+#
+# Usage:
+#   python simulate.py 2,1,0,3,0,0 1,2,0,3,0,0 2,1,1,3,0,0
+#   python simulate.py --trials 1000000 --workers 4 --seed 1234 3,0,0,2,0,0
+#   python simulate.py --json 2,1,0,3,0,0
+
+# ==============================================================================
+# Imports
+# ==============================================================================
+
+import argparse
+import json
+from time import time
+
+from modules.submodules.simulation import simulate
+
+# ==============================================================================
+# Functions
+# ==============================================================================
+
+def parse_pool(text):
+    """Turns "a,p,b,d,c,s" into a list of 6 dice amounts"""
+    try:
+        pool = [int(i) for i in text.split(',')]
+    except ValueError:
+        pool = []
+    if len(pool) != 6 or min(pool) < 0:
+        raise argparse.ArgumentTypeError(
+            "pools are 6 comma separated dice amounts, not " + repr(text)
+            )
+    return pool
+
+def percent(chance):
+    return "%5.1f%%" % (chance * 100)
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description = "Compares AT Dice Roller pools by simulation"
+        )
+    parser.add_argument(
+        'pools',
+        nargs = '+',
+        type = parse_pool,
+        help = "ability,proficiency,boost,difficulty,challenge,setback"
+        )
+    parser.add_argument(
+        '--trials',
+        type = int,
+        default = 100000,
+        help = "rolls of every pool (default %(default)s)"
+        )
+    parser.add_argument(
+        '--workers',
+        type = int,
+        help = "worker processes (default: one per core)"
+        )
+    parser.add_argument(
+        '--seed',
+        type = int,
+        help = "seed the whole run, to get the same numbers again"
+        )
+    parser.add_argument(
+        '--json',
+        action = 'store_true',
+        help = "print the summaries as JSON lines"
+        )
+    args = parser.parse_args()
+
+    start = time()
+    histograms = simulate(args.pools, args.trials, args.workers, args.seed)
+    elapsed = time() - start
+
+    if args.json:
+        for pool, histogram in zip(args.pools, histograms):
+            summary = histogram.summary()
+            summary['pool'] = pool
+            print(json.dumps(summary, sort_keys=True))
+        return
+
+    print("Pool               Success  Advantage  Triumph  Despair"
+        "  Avg Succ  Avg Adv")
+    for pool, histogram in zip(args.pools, histograms):
+        summary = histogram.summary()
+        print("%-17s  %s   %s   %s  %s  %8.2f  %7.2f" % (
+            ",".join(str(i) for i in pool),
+            percent(summary['success']),
+            percent(summary['advantage']),
+            percent(summary['triumph']),
+            percent(summary['despair']),
+            summary['mean_success'],
+            summary['mean_advantage']
+            ))
+    print("%d rolls in %.2fs" % (args.trials * len(args.pools), elapsed))
+
+if __name__ == "__main__":
+    main()
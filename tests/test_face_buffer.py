@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# Face Buffer Tests
+# Checks that seeded buffered streams replay the same faces
+#
+#   python -m unittest discover tests
+
+# Imports
+
+import sys
+import unittest
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from modules.submodules import rng
+from modules.submodules.face_buffer import BufferedStream, buffered_stream
+
+# Functions
+
+def draw(stream):
+    """Returns a mix of faces drawn from and past the rings of a stream"""
+    faces = [int(face) for face in stream.integers(6, 500)]
+    faces.extend(stream.roll(100) for i in range(50))
+    faces.extend(int(face) for face in stream.integers(20, 10)) # Unbuffered
+    return faces
+
+# Classes
+
+class BufferedStreamTest(unittest.TestCase):
+    def tearDown(self):
+        rng.seed()
+
+    def test_seeded_buffer_repeats(self):
+        rng.seed(2013)
+        stream = buffered_stream("test")
+        first = draw(stream)
+        rng.seed(2013) # Throws away what the rings drew ahead
+        self.assertEqual(draw(stream), first)
+        self.assertEqual(stream.misses, 0)
+
+    def test_new_buffers_repeat(self):
+        buffers = [
+            BufferedStream(rng.RandomService(2013).child("test"))
+            for i in range(2)
+            ]
+        self.assertEqual(draw(buffers[0]), draw(buffers[1]))
+        for stream in buffers:
+            stream.close()
+
+    def test_shared_stream_untouched(self):
+        rng.seed(2013)
+        expected = list(rng.get_stream("test").integers(6, 20))
+        rng.seed(2013)
+        draw(buffered_stream("test"))
+        self.assertEqual(list(rng.get_stream("test").integers(6, 20)),
+            expected)
+
+if __name__ == '__main__':
+    unittest.main()
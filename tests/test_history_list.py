@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# History List Tests
+# Drives touches through a RecycleList of buttons, without a window
+#
+#   python -m unittest discover tests
+#
+# Needs Kivy, and is skipped without it.
+
+# Imports
+
+import os
+import sys
+import unittest
+import weakref
+from os.path import abspath, dirname, join
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, join(ROOT, 'modules'))
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+try:
+    from kivy.uix.button import Button
+except ImportError:
+    Button = None
+else:
+    from historyList import SCROLL_DISTANCE, RecycleList
+
+# Classes
+
+class Touch(object):
+    """Just enough of a Kivy MotionEvent to be dispatched by hand"""
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+        self.ox, self.oy = x, y # Where the touch started
+        self.dx = self.dy = 0
+        self.profile = ['pos']
+        self.is_mouse_scrolling = False
+        self.ud = {}
+        self.grab_list = []
+        self.grab_current = None
+        self.grab_state = False
+
+    @property
+    def pos(self):
+        return self.x, self.y
+
+    def grab(self, widget):
+        ref = weakref.ref(widget.__self__)
+        if ref not in self.grab_list:
+            self.grab_list.append(ref)
+
+    def ungrab(self, widget):
+        ref = weakref.ref(widget.__self__)
+        if ref in self.grab_list:
+            self.grab_list.remove(ref)
+
+    def move_to(self, x, y):
+        self.dx, self.dy = x - self.x, y - self.y
+        self.x, self.y = x, y
+
+    def dispatch(self, widget, event):
+        """Dispatches like the event loop, to the tree and then to whoever
+        grabbed the touch"""
+        widget.dispatch(event, self)
+        if event == 'on_touch_down':
+            return
+        self.grab_state = True
+        for ref in self.grab_list[:]:
+            grabbed = ref()
+            if grabbed is None:
+                continue
+            self.grab_current = grabbed
+            grabbed.dispatch(event, self)
+        self.grab_current = None
+        self.grab_state = False
+
+@unittest.skipIf(Button is None, "needs Kivy")
+class RecycleListTouchTest(unittest.TestCase):
+    def setUp(self):
+        self.presses = []
+        def row_factory():
+            row = Button()
+            row.set_row = lambda item: setattr(row, 'item', item)
+            row.bind(on_press = lambda row: self.presses.append(row.item))
+            return row
+        self.list = RecycleList(row_factory, row_height=25)
+        self.list.data = list(range(100))
+        self.list.size = (100, 100)
+        self.list.pos = (0, 0)
+        self.list.do_layout()
+
+    def test_drag_scrolls_without_pressing(self):
+        touch = Touch(50, 10)
+        touch.dispatch(self.list, 'on_touch_down')
+        for step in range(1, 11):
+            touch.move_to(50, 10 + step * SCROLL_DISTANCE / 2.0)
+            touch.dispatch(self.list, 'on_touch_move')
+        touch.dispatch(self.list, 'on_touch_up')
+        self.assertEqual(self.presses, [])
+        self.assertTrue(self.list.offset > 0)
+
+    def test_tap_presses_one_row(self):
+        touch = Touch(50, 10)
+        touch.dispatch(self.list, 'on_touch_down')
+        self.assertEqual(self.presses, []) # Held until we know
+        touch.dispatch(self.list, 'on_touch_up')
+        self.assertEqual(len(self.presses), 1)
+        self.assertEqual(touch.grab_list, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# RNG Check Tests
+# A short run of the rng_check chi-square tests on seeded streams
+#
+#   python -m unittest discover tests
+#
+# python -m modules.submodules.rng_check does longer runs.
+
+# Imports
+
+import sys
+import unittest
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from modules.submodules.rng_check import _streams, check_d100, check_die,\
+    check_replay
+from modules.submodules.sw_dice import DICE_FACES
+
+# Variables
+
+SEED = 2013
+ROLLS = 6000
+
+# Classes
+
+class RngCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.streams = _streams(SEED)
+
+    def tearDown(self):
+        for name, stream in self.streams:
+            if hasattr(stream, 'close'):
+                stream.close()
+
+    def test_dice_uniform(self):
+        for name, stream in self.streams:
+            for type in sorted(DICE_FACES):
+                stat, limit = check_die(type, stream, ROLLS)
+                self.assertTrue(stat <= limit, "%s %s chi2 %.2f over %.2f"
+                    % (name, type, stat, limit))
+
+    def test_d100_uniform(self):
+        for name, stream in self.streams:
+            stat, limit = check_d100(stream, ROLLS)
+            self.assertTrue(stat <= limit, "%s d100 chi2 %.2f over %.2f"
+                % (name, stat, limit))
+
+    def test_replay(self):
+        self.assertEqual(check_replay(SEED), [])
+
+if __name__ == '__main__':
+    unittest.main()